@@ -0,0 +1,219 @@
+# analytics.py
+"""Análises de bem-estar da população inteira, em arrays colunares (NumPy).
+
+Carrega de uma vez as respostas do questionário de bem-estar e o humor dos
+últimos dias de todos os usuários comuns e calcula, sem laço por usuário:
+score de risco, prevalência de "sim" por pergunta, recorte por faixa etária
+e tendência do humor (inclinação da reta de mínimos quadrados).
+
+NumPy é opcional para o resto do SafeSpace: sem ele só este módulo fica
+indisponível (numpy_disponivel() retorna False).
+"""
+import math
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # Dependência opcional
+    np = None
+
+import database_manager
+from config import TIPO_USUARIO_COMUM, QUESTIONARIO_BEM_ESTAR
+
+DIAS_ANALISE = 30
+FAIXAS_ETARIAS = (18, 25, 35, 45, 55, 65)  # Limites inferiores das faixas
+# Pesos do score de risco: "sim" no questionário, humor negativo e humor piorando
+PESO_QUESTIONARIO = 0.5
+PESO_HUMOR_NEGATIVO = 0.3
+PESO_TENDENCIA = 0.2
+MIN_REGISTROS_TENDENCIA = 3
+_LINHAS_POR_LOTE = 100000
+
+
+def numpy_disponivel():
+    return np is not None
+
+
+def _exigir_numpy():
+    if np is None:
+        raise RuntimeError("As análises da população precisam do NumPy (pip install numpy).")
+
+
+def _colunas(cursor, sql, params, dtype):
+    """Executa a consulta e devolve cada coluna do resultado como um array,
+    convertendo em lotes para não manter todas as tuplas em memória."""
+    cursor.execute(sql, params)
+    largura = len(cursor.description)
+    lotes = []
+    while True:
+        linhas = cursor.fetchmany(_LINHAS_POR_LOTE)
+        if not linhas:
+            break
+        lotes.append(np.array(linhas, dtype=dtype))
+    tabela = np.concatenate(lotes) if lotes else np.empty((0, largura), dtype=dtype)
+    return [tabela[:, i] for i in range(largura)]
+
+
+def _indices_usuarios(ids, usuario_ids):
+    """Posição de cada usuario_id em `ids` (ordenado) e máscara dos encontrados."""
+    pos = np.searchsorted(ids, usuario_ids)
+    pos_valida = np.minimum(pos, max(len(ids) - 1, 0))
+    encontrados = (pos < len(ids)) & (ids[pos_valida] == usuario_ids) if len(ids) else \
+        np.zeros(len(usuario_ids), dtype=bool)
+    return pos_valida, encontrados
+
+
+def _media(valores):
+    validos = valores[~np.isnan(valores)]
+    return float(validos.mean()) if len(validos) else None
+
+
+def _dividir(numerador, denominador):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominador > 0, numerador / denominador, np.nan)
+
+
+def _opcional(valor):
+    """float do NumPy -> float do Python (NaN vira None)."""
+    valor = float(valor)
+    return None if math.isnan(valor) else valor
+
+
+class AnalisePopulacao:
+    """Resultado de analisar_populacao(): um valor por usuário comum em cada
+    array (na ordem de `ids`) e agregados da população."""
+
+    def __init__(self, ids, idades, perguntas, respostas, registros_humor,
+                 proporcao_sim, proporcao_negativa, tendencia, risco, dias):
+        self.ids = ids                        # int64, ordenado
+        self.idades = idades                  # float64, NaN sem idade
+        self.perguntas = perguntas            # textos das colunas de `respostas`
+        self.respostas = respostas            # int8 [usuário, pergunta]: 1 sim, 0 não, -1 sem resposta
+        self.registros_humor = registros_humor
+        self.proporcao_sim = proporcao_sim
+        self.proporcao_negativa = proporcao_negativa
+        self.tendencia = tendencia            # Valência por dia; < 0 = humor piorando
+        self.risco = risco                    # 0..1, NaN sem dados
+        self.dias = dias
+
+    def __len__(self):
+        return len(self.ids)
+
+    def indicadores(self, i):
+        """Indicadores do usuário na posição i, com tipos do Python."""
+        return {
+            "usuario_id": int(self.ids[i]),
+            "idade": _opcional(self.idades[i]),
+            "risco": _opcional(self.risco[i]),
+            "proporcao_sim": _opcional(self.proporcao_sim[i]),
+            "proporcao_negativa": _opcional(self.proporcao_negativa[i]),
+            "tendencia": _opcional(self.tendencia[i]),
+            "registros_humor": int(self.registros_humor[i]),
+        }
+
+    def ranking(self, limite=50):
+        """Índices dos `limite` usuários de maior risco, do maior para o menor."""
+        com_risco = np.flatnonzero(~np.isnan(self.risco))
+        if len(com_risco) > limite:
+            # argpartition: só os `limite` maiores são ordenados de fato
+            com_risco = com_risco[np.argpartition(-self.risco[com_risco], limite - 1)[:limite]]
+        return com_risco[np.argsort(-self.risco[com_risco], kind="stable")]
+
+    def prevalencia_por_pergunta(self):
+        """{pergunta: (proporção de "sim" entre quem respondeu, respondentes)}."""
+        respondidas = (self.respostas >= 0).sum(axis=0)
+        sim = (self.respostas == 1).sum(axis=0)
+        return {p: (float(s / r) if r else None, int(r))
+                for p, s, r in zip(self.perguntas, sim, respondidas)}
+
+    def por_faixa_etaria(self):
+        """Lista de dicts por faixa etária com usuários, risco médio,
+        proporção média de "sim" e de humor negativo."""
+        limites = np.array(FAIXAS_ETARIAS, dtype=np.float64)
+        faixas = np.digitize(self.idades, limites)  # 0: abaixo da primeira faixa
+        faixas[np.isnan(self.idades)] = -1
+        rotulos = [f"<{FAIXAS_ETARIAS[0]}"] + [
+            f"{a}-{b - 1}" for a, b in zip(FAIXAS_ETARIAS, FAIXAS_ETARIAS[1:])] + [f"{FAIXAS_ETARIAS[-1]}+"]
+        resultado = []
+        for faixa, rotulo in [(-1, "sem idade")] + list(enumerate(rotulos)):
+            mascara = faixas == faixa
+            if not mascara.any():
+                continue
+            resultado.append({
+                "faixa": rotulo,
+                "usuarios": int(mascara.sum()),
+                "risco_medio": _media(self.risco[mascara]),
+                "proporcao_sim_media": _media(self.proporcao_sim[mascara]),
+                "proporcao_negativa_media": _media(self.proporcao_negativa[mascara]),
+            })
+        return resultado
+
+
+def analisar_populacao(dias=DIAS_ANALISE, hoje=None):
+    """Carrega os dados de todos os usuários comuns e calcula os indicadores
+    em uma passada vetorizada. O humor considerado é o dos últimos `dias` dias."""
+    _exigir_numpy()
+    hoje = hoje or date.today()
+    dia_final = database_manager.data_para_dia(hoje)
+    dia_inicial = dia_final - dias + 1
+    with database_manager.conectar() as conn:
+        cursor = conn.cursor()
+        ids, idades = _colunas(
+            cursor, "SELECT id, idade FROM usuarios WHERE type = ? ORDER BY id",
+            (TIPO_USUARIO_COMUM,), np.float64)
+        ids = ids.astype(np.int64)
+        perguntas = cursor.execute(
+            "SELECT id, texto FROM questionario_perguntas WHERE questionario = ? ORDER BY id",
+            (QUESTIONARIO_BEM_ESTAR,)).fetchall()
+        r_usuario, r_pergunta, r_sim = _colunas(
+            cursor,
+            "SELECT usuario_id, pergunta_id, lower(resposta) = 'sim' FROM questionario_respostas "
+            "WHERE pergunta_id IN (SELECT id FROM questionario_perguntas WHERE questionario = ?)",
+            (QUESTIONARIO_BEM_ESTAR,), np.int64)
+        valencias = cursor.execute("SELECT id, valencia FROM sentimentos").fetchall()
+        h_usuario, h_dia, h_sentimento = _colunas(
+            cursor, "SELECT usuario_id, dia, sentimento_id FROM humor_registro WHERE dia BETWEEN ? AND ?",
+            (dia_inicial, dia_final), np.int64)
+    n = len(ids)
+
+    # Questionário: matriz usuário x pergunta
+    ids_perguntas = np.array([p[0] for p in perguntas], dtype=np.int64)
+    respostas = np.full((n, len(perguntas)), -1, dtype=np.int8)
+    pos, ok = _indices_usuarios(ids, r_usuario)
+    respostas[pos[ok], np.searchsorted(ids_perguntas, r_pergunta[ok])] = r_sim[ok]
+    respondidas = (respostas >= 0).sum(axis=1)
+    proporcao_sim = _dividir((respostas == 1).sum(axis=1), respondidas)
+
+    # Humor: valência por registro, somas por usuário com bincount
+    tabela_valencia = np.zeros(max((v[0] for v in valencias), default=0) + 1, dtype=np.float64)
+    for id_sentimento, valencia in valencias:
+        tabela_valencia[id_sentimento] = valencia
+    pos, ok = _indices_usuarios(ids, h_usuario)
+    idx = pos[ok]
+    y = tabela_valencia[h_sentimento[ok]]
+    x = (h_dia[ok] - dia_inicial).astype(np.float64)
+    cont = np.bincount(idx, minlength=n).astype(np.float64)
+    negativos = np.bincount(idx, weights=(y < 0).astype(np.float64), minlength=n)
+    proporcao_negativa = _dividir(negativos, cont)
+
+    # Inclinação dos mínimos quadrados: (n·Σxy − Σx·Σy) / (n·Σx² − (Σx)²)
+    sx = np.bincount(idx, weights=x, minlength=n)
+    sy = np.bincount(idx, weights=y, minlength=n)
+    sxx = np.bincount(idx, weights=x * x, minlength=n)
+    sxy = np.bincount(idx, weights=x * y, minlength=n)
+    denominador = cont * sxx - sx * sx
+    tendencia = _dividir(cont * sxy - sx * sy, denominador)
+    tendencia[cont < MIN_REGISTROS_TENDENCIA] = np.nan
+
+    # Risco: média ponderada dos componentes disponíveis de cada usuário.
+    # A queda vira 0..1: inclinação × dias / 2 é a variação de valência no período
+    piora = np.clip(-tendencia * dias / 2, 0, 1)
+    componentes = np.stack([proporcao_sim, proporcao_negativa, piora])
+    pesos = np.array([PESO_QUESTIONARIO, PESO_HUMOR_NEGATIVO, PESO_TENDENCIA])[:, None]
+    presentes = ~np.isnan(componentes)
+    soma_pesos = (pesos * presentes).sum(axis=0)
+    risco = _dividir((pesos * np.nan_to_num(componentes)).sum(axis=0), soma_pesos)
+
+    return AnalisePopulacao(ids, idades, [p[1] for p in perguntas], respostas,
+                            cont.astype(np.int64), proporcao_sim, proporcao_negativa,
+                            tendencia, risco, dias)
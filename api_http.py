@@ -0,0 +1,464 @@
+# api_http.py
+"""API HTTP/JSON local sobre os serviços do SafeSpace (asyncio, só biblioteca padrão).
+
+Servidor HTTP/1.1 com keep-alive e pipelining (as requisições enviadas em
+sequência numa conexão são respondidas na ordem), paginação por cursor e
+ETag/If-None-Match nos GET: se o cliente já tem a versão atual, recebe
+304 sem corpo. Os handlers chamam services_async, então uma requisição
+esperando o banco não bloqueia as outras, e o excesso de carga vira 503.
+
+Autenticação: POST /sessoes devolve um token (Authorization: Bearer <token>),
+com as mesmas permissões do app: usuário comum, colaborador ou administrador.
+
+    POST   /sessoes                  {"email", "senha"} -> token e dados do usuário
+    DELETE /sessoes                  logout
+    POST   /usuarios                 cadastro de usuário comum {"nome", "email", "senha", "idade"}
+    POST   /humor                    {"sentimento"} registra o humor de hoje
+    GET    /humor/hoje
+    GET    /humor/mensal?ano=&mes=   (colaborador: &usuario_id=)
+    GET    /colaboradores?quantidade=
+    GET    /usuarios?tamanho=&cursor=          colaborador/admin (admin: &tipo=)
+    GET    /usuarios/<id>                      colaborador/admin
+    POST   /admin/usuarios           {"nome", "email", "senha", "idade", "tipo"}
+    PUT    /admin/usuarios/<id>      {"nome", "email", "senha", "idade"} (só os que mudam)
+    DELETE /admin/usuarios/<id>
+
+Exemplo:
+    python api_http.py --porta 8080
+    curl -s -X POST localhost:8080/sessoes -d '{"email": "admin", "senha": "1234"}'
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import secrets
+import time
+from datetime import date
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+
+import database_manager
+import services_async
+from config import TIPO_USUARIO_COMUM, TIPO_COLABORADOR, TIPO_ADMINISTRADOR
+from config import (API_HOST, API_PORTA, API_SESSAO_TTL, API_MAX_CORPO, API_TIMEOUT_OCIOSO,
+                    API_TAMANHO_PAGINA_MAX)
+from validators import validar_nome_completo, validar_email, validar_senha
+
+_MAX_CABECALHO = 16 * 1024
+
+# Mensagens de services.py -> status HTTP
+_STATUS_MENSAGENS = {
+    "Usuário cadastrado com sucesso.": 201,
+    "Email já cadastrado.": 409,
+    "Erro ao cadastrar usuário.": 500,
+    "Usuário não encontrado.": 404,
+    "Este email já está cadastrado para outro usuário.": 409,
+    "Usuário atualizado com sucesso.": 200,
+    "Erro ao atualizar usuário.": 500,
+    "Proibido deletar o usuário 'admin' default.": 403,
+    "Usuário e seus registros de humor excluídos com sucesso.": 200,
+    "Sentimento registrado.": 201,
+    "Humor já registrado hoje.": 409,
+    "Nenhum sentimento fornecido.": 400,
+}
+
+
+class ErroHttp(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+
+
+class Requisicao:
+    def __init__(self, metodo, alvo, versao, cabecalhos, corpo):
+        partes = urlsplit(alvo)
+        self.metodo = metodo
+        self.caminho = partes.path.rstrip("/") or "/"
+        self.consulta = dict(parse_qsl(partes.query))
+        self.versao = versao
+        self.cabecalhos = cabecalhos  # Nomes em minúsculas
+        self.corpo = corpo
+        self.sessao = None
+
+    def json(self):
+        if not self.corpo:
+            return {}
+        try:
+            dados = json.loads(self.corpo)
+        except ValueError:
+            raise ErroHttp(400, "Corpo não é um JSON válido.") from None
+        if not isinstance(dados, dict):
+            raise ErroHttp(400, "O corpo deve ser um objeto JSON.")
+        return dados
+
+    def inteiro(self, nome, padrao=None, minimo=None, maximo=None):
+        valor = self.consulta.get(nome)
+        if valor is None:
+            return padrao
+        try:
+            valor = int(valor)
+        except ValueError:
+            raise ErroHttp(400, f"Parâmetro {nome} deve ser inteiro.") from None
+        if (minimo is not None and valor < minimo) or (maximo is not None and valor > maximo):
+            raise ErroHttp(400, f"Parâmetro {nome} fora do intervalo.")
+        return valor
+
+    @property
+    def manter_conexao(self):
+        conexao = self.cabecalhos.get("connection", "").lower()
+        if self.versao == "HTTP/1.0":
+            return conexao == "keep-alive"
+        return conexao != "close"
+
+
+# --- Sessões (em memória, por processo) ---
+
+_sessoes = {}  # token -> (usuario_id, tipo, expira_em)
+
+
+def _criar_sessao(usuario_id, tipo):
+    agora = time.monotonic()
+    if len(_sessoes) > 10000:  # Limpa as expiradas de vez em quando
+        for token in [t for t, s in _sessoes.items() if s[2] < agora]:
+            del _sessoes[token]
+    token = secrets.token_urlsafe(32)
+    _sessoes[token] = (usuario_id, tipo, agora + API_SESSAO_TTL)
+    return token
+
+
+def _autenticar(requisicao, *tipos):
+    """(usuario_id, tipo) da sessão do token; 401 sem sessão válida, 403 sem permissão."""
+    esquema, _, token = requisicao.cabecalhos.get("authorization", "").partition(" ")
+    sessao = _sessoes.get(token) if esquema.lower() == "bearer" else None
+    if sessao is None or sessao[2] < time.monotonic():
+        _sessoes.pop(token, None)
+        raise ErroHttp(401, "Faça login (POST /sessoes) e envie Authorization: Bearer <token>.")
+    if tipos and sessao[1] not in tipos:
+        raise ErroHttp(403, "Sem permissão para este recurso.")
+    return sessao[0], sessao[1]
+
+
+# --- Conversões ---
+
+def _cursor_para_texto(cursor):
+    return None if cursor is None else base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def _inteiro_json(valor):
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+
+def _texto_para_cursor(texto):
+    """Cursor de _cursor_para_texto -> (valor, id); 400 para qualquer outro formato."""
+    if not texto:
+        return None
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(texto.encode()))
+    except (ValueError, TypeError):
+        cursor = None
+    if not (isinstance(cursor, list) and len(cursor) == 2 and _inteiro_json(cursor[1])
+            and (cursor[0] is None or isinstance(cursor[0], str) or _inteiro_json(cursor[0]))):
+        raise ErroHttp(400, "Cursor inválido.")
+    return tuple(cursor)
+
+
+def _mensagem(mensagem):
+    return _STATUS_MENSAGENS.get(mensagem, 200), {"mensagem": mensagem}
+
+
+def _campos_cadastro(dados, obrigatorios=("nome", "email", "senha")):
+    """{campo: valor} validado dos campos de cadastro presentes em `dados`
+    (nome, email, senha, idade); os de `obrigatorios` são validados mesmo ausentes."""
+    campos = {}
+    if "nome" in dados or "nome" in obrigatorios:
+        campos["nome"] = str(dados.get("nome", "")).strip()
+        if not validar_nome_completo(campos["nome"]):
+            raise ErroHttp(400, "Informe nome e sobrenome.")
+    if "email" in dados or "email" in obrigatorios:
+        campos["email"] = str(dados.get("email", "")).strip()
+        if not validar_email(campos["email"]):
+            raise ErroHttp(400, "Email inválido.")
+    if "senha" in dados or "senha" in obrigatorios:
+        campos["senha"] = str(dados.get("senha", ""))
+        if not validar_senha(campos["senha"]):
+            raise ErroHttp(400, "A senha deve ter letras, números e no mínimo 8 caracteres.")
+    if "idade" in dados:
+        campos["idade"] = dados["idade"]
+        if campos["idade"] is not None and not _inteiro_json(campos["idade"]):
+            raise ErroHttp(400, "Idade deve ser um número inteiro.")
+    return campos
+
+
+def _dados_cadastro(dados):
+    campos = _campos_cadastro(dados)
+    return campos["nome"], campos["email"], campos["senha"], campos.get("idade")
+
+
+# --- Handlers: async (requisicao, **parametros_da_rota) -> (status, corpo) ---
+
+async def criar_sessao(requisicao):
+    dados = requisicao.json()
+    linha = await services_async.autenticar_e_obter_dados_completos(
+        str(dados.get("email", "")), str(dados.get("senha", "")))
+    if not linha:
+        raise ErroHttp(401, "Email ou senha inválidos.")
+    usuario_id, nome, email, _, idade, tipo, respondeu_questionario, pet_sugerido, respondeu_pet = linha
+    return 201, {"token": _criar_sessao(usuario_id, tipo), "expira_em_segundos": API_SESSAO_TTL,
+                 "usuario": {"id": usuario_id, "nome": nome, "email": email, "idade": idade, "tipo": tipo,
+                             "respondeu_questionario": bool(respondeu_questionario),
+                             "pet_sugerido": pet_sugerido, "respondeu_pet": bool(respondeu_pet)}}
+
+
+async def encerrar_sessao(requisicao):
+    _autenticar(requisicao)
+    _sessoes.pop(requisicao.cabecalhos["authorization"].partition(" ")[2], None)
+    return 200, {"mensagem": "Sessão encerrada."}
+
+
+async def cadastrar_usuario(requisicao):
+    nome, email, senha, idade = _dados_cadastro(requisicao.json())
+    return _mensagem(await services_async.registrar_novo_usuario(nome, email, senha, idade, TIPO_USUARIO_COMUM))
+
+
+async def registrar_humor(requisicao):
+    usuario_id, _ = _autenticar(requisicao, TIPO_USUARIO_COMUM)
+    sentimento = str(requisicao.json().get("sentimento", "")).strip()
+    return _mensagem(await services_async.registrar_sentimento_diario(usuario_id, sentimento))
+
+
+async def humor_hoje(requisicao):
+    usuario_id, _ = _autenticar(requisicao, TIPO_USUARIO_COMUM)
+    registro = await services_async.obter_registro_humor_hoje(usuario_id)
+    return 200, {"data": date.today().isoformat(), "sentimento": registro[2] if registro else None}
+
+
+async def humor_mensal(requisicao):
+    usuario_id, tipo = _autenticar(requisicao)
+    if tipo != TIPO_USUARIO_COMUM:  # Colaborador/admin consultam o calendário de um usuário
+        usuario_id = requisicao.inteiro("usuario_id")
+        if usuario_id is None:
+            raise ErroHttp(400, "Informe usuario_id.")
+    hoje = date.today()
+    ano = requisicao.inteiro("ano", hoje.year, 1900, 9999)
+    mes = requisicao.inteiro("mes", hoje.month, 1, 12)
+    dias = await services_async.obter_humor_mensal(usuario_id, ano, mes)
+    return 200, {"usuario_id": usuario_id, "ano": ano, "mes": mes,
+                 "dias": {str(dia): sentimento for dia, sentimento in sorted(dias.items())}}
+
+
+async def listar_colaboradores(requisicao):
+    _autenticar(requisicao)
+    quantidade = requisicao.inteiro("quantidade", 20, 1, 100)
+    colaboradores = await services_async.obter_colaboradores_para_encaminhamento(quantidade)
+    return 200, {"itens": [{"nome": nome, "email": email} for nome, email in colaboradores]}
+
+
+async def listar_usuarios(requisicao):
+    _, tipo = _autenticar(requisicao, TIPO_COLABORADOR, TIPO_ADMINISTRADOR)
+    tamanho = requisicao.inteiro("tamanho", 50, 1, API_TAMANHO_PAGINA_MAX)
+    # Colaborador só vê usuários comuns; admin pode filtrar por tipo (ou ver todos)
+    filtro_tipo = TIPO_USUARIO_COMUM if tipo == TIPO_COLABORADOR else requisicao.inteiro("tipo")
+    linhas, proximo = await services_async.listar_pagina_usuarios_com_resumo(
+        tamanho, _texto_para_cursor(requisicao.consulta.get("cursor")), filtro_tipo)
+    return 200, {"itens": [{"id": l[0], "nome": l[1], "email": l[2], "idade": l[4], "tipo": l[5],
+                            "resumo_humor": l[6]} for l in linhas],
+                 "proximo_cursor": _cursor_para_texto(proximo)}
+
+
+async def detalhar_usuario(requisicao, usuario_id):
+    _autenticar(requisicao, TIPO_COLABORADOR, TIPO_ADMINISTRADOR)
+    dados = await services_async.obter_dados_completos_usuario(usuario_id)
+    if dados is None:
+        raise ErroHttp(404, "Usuário não encontrado.")
+    return 200, {"id": usuario_id, **dados}
+
+
+async def admin_criar_usuario(requisicao):
+    _autenticar(requisicao, TIPO_ADMINISTRADOR)
+    dados = requisicao.json()
+    nome, email, senha, idade = _dados_cadastro(dados)
+    tipo = dados.get("tipo", TIPO_USUARIO_COMUM)
+    if not _inteiro_json(tipo) or tipo not in (TIPO_USUARIO_COMUM, TIPO_COLABORADOR, TIPO_ADMINISTRADOR):
+        raise ErroHttp(400, "Tipo deve ser 1, 2 ou 3.")
+    return _mensagem(await services_async.registrar_novo_usuario(nome, email, senha, idade, tipo))
+
+
+async def admin_atualizar_usuario(requisicao, usuario_id):
+    _autenticar(requisicao, TIPO_ADMINISTRADOR)
+    # Só os campos enviados são validados e alterados (o admin default tem email "admin")
+    campos = _campos_cadastro(requisicao.json(), obrigatorios=())
+    if not campos:
+        raise ErroHttp(400, "Informe ao menos um campo: nome, email, senha ou idade.")
+    return _mensagem(await services_async.atualizar_campos_usuario(usuario_id, campos))
+
+
+async def admin_deletar_usuario(requisicao, usuario_id):
+    _autenticar(requisicao, TIPO_ADMINISTRADOR)
+    status, corpo = _mensagem(await services_async.deletar_usuario_por_id(usuario_id))
+    if status == 200:  # Os tokens do usuário excluído deixam de valer
+        for token in [t for t, s in _sessoes.items() if s[0] == usuario_id]:
+            del _sessoes[token]
+    return status, corpo
+
+
+ROTAS = [
+    ("POST", r"/sessoes", criar_sessao),
+    ("DELETE", r"/sessoes", encerrar_sessao),
+    ("POST", r"/usuarios", cadastrar_usuario),
+    ("POST", r"/humor", registrar_humor),
+    ("GET", r"/humor/hoje", humor_hoje),
+    ("GET", r"/humor/mensal", humor_mensal),
+    ("GET", r"/colaboradores", listar_colaboradores),
+    ("GET", r"/usuarios", listar_usuarios),
+    ("GET", r"/usuarios/(?P<usuario_id>\d+)", detalhar_usuario),
+    ("POST", r"/admin/usuarios", admin_criar_usuario),
+    ("PUT", r"/admin/usuarios/(?P<usuario_id>\d+)", admin_atualizar_usuario),
+    ("DELETE", r"/admin/usuarios/(?P<usuario_id>\d+)", admin_deletar_usuario),
+]
+_ROTAS = [(metodo, re.compile(padrao + "$"), handler) for metodo, padrao, handler in ROTAS]
+
+
+async def processar(requisicao):
+    """Encaminha a requisição para o handler da rota: (status, corpo)."""
+    metodos_do_caminho = []
+    for metodo, padrao, handler in _ROTAS:
+        encontrado = padrao.match(requisicao.caminho)
+        if not encontrado:
+            continue
+        metodos_do_caminho.append(metodo)
+        if metodo == requisicao.metodo or (metodo == "GET" and requisicao.metodo == "HEAD"):
+            parametros = {nome: int(valor) for nome, valor in encontrado.groupdict().items()}
+            return await handler(requisicao, **parametros)
+    if metodos_do_caminho:
+        raise ErroHttp(405, f"Use {', '.join(metodos_do_caminho)}.")
+    raise ErroHttp(404, "Recurso não encontrado.")
+
+
+def _serializar(corpo):
+    return json.dumps(corpo, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def montar_resposta(requisicao, status, corpo, extras=()):
+    """Bytes da resposta HTTP. GET/HEAD com 200 levam ETag (hash do corpo) e
+    viram 304 sem corpo quando o If-None-Match do cliente coincide."""
+    dados = _serializar(corpo)
+    cabecalhos = [("Content-Type", "application/json; charset=utf-8"), *extras]
+    if requisicao is not None and requisicao.metodo in ("GET", "HEAD") and status == 200:
+        etag = '"' + hashlib.blake2b(dados, digest_size=16).hexdigest() + '"'
+        cabecalhos += [("ETag", etag), ("Cache-Control", "private, no-cache")]
+        enviadas = [e.strip() for e in requisicao.cabecalhos.get("if-none-match", "").split(",")]
+        if etag in enviadas or "*" in enviadas:
+            status, dados = 304, b""
+    manter = requisicao is not None and requisicao.manter_conexao
+    cabecalhos += [("Content-Length", str(len(dados)) if status != 304 else None),
+                   ("Connection", "keep-alive" if manter else "close")]
+    linhas = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    linhas += [f"{nome}: {valor}" for nome, valor in cabecalhos if valor is not None]
+    cabeca = ("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1")
+    if status == 304 or (requisicao is not None and requisicao.metodo == "HEAD"):
+        return cabeca
+    return cabeca + dados
+
+
+async def _ler_requisicao(leitor):
+    """Próxima requisição da conexão, ou None se o cliente fechou/ficou ocioso."""
+    try:
+        bruto = await asyncio.wait_for(leitor.readuntil(b"\r\n\r\n"), API_TIMEOUT_OCIOSO)
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise ErroHttp(431, "Cabeçalhos grandes demais.") from None
+    try:
+        linha, *linhas_cabecalho = bruto.decode("latin-1").split("\r\n")
+        metodo, alvo, versao = linha.split(" ")
+    except ValueError:
+        raise ErroHttp(400, "Linha de requisição inválida.") from None
+    if not versao.startswith("HTTP/1."):
+        raise ErroHttp(505, "Só HTTP/1.x é suportado.")
+    cabecalhos = {}
+    for texto in linhas_cabecalho:
+        if texto:
+            nome, _, valor = texto.partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+    if "chunked" in cabecalhos.get("transfer-encoding", "").lower():
+        raise ErroHttp(501, "Envie o corpo com Content-Length.")
+    texto_tamanho = cabecalhos.get("content-length", "0")
+    if not (texto_tamanho.isascii() and texto_tamanho.isdigit()):  # Sem sinal, espaços ou "_"
+        raise ErroHttp(400, "Content-Length inválido.")
+    tamanho = int(texto_tamanho)
+    if tamanho > API_MAX_CORPO:
+        raise ErroHttp(413, f"Corpo maior que {API_MAX_CORPO} bytes.")
+    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+    return Requisicao(metodo.upper(), alvo, versao, cabecalhos, corpo)
+
+
+async def atender_conexao(leitor, escritor):
+    """Atende as requisições de uma conexão em ordem até o cliente fechar,
+    pedir Connection: close ou ficar ocioso por API_TIMEOUT_OCIOSO."""
+    try:
+        while True:
+            try:
+                requisicao = await _ler_requisicao(leitor)
+            except ErroHttp as e:  # Requisição malformada: responde e fecha
+                escritor.write(montar_resposta(None, e.status, {"erro": e.mensagem}))
+                await escritor.drain()
+                break
+            except asyncio.IncompleteReadError:
+                break
+            if requisicao is None:
+                break
+            extras = ()
+            try:
+                status, corpo = await processar(requisicao)
+            except ErroHttp as e:
+                status, corpo = e.status, {"erro": e.mensagem}
+            except services_async.ServicoSobrecarregado as e:
+                status, corpo, extras = 503, {"erro": str(e)}, (("Retry-After", "1"),)
+            except Exception as e:  # Erro inesperado: não derruba a conexão dos outros
+                status, corpo = 500, {"erro": f"Erro interno: {type(e).__name__}"}
+            escritor.write(montar_resposta(requisicao, status, corpo, extras))
+            await escritor.drain()
+            if not requisicao.manter_conexao:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        escritor.close()
+
+
+async def iniciar_servidor(host=API_HOST, porta=API_PORTA):
+    """Inicia o servidor no event loop atual e retorna o asyncio.Server
+    (porta=0 escolhe uma porta livre: servidor.sockets[0].getsockname())."""
+    return await asyncio.start_server(atender_conexao, host, porta, limit=_MAX_CABECALHO)
+
+
+async def _servir(host, porta):
+    servidor = await iniciar_servidor(host, porta)
+    endereco = servidor.sockets[0].getsockname()
+    print(f"API do SafeSpace em http://{endereco[0]}:{endereco[1]} (Ctrl+C para parar)")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="API HTTP/JSON local do SafeSpace.")
+    parser.add_argument("--host", default=API_HOST, help=f"Endereço (padrão: {API_HOST}).")
+    parser.add_argument("--porta", type=int, default=API_PORTA, help=f"Porta (padrão: {API_PORTA}).")
+    parser.add_argument("--banco", help="Arquivo do banco (padrão: DATABASE_NAME do config).")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.banco:
+        database_manager.DATABASE_NAME = args.banco
+    database_manager.criar_tabelas_iniciais()
+    try:
+        asyncio.run(_servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        services_async.encerrar()
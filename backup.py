@@ -0,0 +1,262 @@
+# backup.py
+"""Backup online do banco com a API de backup do SQLite (Connection.backup).
+
+A cópia é feita em passos de BACKUP_PAGINAS_POR_PASSO páginas. O lock de
+leitura do banco só é mantido durante cada passo e, entre um passo e
+outro, há uma pausa de BACKUP_PAUSA_PASSOS segundos, então o app continua
+lendo e gravando durante o backup. Uma escrita de outra conexão faz o
+SQLite reiniciar a cópia; depois de BACKUP_MAX_REINICIOS reinícios o
+backup termina em um passo só, para não ficar preso em um banco movimentado.
+
+A cópia vai para um arquivo .parcial e só ganha o nome final depois de
+passar no integrity_check, então um snapshot no diretório está sempre íntegro.
+A restauração segue a mesma ideia: o backup é copiado e verificado ao lado
+do banco e só então substitui o arquivo (os.replace).
+
+Exemplo (ver manutencao.py):
+    python manutencao.py snapshot --manter 24 --intervalo 3600
+    python manutencao.py restaurar backups/safespace-20240101-030000.db
+"""
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+import database_manager
+from config import (BACKUP_DIRETORIO, BACKUP_PAGINAS_POR_PASSO, BACKUP_PAUSA_PASSOS,
+                    BACKUP_MAX_REINICIOS, BACKUP_RETENCAO, BACKUP_INTERVALO)
+
+PREFIXO_SNAPSHOT = "safespace-"
+PREFIXO_PRE_RESTAURACAO = "pre-restauracao-"  # Fora da retenção: nunca removidos automaticamente
+_FORMATO_DATA = "%Y%m%d-%H%M%S"
+_NOME_SNAPSHOT = re.compile(re.escape(PREFIXO_SNAPSHOT) + r"(\d{8}-\d{6})(?:-(\d+))?\.db$")
+
+
+class BackupInvalido(RuntimeError):
+    """O arquivo de backup não passou na verificação."""
+
+
+class _MuitosReinicios(Exception):
+    pass
+
+
+def _somente_leitura(caminho):
+    return sqlite3.connect(Path(caminho).resolve().as_uri() + "?mode=ro", uri=True)
+
+
+def _copiar(origem, destino, paginas, pausa, max_reinicios, ao_progresso):
+    """origem.backup(destino) em passos, pausando entre eles.
+    Retorna {"passos", "reinicios", "passo_unico"}."""
+    estado = {"passos": 0, "reinicios": 0, "restantes": None, "passo_unico": False}
+
+    def progresso(status, restantes, total):
+        estado["passos"] += 1
+        if estado["restantes"] is not None and restantes > estado["restantes"]:
+            estado["reinicios"] += 1  # Outra conexão gravou: o SQLite recomeçou a cópia
+            if estado["reinicios"] > max_reinicios:
+                raise _MuitosReinicios()
+        estado["restantes"] = restantes
+        if ao_progresso:
+            ao_progresso(total - restantes, total)
+        if restantes and pausa:
+            time.sleep(pausa)  # Sem lock entre os passos
+
+    try:
+        origem.backup(destino, pages=paginas, progress=progresso)
+    except _MuitosReinicios:
+        # Um passo só: mantém o lock de leitura até o fim, mas termina
+        estado["passo_unico"] = True
+        origem.backup(destino, pages=-1)
+    del estado["restantes"]
+    return estado
+
+
+def verificar_backup(caminho):
+    """Roda integrity_check no arquivo (aberto só para leitura) e retorna
+    {"user_version", "tabelas": {tabela: linhas}}. Levanta BackupInvalido."""
+    if not os.path.isfile(caminho):
+        raise BackupInvalido(f"Arquivo não encontrado: {caminho}")
+    try:
+        conn = _somente_leitura(caminho)
+        try:
+            resultado = [linha[0] for linha in conn.execute("PRAGMA integrity_check")]
+            if resultado != ["ok"]:
+                raise BackupInvalido(f"{caminho} corrompido: {'; '.join(resultado[:5])}")
+            tabelas = [nome for (nome,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+            return {
+                "user_version": conn.execute("PRAGMA user_version").fetchone()[0],
+                "tabelas": {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tabelas},
+            }
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:
+        raise BackupInvalido(f"{caminho} não é um banco SQLite válido: {e}") from None
+
+
+def criar_backup(destino, origem=None, paginas=BACKUP_PAGINAS_POR_PASSO, pausa=BACKUP_PAUSA_PASSOS,
+                 max_reinicios=BACKUP_MAX_REINICIOS, ao_progresso=None):
+    """Copia o banco `origem` (padrão: DATABASE_NAME) para `destino` com o app
+    no ar e verifica a cópia. ao_progresso(paginas_copiadas, total) a cada passo.
+    Retorna as métricas: segundos da cópia e da verificação, páginas, bytes,
+    passos, reinícios e se terminou em passo único."""
+    origem = origem or database_manager.DATABASE_NAME
+    pasta = os.path.dirname(destino)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    parcial = destino + ".parcial"
+    if os.path.exists(parcial):
+        os.remove(parcial)
+    inicio = time.perf_counter()
+    try:
+        # Conexão própria (fora do pool): o backup não ocupa uma vaga do app
+        conn_origem = sqlite3.connect(origem)
+        conn_destino = sqlite3.connect(parcial)
+        try:
+            metricas = _copiar(conn_origem, conn_destino, paginas, pausa, max_reinicios, ao_progresso)
+            # A cópia herda o WAL da origem; em DELETE o snapshot é um arquivo só, sem -wal/-shm
+            conn_destino.execute("PRAGMA journal_mode = DELETE")
+            total_paginas = conn_destino.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            conn_destino.close()
+            conn_origem.close()
+        copia = time.perf_counter()
+        verificacao = verificar_backup(parcial)
+        os.replace(parcial, destino)
+    except BaseException:
+        if os.path.exists(parcial):
+            os.remove(parcial)
+        raise
+    fim = time.perf_counter()
+    return {"arquivo": destino, "segundos_copia": round(copia - inicio, 3),
+            "segundos_verificacao": round(fim - copia, 3), "paginas": total_paginas,
+            "bytes": os.path.getsize(destino), "usuarios": verificacao["tabelas"].get("usuarios"),
+            **metricas}
+
+
+def listar_snapshots(diretorio=BACKUP_DIRETORIO):
+    """Snapshots do diretório, do mais antigo para o mais novo."""
+    if not os.path.isdir(diretorio):
+        return []
+    encontrados = []
+    for nome in os.listdir(diretorio):
+        partes = _NOME_SNAPSHOT.match(nome)
+        if partes:  # Ordena pela data e, no mesmo segundo, pelo sufixo -N
+            encontrados.append(((partes[1], int(partes[2] or 0)), os.path.join(diretorio, nome)))
+    return [caminho for _, caminho in sorted(encontrados)]
+
+
+def aplicar_retencao(diretorio=BACKUP_DIRETORIO, manter=BACKUP_RETENCAO):
+    """Remove os snapshots mais antigos, mantendo os `manter` mais novos.
+    Retorna os arquivos removidos."""
+    snapshots = listar_snapshots(diretorio)
+    removidos = snapshots[:max(len(snapshots) - manter, 0)]
+    for caminho in removidos:
+        os.remove(caminho)
+    return removidos
+
+
+def _caminho_novo(diretorio, prefixo):
+    base = os.path.join(diretorio, prefixo + datetime.now().strftime(_FORMATO_DATA))
+    caminho, n = base + ".db", 1
+    while os.path.exists(caminho):  # Dois snapshots no mesmo segundo
+        caminho, n = f"{base}-{n}.db", n + 1
+    return caminho
+
+
+def snapshot(diretorio=BACKUP_DIRETORIO, manter=BACKUP_RETENCAO, **opcoes):
+    """Cria um snapshot com data no nome e aplica a retenção.
+    `opcoes` vão para criar_backup. Retorna as métricas + "removidos"."""
+    metricas = criar_backup(_caminho_novo(diretorio, PREFIXO_SNAPSHOT), **opcoes)
+    metricas["removidos"] = aplicar_retencao(diretorio, manter)
+    return metricas
+
+
+def agendar_snapshots(intervalo=BACKUP_INTERVALO, diretorio=BACKUP_DIRETORIO, manter=BACKUP_RETENCAO,
+                      parar=None, ao_concluir=None, ao_erro=None):
+    """Cria um snapshot a cada `intervalo` segundos até `parar` (threading.Event)
+    ser sinalizado. Pode rodar em uma thread do app ou como processo próprio.
+    ao_concluir(metricas) após cada snapshot; com ao_erro(excecao), uma falha
+    não interrompe o agendamento."""
+    while parar is None or not parar.is_set():
+        inicio = time.monotonic()
+        try:
+            metricas = snapshot(diretorio, manter)
+        except (sqlite3.Error, OSError, BackupInvalido) as e:
+            if ao_erro is None:
+                raise
+            ao_erro(e)
+        else:
+            if ao_concluir:
+                ao_concluir(metricas)
+        espera = max(intervalo - (time.monotonic() - inicio), 0)
+        if parar is None:
+            time.sleep(espera)
+        elif parar.wait(espera):
+            break
+
+
+def _liberar_banco(caminho):
+    """Fecha o pool do app (se for este banco) e leva o WAL para o arquivo
+    principal: depois do os.replace não pode sobrar um -wal do banco antigo."""
+    if os.path.abspath(database_manager.DATABASE_NAME) == os.path.abspath(caminho):
+        database_manager.fechar_pool()
+    if not os.path.exists(caminho):
+        return
+    conn = sqlite3.connect(caminho)
+    try:
+        ocupado = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+    finally:
+        conn.close()  # A última conexão de um banco WAL remove o -wal e o -shm
+    wal = caminho + "-wal"
+    if ocupado or (os.path.exists(wal) and os.path.getsize(wal) > 0):
+        raise sqlite3.OperationalError(f"{caminho} está em uso por outro processo; restauração cancelada.")
+
+
+def restaurar_backup(arquivo, destino=None, salvar_atual=True, diretorio=BACKUP_DIRETORIO):
+    """Restaura `arquivo` sobre o banco `destino` (padrão: DATABASE_NAME).
+
+    O backup é verificado antes (integrity_check e versão de schema que o app
+    conhece); com salvar_atual, o banco atual é copiado antes para
+    pre-restauracao-<data>.db. O backup é copiado para <destino>.restaurando,
+    verificado de novo (contagens de linhas iguais às do backup) e só então
+    substitui o banco com os.replace: se algo falha, o banco atual fica como
+    estava. O pool do app é fechado antes da troca; outros processos usando o
+    banco devem ser parados antes. Retorna as métricas."""
+    destino = destino or database_manager.DATABASE_NAME
+    inicio = time.perf_counter()
+    esperado = verificar_backup(arquivo)
+    versao_app = database_manager.MIGRACOES[-1][0]
+    if esperado["user_version"] > versao_app:
+        raise BackupInvalido(f"Backup na versão de schema {esperado['user_version']}, "
+                             f"mais nova que a deste app ({versao_app}).")
+    copia_atual = None
+    if salvar_atual and os.path.exists(destino):
+        copia_atual = criar_backup(_caminho_novo(diretorio, PREFIXO_PRE_RESTAURACAO), origem=destino)["arquivo"]
+
+    parcial = destino + ".restaurando"
+    if os.path.exists(parcial):
+        os.remove(parcial)
+    try:
+        conn_backup = _somente_leitura(arquivo)
+        conn_parcial = sqlite3.connect(parcial)
+        try:
+            conn_backup.backup(conn_parcial)
+            conn_parcial.execute("PRAGMA journal_mode = DELETE")  # Um arquivo só, como os snapshots
+        finally:
+            conn_parcial.close()
+            conn_backup.close()
+        restaurado = verificar_backup(parcial)
+        if restaurado != esperado:
+            raise BackupInvalido(f"A cópia de {arquivo} difere do backup; o banco atual não foi alterado.")
+        _liberar_banco(destino)
+        os.replace(parcial, destino)
+    except BaseException:
+        if os.path.exists(parcial):
+            os.remove(parcial)
+        raise
+    database_manager.cache_usuarios.limpar()
+    return {"arquivo": arquivo, "destino": destino, "copia_anterior": copia_atual,
+            "segundos": round(time.perf_counter() - inicio, 3), "tabelas": restaurado["tabelas"]}
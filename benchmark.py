@@ -0,0 +1,235 @@
+# benchmark.py
+"""Benchmark da camada DAO/serviços com datasets reprodutíveis.
+
+Gera (ou reaproveita) bancos com 10k, 100k e 1M usuários via
+populate_db.populate_bulk, com o histórico de humor terminando em
+DATA_DATASET (data fixa, não a de hoje), e mede p50/p95/p99 das funções de
+leitura de services.py e do DAO. As funções de escrita (cadastro, humor,
+questionários, atualização e exclusão) são medidas em uma cópia do banco,
+então o dataset continua o mesmo entre execuções. O resultado vai para um
+JSON com chaves ordenadas, pronto para ser comparado (diff) entre commits.
+
+Exemplo:
+    python benchmark.py --tamanhos 10000 100000 --iteracoes 200 --saida bench.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import time
+from datetime import date
+
+import backup
+import database_manager
+import populate_db
+import services
+from config import TIPO_USUARIO_COMUM
+from database_manager import Usuario
+
+PASTA_DADOS = "bench_data"
+TAMANHOS_PADRAO = [10000, 100000, 1000000]
+DATA_DATASET = date(2025, 6, 30)  # Último dia de humor gerado: fixo para os resultados serem reprodutíveis
+
+
+def percentil(amostras_ordenadas, p):
+    """Percentil pelo método nearest-rank (amostras já ordenadas)."""
+    if not amostras_ordenadas:
+        return None
+    indice = max(0, math.ceil(p / 100 * len(amostras_ordenadas)) - 1)
+    return amostras_ordenadas[min(indice, len(amostras_ordenadas) - 1)]
+
+
+def medir(funcao, lista_args):
+    """Executa funcao(*args) para cada args e retorna as estatísticas em ms."""
+    tempos = []
+    for args in lista_args:
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "n": len(tempos),
+        "p50_ms": round(percentil(tempos, 50), 4),
+        "p95_ms": round(percentil(tempos, 95), 4),
+        "p99_ms": round(percentil(tempos, 99), 4),
+        "max_ms": round(tempos[-1], 4),
+    }
+
+
+def usar_banco(caminho):
+    """Aponta database_manager para outro arquivo (o pool é recriado sozinho)."""
+    database_manager.DATABASE_NAME = caminho
+
+
+def preparar_banco(tamanho, dias, seed):
+    """Retorna o caminho de um banco com `tamanho` usuários, gerando-o se preciso."""
+    os.makedirs(PASTA_DADOS, exist_ok=True)
+    caminho = os.path.join(PASTA_DADOS, f"bench_{tamanho}_d{dias}_s{seed}_{DATA_DATASET:%Y%m%d}.db")
+    usar_banco(caminho)
+    if not os.path.exists(caminho):
+        print(f"\nGerando dataset de {tamanho:,} usuários em {caminho}...")
+        populate_db.populate_bulk(tamanho, dias_historico=dias, seed=seed, data_final=DATA_DATASET)
+    else:
+        database_manager.criar_tabelas_iniciais()
+    return caminho
+
+
+def amostrar_entradas(iteracoes, seed):
+    """Sorteia (de forma reprodutível) os ids/credenciais usados nas medições."""
+    rng = random.Random(seed)
+    with database_manager.conectar() as conn:
+        max_id = conn.execute("SELECT MAX(id) FROM usuarios").fetchone()[0]
+        ids = [rng.randint(1, max_id) for _ in range(iteracoes)]
+        credenciais = [conn.execute("SELECT email, senha FROM usuarios WHERE id = ?", (i,)).fetchone()
+                       or ("inexistente@example.com", "x") for i in ids]
+    meses = [(DATA_DATASET.year - (1 if DATA_DATASET.month - k < 1 else 0), (DATA_DATASET.month - k - 1) % 12 + 1)
+             for k in range(3)]
+    return ids, credenciais, [(i, *rng.choice(meses)) for i in ids]
+
+
+def _consumir_dados_completos(ids):
+    for _ in services.obter_dados_completos_usuarios(ids):
+        pass
+
+
+def casos_de_benchmark(iteracoes, seed):
+    """Lista (nome, função, lista de argumentos) para cada ponto medido."""
+    ids, credenciais, ids_meses = amostrar_entradas(iteracoes, seed)
+    # Listagens completas são O(tabela): menos repetições para não dominar o tempo total
+    poucas = max(3, iteracoes // 20)
+    return [
+        ("services.autenticar_e_obter_dados_completos",
+         services.autenticar_e_obter_dados_completos, credenciais),
+        ("services.obter_dados_completos_usuario",
+         services.obter_dados_completos_usuario, [(i,) for i in ids]),
+        # Mesmos ids em lotes de 100: compara o custo por usuário com a versão unitária
+        ("services.obter_dados_completos_usuarios[100]", _consumir_dados_completos,
+         [(ids[k:k + 100],) for k in range(0, len(ids), 100)]),
+        ("services.obter_humor_mensal", services.obter_humor_mensal, ids_meses),
+        ("services.obter_registro_humor_hoje",
+         services.obter_registro_humor_hoje, [(i,) for i in ids]),
+        ("services.obter_colaboradores_para_encaminhamento",
+         services.obter_colaboradores_para_encaminhamento, [()] * poucas),
+        ("Usuario.buscar_usuario_por_id", Usuario.buscar_usuario_por_id, [(i,) for i in ids]),
+        ("Usuario.buscar_usuario_por_email",
+         Usuario.buscar_usuario_por_email, [(e,) for e, _ in credenciais]),
+        ("Usuario.listar_todos_usuarios", Usuario.listar_todos_usuarios, [()] * poucas),
+    ]
+
+
+def casos_de_escrita(iteracoes, seed):
+    """Como casos_de_benchmark, para as funções de escrita de services.py.
+    Cada caso usa ids distintos; a exclusão vem por último."""
+    rng = random.Random(seed + 1)
+    with database_manager.conectar() as conn:
+        max_id = conn.execute("SELECT MAX(id) FROM usuarios").fetchone()[0]
+        ids = rng.sample(range(2, max_id + 1), min(iteracoes, max_id - 1))  # Sem o admin default
+        usuarios = [conn.execute("SELECT id, nome, email, senha, idade FROM usuarios WHERE id = ?", (i,)).fetchone()
+                    for i in ids]
+    bem_estar = [[{"pergunta": pergunta, "resposta": rng.choice(["sim", "não"])}
+                  for pergunta in populate_db.BEM_ESTAR_PERGUNTAS] for _ in ids]
+    pet = []
+    for i in ids:
+        respostas = {c["key"]: rng.randint(c["min"], c["max"]) if c["tipo"] == "int" else rng.choice(c["opcoes"])
+                     for c in populate_db.PET_PERGUNTAS_CONFIG}
+        pet.append((i, respostas, [{"pergunta": k, "resposta": v} for k, v in respostas.items()]))
+    sentimentos = populate_db.HUMOR_SENTIMENTOS
+    return [
+        ("services.registrar_novo_usuario", services.registrar_novo_usuario,
+         [(f"Usuario Benchmark {k}", f"benchmark.{seed}.{k}@example.com", "Senha1234", 30, TIPO_USUARIO_COMUM)
+          for k in range(iteracoes)]),
+        # Datasets terminam em DATA_DATASET: o humor de hoje é sempre um registro novo
+        ("services.registrar_sentimento_diario", services.registrar_sentimento_diario,
+         [(i, rng.choice(sentimentos)) for i in ids]),
+        ("services.processar_questionario_bem_estar", services.processar_questionario_bem_estar,
+         list(zip(ids, bem_estar))),
+        ("services.processar_questionario_pet_e_sugerir", services.processar_questionario_pet_e_sugerir, pet),
+        ("services.atualizar_info_usuario", services.atualizar_info_usuario,
+         [(i, f"{nome} Atualizado", email, senha, (idade or 30) + 1) for i, nome, email, senha, idade in usuarios]),
+        ("services.deletar_usuario_por_id", services.deletar_usuario_por_id, [(i,) for i in ids]),
+    ]
+
+
+def _medir_casos(casos, por_funcao, aquecer=True):
+    for nome, funcao, lista_args in casos:
+        if aquecer:
+            funcao(*lista_args[0])  # Aquecimento (pool e cache de statements)
+        por_funcao[nome] = medir(funcao, lista_args)
+        est = por_funcao[nome]
+        print(f"  {nome:<50} p50={est['p50_ms']:>9.3f}ms  p95={est['p95_ms']:>9.3f}ms  p99={est['p99_ms']:>9.3f}ms")
+
+
+def medir_escritas(origem, iteracoes, seed, por_funcao):
+    """Mede casos_de_escrita em uma cópia de `origem` (o dataset não muda)."""
+    copia = os.path.join(PASTA_DADOS, "bench_escritas.db")
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(copia + sufixo):
+            os.remove(copia + sufixo)
+    database_manager.fechar_pool()
+    backup.criar_backup(copia, origem=origem, pausa=0)
+    usar_banco(copia)
+    try:
+        # Sem aquecimento: repetir a primeira chamada mudaria o caminho medido (email duplicado etc.)
+        _medir_casos(casos_de_escrita(iteracoes, seed), por_funcao, aquecer=False)
+    finally:
+        database_manager.escritor.parar()
+        database_manager.fechar_pool()
+        usar_banco(origem)
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(copia + sufixo):
+                os.remove(copia + sufixo)
+
+
+def commit_atual():
+    """Hash curto do commit do checkout (None fora de um repositório git)."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(tamanhos, dias, seed, iteracoes):
+    resultado = {
+        "commit": commit_atual(),
+        "data_dataset": DATA_DATASET.isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "seed": seed,
+        "dias_historico": dias,
+        "iteracoes": iteracoes,
+        "resultados": {},
+    }
+    for tamanho in tamanhos:
+        caminho = preparar_banco(tamanho, dias, seed)
+        print(f"\n--- {tamanho:,} usuários ---")
+        por_funcao = {}
+        _medir_casos(casos_de_benchmark(iteracoes, seed), por_funcao)
+        medir_escritas(caminho, iteracoes, seed, por_funcao)
+        resultado["resultados"][str(tamanho)] = por_funcao
+    database_manager.fechar_pool()
+    return resultado
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark da camada DAO/serviços do SafeSpace.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO,
+                        help="Quantidades de usuários dos datasets (padrão: 10000 100000 1000000).")
+    parser.add_argument("--dias", type=int, default=60, help="Dias de histórico de humor (padrão: 60).")
+    parser.add_argument("--seed", type=int, default=42, help="Semente dos datasets e amostras (padrão: 42).")
+    parser.add_argument("--iteracoes", type=int, default=200, help="Chamadas por função (padrão: 200).")
+    parser.add_argument("--saida", default="bench_resultados.json", help="Arquivo JSON de saída.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    dados = executar(args.tamanhos, args.dias, args.seed, args.iteracoes)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+    print(f"\nResultados salvos em {args.saida}")
@@ -0,0 +1,175 @@
+# benchmark_concorrencia.py
+"""Benchmark de leitura/escrita concorrente entre processos, por perfil de PRAGMAs.
+
+Simula várias instâncias do app sobre o mesmo arquivo: processos leitores
+(páginas da listagem e dados completos de usuários) e processos escritores
+(humor diário), cada um com --threads threads, rodam ao mesmo tempo por
+alguns segundos, uma vez para cada perfil de config.SQLITE_PERFIS e modo de
+escrita ("direta": um commit por escrita; "agrupada": EscritorAgrupado).
+Mede operações/s, p50/p99, commits/s e quantas operações falharam com
+"database is locked".
+
+Exemplo:
+    python benchmark_concorrencia.py --tamanho 100000 --leitores 4 --escritores 2 --threads 8 --segundos 10
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+import backup
+import database_manager
+import services
+from benchmark import PASTA_DADOS, percentil, preparar_banco
+from config import SQLITE_PERFIS
+from database_manager import Usuario, HumorDiarioDAO
+
+MODOS_ESCRITA = ("direta", "agrupada")
+SENTIMENTOS = ("Feliz", "Triste", "Ansioso(a)", "Contente", "Cansado(a)", "Estressado(a)")
+_PRIMEIRO_DIA = date(2000, 1, 1)  # Escritas em dias antigos: quase sempre um registro novo
+
+
+def _ler(rng, max_id):
+    if rng.random() < 0.5:
+        Usuario.listar_usuarios_paginado(
+            "nome", tamanho_pagina=50, cursor_pagina=(f"Usuario {rng.randint(1, max_id)}", 0))
+    else:
+        services.obter_dados_completos_usuario(rng.randint(1, max_id))
+
+
+def _escrever(rng, max_id):
+    HumorDiarioDAO.inserir_humor_diario_se_ausente(
+        rng.randint(1, max_id), _PRIMEIRO_DIA + timedelta(days=rng.randrange(7000)), rng.choice(SENTIMENTOS))
+
+
+def _repetir(operacao, rng, max_id, fim, tempos, erros):
+    while time.perf_counter() < fim:
+        t0 = time.perf_counter()
+        try:
+            operacao(rng, max_id)
+        except sqlite3.OperationalError:  # "database is locked"
+            erros.append(1)
+            continue
+        tempos.append((time.perf_counter() - t0) * 1000)
+
+
+def _trabalhador(caminho, perfil, agrupada, papel, threads, seed, max_id, inicio, segundos, resultados):
+    """Processo: `threads` threads repetem a operação do papel até o prazo;
+    envia (papel, tempos_ms, erros, commits)."""
+    database_manager.DATABASE_NAME = caminho
+    database_manager.SQLITE_PERFIL = perfil
+    database_manager.ESCRITOR_AGRUPADO = agrupada
+    operacao = _ler if papel == "leitura" else _escrever
+    tempos, erros = [], []
+    try:
+        with database_manager.conectar():
+            pass  # Abre a conexão (e aplica os PRAGMAs) antes da largada
+        inicio.wait()
+        fim = time.perf_counter() + segundos
+        grupo = [threading.Thread(target=_repetir,
+                                  args=(operacao, random.Random(seed * 1000 + i), max_id, fim, tempos, erros))
+                 for i in range(threads)]
+        for thread in grupo:
+            thread.start()
+        for thread in grupo:
+            thread.join()
+        database_manager.escritor.parar()
+        database_manager.fechar_pool()
+    finally:
+        # Mesmo se o processo falhar: o pai não fica esperando
+        commits = database_manager.escritor.commits if agrupada else len(tempos)
+        resultados.put((papel, tempos, len(erros), commits if papel == "escrita" else 0))
+
+
+def _estatisticas(tempos, erros, commits, segundos):
+    tempos.sort()
+    return {
+        "commits_por_segundo": round(commits / segundos, 1),
+        "operacoes": len(tempos),
+        "ops_por_segundo": round(len(tempos) / segundos, 1),
+        "p50_ms": round(percentil(tempos, 50), 3) if tempos else None,
+        "p99_ms": round(percentil(tempos, 99), 3) if tempos else None,
+        "max_ms": round(tempos[-1], 3) if tempos else None,
+        "erros_lock": erros,
+    }
+
+
+def medir_perfil(origem, perfil, modo_escrita, leitores, escritores, threads, segundos, seed):
+    """Roda a carga sobre uma cópia nova de `origem` com o perfil e o modo de escrita informados."""
+    caminho = os.path.join(PASTA_DADOS, f"concorrencia_{perfil}_{modo_escrita}.db")
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+    backup.criar_backup(caminho, origem=origem, pausa=0)
+    # Troca o journal_mode aqui, com o banco ainda sem outros processos
+    pool = database_manager.PoolConexoes(caminho, perfil=perfil)
+    conn = pool.emprestar()
+    max_id = conn.execute("SELECT MAX(id) FROM usuarios").fetchone()[0]
+    pool.devolver(conn)
+    pool.fechar()
+
+    contexto = multiprocessing.get_context("spawn")
+    inicio, resultados = contexto.Event(), contexto.Queue()
+    papeis = ["leitura"] * leitores + ["escrita"] * escritores
+    processos = [contexto.Process(target=_trabalhador,
+                                  args=(caminho, perfil, modo_escrita == "agrupada", papel, threads,
+                                        seed + i, max_id, inicio, segundos, resultados))
+                 for i, papel in enumerate(papeis)]
+    for processo in processos:
+        processo.start()
+    time.sleep(1.0)  # Tempo para os processos importarem os módulos e abrirem o banco
+    inicio.set()
+    por_papel = {"leitura": ([], 0, 0), "escrita": ([], 0, 0)}
+    for _ in processos:
+        papel, tempos, erros, commits = resultados.get()
+        acumulado, total_erros, total_commits = por_papel[papel]
+        por_papel[papel] = (acumulado + tempos, total_erros + erros, total_commits + commits)
+    for processo in processos:
+        processo.join()
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+    return {papel: _estatisticas(tempos, erros, commits, segundos)
+            for papel, (tempos, erros, commits) in por_papel.items()}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de concorrência entre processos do SafeSpace.")
+    parser.add_argument("--tamanho", type=int, default=100000, help="Usuários do dataset (padrão: 100000).")
+    parser.add_argument("--dias", type=int, default=60, help="Dias de histórico de humor (padrão: 60).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--leitores", type=int, default=4, help="Processos leitores (padrão: 4).")
+    parser.add_argument("--escritores", type=int, default=2, help="Processos escritores (padrão: 2).")
+    parser.add_argument("--threads", type=int, default=1, help="Threads por processo (padrão: 1).")
+    parser.add_argument("--segundos", type=float, default=10.0, help="Duração da carga por perfil.")
+    parser.add_argument("--perfis", nargs="+", choices=list(SQLITE_PERFIS), default=list(SQLITE_PERFIS))
+    parser.add_argument("--modos-escrita", nargs="+", choices=MODOS_ESCRITA, default=list(MODOS_ESCRITA))
+    parser.add_argument("--saida", default="bench_concorrencia.json", help="Arquivo JSON de saída.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    origem = preparar_banco(args.tamanho, args.dias, args.seed)
+    database_manager.fechar_pool()
+    dados = {"sqlite": sqlite3.sqlite_version, "tamanho": args.tamanho, "leitores": args.leitores,
+             "escritores": args.escritores, "threads": args.threads, "segundos": args.segundos, "perfis": {}}
+    for perfil in args.perfis:
+        for modo in args.modos_escrita:
+            print(f"\n--- perfil {perfil}, escrita {modo} ({args.leitores} leitores, {args.escritores} escritores, "
+                  f"{args.threads} thread(s) cada, {args.segundos:g}s) ---")
+            dados["perfis"][f"{perfil}/{modo}"] = resultado = medir_perfil(
+                origem, perfil, modo, args.leitores, args.escritores, args.threads, args.segundos, args.seed)
+            for papel, est in resultado.items():
+                commits = f"  commits={est['commits_por_segundo']:,.1f}/s" if papel == "escrita" else ""
+                print(f"  {papel:<8} {est['ops_por_segundo']:>9,.1f} ops/s  p50={est['p50_ms']}ms  "
+                      f"p99={est['p99_ms']}ms  max={est['max_ms']}ms  erros de lock={est['erros_lock']}{commits}")
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+    print(f"\nResultados salvos em {args.saida}")
@@ -0,0 +1,99 @@
+# cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Cache em memória com descarte LRU e expiração por TTL, seguro entre threads.
+    Guarda contadores de acertos/falhas para medir a eficácia do cache.
+
+    Toda invalidação avança uma geração global; obter_ou_carregar só guarda o
+    valor carregado se nenhuma invalidação aconteceu durante carregar(), para
+    que uma leitura anterior a uma escrita não volte ao cache depois dela."""
+
+    def __init__(self, capacidade, ttl_segundos):
+        self.capacidade = capacidade
+        self.ttl = ttl_segundos
+        self._itens = OrderedDict()  # chave -> (expira_em, valor)
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.expirados = 0
+        self.descartados = 0
+        self.carregamentos_descartados = 0
+        self._geracao = 0
+
+    def obter(self, chave):
+        """Retorna (True, valor) se a chave está no cache e válida, senão (False, None)."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                if item[0] > time.monotonic():
+                    self._itens.move_to_end(chave)
+                    self.acertos += 1
+                    return True, item[1]
+                del self._itens[chave]
+                self.expirados += 1
+            self.falhas += 1
+            return False, None
+
+    def guardar(self, chave, valor, geracao=None):
+        """Guarda o valor. Com `geracao` (de geracao_atual()), não guarda se
+        houve invalidação depois dela; retorna se guardou."""
+        with self._lock:
+            if geracao is not None and geracao != self._geracao:
+                self.carregamentos_descartados += 1
+                return False
+            self._itens[chave] = (time.monotonic() + self.ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+                self.descartados += 1
+            return True
+
+    def geracao_atual(self):
+        with self._lock:
+            return self._geracao
+
+    def obter_ou_carregar(self, chave, carregar):
+        """Read-through: devolve o valor em cache ou chama carregar() e guarda o
+        resultado (inclusive None, para lembrar que a chave não existe)."""
+        geracao = self.geracao_atual()  # Antes da consulta: uma invalidação no meio a torna obsoleta
+        encontrado, valor = self.obter(chave)
+        if encontrado:
+            return valor
+        valor = carregar()
+        self.guardar(chave, valor, geracao)
+        return valor
+
+    def invalidar(self, *chaves):
+        with self._lock:
+            self._geracao += 1
+            for chave in chaves:
+                self._itens.pop(chave, None)
+
+    def invalidar_se(self, predicado):
+        """Remove as entradas em que predicado(chave, valor) é verdadeiro."""
+        with self._lock:
+            self._geracao += 1
+            for chave in [c for c, (_, v) in self._itens.items() if predicado(c, v)]:
+                del self._itens[chave]
+
+    def limpar(self):
+        with self._lock:
+            self._geracao += 1
+            self._itens.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "itens": len(self._itens),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+                "expirados": self.expirados,
+                "descartados": self.descartados,
+                "carregamentos_descartados": self.carregamentos_descartados,
+            }
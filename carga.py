@@ -0,0 +1,449 @@
+# carga.py
+"""Gerador de carga: usuários virtuais repetindo sessões reais do SafeSpace.
+
+Cada sessão segue o fluxo de um tipo de usuário, chamando services.py como
+o app faz:
+    comum        login, registra o humor do dia e abre o calendário de 1 a 3 meses
+    colaborador  login, lista de colaboradores e abre os dados completos
+                 (e o calendário) de 1 a 4 usuários
+    admin        login e 1 a 3 páginas da listagem de usuários com resumo
+A proporção entre os tipos vem de --mix e, entre um passo e outro, o
+usuário "pensa" por um tempo exponencial de média --pensar ms.
+
+Chegada das sessões:
+    --taxa 0 (padrão)  modelo fechado: N usuários virtuais, cada um começa
+                       outra sessão assim que termina a anterior
+    --taxa R           modelo aberto: sessões chegam por um processo de
+                       Poisson de R sessões/s e N usuários virtuais as
+                       atendem. O atraso entre a chegada e o início da sessão
+                       é medido (carga acima da capacidade aparece nele, e
+                       não só como latência menor), e as sessões que ainda
+                       estão na fila ao fim do teste contam como descartadas.
+--modo processos divide os usuários virtuais em --processos processos (como
+várias instâncias do app sobre o mesmo arquivo); --modo threads roda todos
+em um processo.
+
+A carga roda sobre uma cópia nova do banco, então cada execução parte do
+mesmo estado. O JSON de saída tem os parâmetros, o ambiente e, por
+operação, ops/s, p50/p95/p99/max, um histograma com limites fixos
+(LIMITES_HISTOGRAMA_MS) e os erros de "database is locked"; --comparar
+mostra a diferença para uma execução anterior.
+
+Exemplo:
+    python carga.py --tamanho 100000 --usuarios-virtuais 64 --taxa 200 --segundos 30 --saida carga.json
+    python carga.py --tamanho 100000 --usuarios-virtuais 64 --taxa 200 --modo processos --comparar carga.json
+"""
+import argparse
+import bisect
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+import backup
+import database_manager
+import services
+from benchmark import DATA_DATASET, PASTA_DADOS, commit_atual, percentil, preparar_banco
+from config import TIPO_USUARIO_COMUM, TIPO_COLABORADOR, TIPO_ADMINISTRADOR, SQLITE_PERFIL
+from config import SENTIMENTOS_POSITIVOS, SENTIMENTOS_NEGATIVOS
+
+TIPOS_SESSAO = ("comum", "colaborador", "admin")
+OPERACOES = ("login", "registrar_sentimento", "humor_mensal", "listar_colaboradores",
+             "dados_completos_usuario", "listar_usuarios")
+SENTIMENTOS = SENTIMENTOS_POSITIVOS + SENTIMENTOS_NEGATIVOS  # Os mesmos do app
+LIMITES_HISTOGRAMA_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+_AMOSTRA_CREDENCIAIS = 2000  # Usuários sorteados por tipo
+
+
+class _Medidor:
+    """Tempos (ms) e erros por operação de um usuário virtual."""
+
+    def __init__(self):
+        self.tempos = {op: [] for op in OPERACOES}
+        self.erros_lock = dict.fromkeys(OPERACOES, 0)
+        self.erros_outros = {}
+        self.sessoes = dict.fromkeys(TIPOS_SESSAO, 0)
+        self.atrasos_inicio = []
+        self.descartadas = 0
+
+    def medir(self, operacao, funcao, *args):
+        inicio = time.perf_counter()
+        try:
+            resultado = funcao(*args)
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                self.erros_lock[operacao] += 1
+            else:
+                self._erro(operacao, e)
+            return None
+        except Exception as e:  # Conta e segue: um erro não derruba o usuário virtual
+            self._erro(operacao, e)
+            return None
+        self.tempos[operacao].append((time.perf_counter() - inicio) * 1000)
+        return resultado
+
+    def _erro(self, operacao, erro):
+        chave = f"{operacao}: {type(erro).__name__}"
+        self.erros_outros[chave] = self.erros_outros.get(chave, 0) + 1
+
+    def como_dict(self):
+        return {"tempos": self.tempos, "erros_lock": self.erros_lock, "erros_outros": self.erros_outros,
+                "sessoes": self.sessoes, "atrasos_inicio": self.atrasos_inicio, "descartadas": self.descartadas}
+
+
+# --- Sessões ---
+
+def _mes_recente(rng, hoje, meses_atras):
+    total = hoje.year * 12 + hoje.month - 1 - meses_atras - rng.randrange(2)
+    return total // 12, total % 12 + 1
+
+
+def _sessao_comum(medidor, rng, credenciais, pensar):
+    usuario_id, email, senha = rng.choice(credenciais[TIPO_USUARIO_COMUM])
+    medidor.medir("login", services.autenticar_e_obter_dados_completos, email, senha)
+    pensar()
+    medidor.medir("registrar_sentimento", services.registrar_sentimento_diario, usuario_id, rng.choice(SENTIMENTOS))
+    hoje = DATA_DATASET  # Fim do histórico do dataset
+    for meses_atras in range(rng.randint(1, 3)):  # Mês atual e, às vezes, os anteriores
+        pensar()
+        medidor.medir("humor_mensal", services.obter_humor_mensal, usuario_id, *_mes_recente(rng, hoje, meses_atras))
+
+
+def _sessao_colaborador(medidor, rng, credenciais, pensar):
+    _, email, senha = rng.choice(credenciais[TIPO_COLABORADOR])
+    medidor.medir("login", services.autenticar_e_obter_dados_completos, email, senha)
+    pensar()
+    medidor.medir("listar_colaboradores", services.obter_colaboradores_para_encaminhamento)
+    hoje = DATA_DATASET  # Fim do histórico do dataset
+    for _ in range(rng.randint(1, 4)):
+        usuario_id = rng.choice(credenciais[TIPO_USUARIO_COMUM])[0]
+        pensar()
+        medidor.medir("dados_completos_usuario", services.obter_dados_completos_usuario, usuario_id)
+        if rng.random() < 0.5:
+            pensar()
+            medidor.medir("humor_mensal", services.obter_humor_mensal, usuario_id, *_mes_recente(rng, hoje, 0))
+
+
+def _sessao_admin(medidor, rng, credenciais, pensar):
+    _, email, senha = rng.choice(credenciais[TIPO_ADMINISTRADOR])
+    medidor.medir("login", services.autenticar_e_obter_dados_completos, email, senha)
+    # Começa em um ponto qualquer da lista (como quem já navegou algumas páginas)
+    cursor_pagina = (None, rng.randint(0, credenciais["max_id"]))
+    tipo_usuario = rng.choice((None, TIPO_USUARIO_COMUM))
+    for _ in range(rng.randint(1, 3)):
+        pensar()
+        pagina = medidor.medir("listar_usuarios", services.listar_pagina_usuarios_com_resumo,
+                               50, cursor_pagina, tipo_usuario)
+        if not pagina or pagina[1] is None:
+            break
+        cursor_pagina = pagina[1]
+
+
+_SESSOES = {"comum": _sessao_comum, "colaborador": _sessao_colaborador, "admin": _sessao_admin}
+
+
+# --- Execução ---
+
+def _usuario_virtual(medidor, rng, credenciais, mix, pensar_ms, fim, chegadas):
+    """Repete sessões até `fim` (modelo fechado) ou atende as chegadas da fila (aberto)."""
+    tipos, pesos = zip(*mix.items())
+
+    def pensar():
+        if pensar_ms:
+            time.sleep(rng.expovariate(1000 / pensar_ms))
+
+    while True:
+        if chegadas is None:
+            if time.perf_counter() >= fim:
+                return
+        else:
+            chegada = chegadas.get()
+            if chegada is None:
+                return
+            agora = time.perf_counter()
+            if agora >= fim:  # Ficou na fila até o fim do teste
+                medidor.descartadas += 1
+                continue
+            medidor.atrasos_inicio.append((agora - chegada) * 1000)
+        tipo = rng.choices(tipos, pesos)[0]
+        _SESSOES[tipo](medidor, rng, credenciais, pensar)
+        medidor.sessoes[tipo] += 1
+
+
+def _gerar_chegadas(taxa, fim, chegadas, rng, consumidores):
+    """Coloca na fila o instante de chegada de cada sessão (Poisson de `taxa`/s)."""
+    proxima = time.perf_counter()
+    while True:
+        proxima += rng.expovariate(taxa)
+        if proxima >= fim:
+            break
+        espera = proxima - time.perf_counter()
+        if espera > 0:
+            time.sleep(espera)
+        chegadas.put(proxima)
+    for _ in range(consumidores):
+        chegadas.put(None)
+
+
+def executar_carga(credenciais, usuarios_virtuais, taxa, mix, pensar_ms, segundos, seed, inicio=None):
+    """Roda a carga neste processo com `usuarios_virtuais` threads e
+    retorna os medidores somados (como dict) e a duração real."""
+    with database_manager.conectar():
+        pass  # Abre o pool (e aplica os PRAGMAs) antes da largada
+    if inicio is not None:
+        inicio.wait()
+    comeco = time.perf_counter()
+    fim = comeco + segundos
+    chegadas = queue.SimpleQueue() if taxa else None
+    medidores = [_Medidor() for _ in range(usuarios_virtuais)]
+    grupo = [threading.Thread(target=_usuario_virtual,
+                              args=(m, random.Random(seed * 1000 + i), credenciais, mix, pensar_ms, fim, chegadas))
+             for i, m in enumerate(medidores)]
+    if taxa:
+        grupo.append(threading.Thread(target=_gerar_chegadas,
+                                      args=(taxa, fim, chegadas, random.Random(seed), usuarios_virtuais)))
+    for thread in grupo:
+        thread.start()
+    for thread in grupo:
+        thread.join()
+    duracao = time.perf_counter() - comeco
+    return _somar([m.como_dict() for m in medidores]), duracao
+
+
+def _somar(parciais):
+    total = _Medidor().como_dict()
+    for parcial in parciais:
+        for op in OPERACOES:
+            total["tempos"][op].extend(parcial["tempos"][op])
+            total["erros_lock"][op] += parcial["erros_lock"][op]
+        for chave, n in parcial["erros_outros"].items():
+            total["erros_outros"][chave] = total["erros_outros"].get(chave, 0) + n
+        for tipo in TIPOS_SESSAO:
+            total["sessoes"][tipo] += parcial["sessoes"][tipo]
+        total["atrasos_inicio"].extend(parcial["atrasos_inicio"])
+        total["descartadas"] += parcial["descartadas"]
+    return total
+
+
+def _processo(caminho, agrupada, credenciais, usuarios_virtuais, taxa, mix, pensar_ms, segundos, seed,
+              inicio, resultados):
+    database_manager.DATABASE_NAME = caminho
+    database_manager.ESCRITOR_AGRUPADO = agrupada
+    resultado = None
+    try:
+        resultado = executar_carga(credenciais, usuarios_virtuais, taxa, mix, pensar_ms, segundos, seed, inicio)
+        database_manager.escritor.parar()
+        database_manager.fechar_pool()
+    finally:
+        # Mesmo se o processo falhar: o pai não fica esperando
+        resultados.put(resultado)
+
+
+def executar_processos(caminho, processos, credenciais, usuarios_virtuais, taxa, mix, pensar_ms, segundos, seed):
+    """Divide usuários virtuais e taxa entre `processos` processos (spawn)."""
+    contexto = multiprocessing.get_context("spawn")
+    inicio, resultados = contexto.Event(), contexto.Queue()
+    filhos = [contexto.Process(target=_processo,
+                               args=(caminho, database_manager.ESCRITOR_AGRUPADO, credenciais,
+                                     usuarios_virtuais // processos + (i < usuarios_virtuais % processos),
+                                     taxa / processos, mix, pensar_ms, segundos, seed + i, inicio, resultados))
+              for i in range(processos)]
+    for filho in filhos:
+        filho.start()
+    time.sleep(1.0)  # Tempo para os processos importarem os módulos e abrirem o banco
+    inicio.set()
+    parciais = [resultados.get() for _ in filhos]
+    for filho in filhos:
+        filho.join()
+    if None in parciais:
+        raise RuntimeError("Um dos processos de carga falhou (ver o erro acima).")
+    return _somar([p for p, _ in parciais]), max(d for _, d in parciais)
+
+
+def amostrar_credenciais(seed):
+    """(id, email, senha) sorteados por tipo de usuário, e o maior id."""
+    rng = random.Random(seed)
+    credenciais = {}
+    with database_manager.conectar() as conn:
+        for tipo in (TIPO_USUARIO_COMUM, TIPO_COLABORADOR, TIPO_ADMINISTRADOR):
+            ids = [i for (i,) in conn.execute("SELECT id FROM usuarios WHERE type = ? ORDER BY id", (tipo,))]
+            ids = rng.sample(ids, min(len(ids), _AMOSTRA_CREDENCIAIS))
+            credenciais[tipo] = [conn.execute("SELECT id, email, senha FROM usuarios WHERE id = ?", (i,)).fetchone()
+                                 for i in ids]
+        credenciais["max_id"] = conn.execute("SELECT MAX(id) FROM usuarios").fetchone()[0]
+    return credenciais
+
+
+def _histograma(tempos):
+    """Contagens por faixa: contagens[i] tem os tempos <= LIMITES_HISTOGRAMA_MS[i]
+    (e acima do limite anterior); a última faixa, os acima do maior limite."""
+    contagens = [0] * (len(LIMITES_HISTOGRAMA_MS) + 1)
+    for t in tempos:
+        contagens[bisect.bisect_left(LIMITES_HISTOGRAMA_MS, t)] += 1
+    return contagens
+
+
+def _arredondar(valor):
+    return round(valor, 3) if valor is not None else None
+
+
+def _estatisticas(tempos, duracao):
+    tempos.sort()
+    return {
+        "n": len(tempos),
+        "ops_por_segundo": round(len(tempos) / duracao, 1),
+        "p50_ms": _arredondar(percentil(tempos, 50)),
+        "p95_ms": _arredondar(percentil(tempos, 95)),
+        "p99_ms": _arredondar(percentil(tempos, 99)),
+        "max_ms": _arredondar(tempos[-1] if tempos else None),
+    }
+
+
+def resumir(total, duracao):
+    """Estatísticas por operação, no total e das sessões."""
+    operacoes = {}
+    for op in OPERACOES:
+        operacoes[op] = {**_estatisticas(total["tempos"][op], duracao),
+                         "histograma": _histograma(total["tempos"][op]), "erros_lock": total["erros_lock"][op]}
+    todos = [t for op in OPERACOES for t in total["tempos"][op]]
+    return {
+        "duracao_segundos": round(duracao, 3),
+        "operacoes": operacoes,
+        "total": {**_estatisticas(todos, duracao), "histograma": _histograma(todos),
+                  "erros_lock": sum(total["erros_lock"].values())},
+        "erros_outros": total["erros_outros"],
+        "sessoes": {"concluidas": total["sessoes"], "por_segundo": round(sum(total["sessoes"].values()) / duracao, 1),
+                    "descartadas": total["descartadas"],
+                    "atraso_inicio": _estatisticas(total["atrasos_inicio"], duracao)},
+    }
+
+
+def comparar(anterior, atual):
+    """Imprime ops/s e p99 de cada operação contra uma execução anterior."""
+    def variacao(antes, depois):
+        return f"{(depois - antes) / antes * 100:+.1f}%" if antes and depois is not None else "  -  "
+
+    if anterior.get("parametros") != atual["parametros"]:
+        print("  (atenção: parâmetros diferentes da execução anterior)")
+    print(f"  {'operação':<26} {'ops/s antes':>12} {'depois':>10} {'var':>8}   {'p99 antes':>10} {'depois':>10} {'var':>8}")
+    for op in (*OPERACOES, "total"):
+        antes = anterior["operacoes"].get(op) if op != "total" else anterior["total"]
+        depois = atual["operacoes"][op] if op != "total" else atual["total"]
+        if not antes:
+            continue
+        print(f"  {op:<26} {antes['ops_por_segundo']:>12,.1f} {depois['ops_por_segundo']:>10,.1f} "
+              f"{variacao(antes['ops_por_segundo'], depois['ops_por_segundo']):>8}   "
+              f"{antes['p99_ms'] or 0:>10.3f} {depois['p99_ms'] or 0:>10.3f} "
+              f"{variacao(antes['p99_ms'], depois['p99_ms']):>8}")
+
+
+def _mix(texto):
+    mix = {}
+    for parte in texto.split(","):
+        tipo, _, peso = parte.partition("=")
+        if tipo not in TIPOS_SESSAO:
+            raise argparse.ArgumentTypeError(f"Tipo de sessão inválido: {tipo} (use {', '.join(TIPOS_SESSAO)}).")
+        try:
+            mix[tipo] = float(peso)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Peso inválido para {tipo}: {peso}") from None
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("O mix precisa de pelo menos um peso positivo.")
+    return {tipo: peso for tipo, peso in mix.items() if peso > 0}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Gerador de carga com usuários virtuais do SafeSpace.")
+    parser.add_argument("--tamanho", type=int, default=100000, help="Usuários do dataset (padrão: 100000).")
+    parser.add_argument("--dias", type=int, default=60, help="Dias de histórico de humor (padrão: 60).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--usuarios-virtuais", type=int, default=32, help="Usuários simultâneos (padrão: 32).")
+    parser.add_argument("--taxa", type=float, default=0.0,
+                        help="Sessões novas por segundo (Poisson); 0 = modelo fechado (padrão).")
+    parser.add_argument("--mix", type=_mix, default="comum=80,colaborador=15,admin=5",
+                        help="Peso de cada tipo de sessão (padrão: comum=80,colaborador=15,admin=5).")
+    parser.add_argument("--pensar", type=float, default=100.0,
+                        help="Tempo médio (ms) entre os passos de uma sessão (padrão: 100).")
+    parser.add_argument("--segundos", type=float, default=30.0, help="Duração da carga (padrão: 30).")
+    parser.add_argument("--modo", choices=("threads", "processos"), default="threads")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 2,
+                        help="Processos no modo processos (padrão: número de CPUs).")
+    parser.add_argument("--saida", default="carga.json", help="Arquivo JSON de saída.")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.usuarios_virtuais < 1 or (args.modo == "processos" and args.processos > args.usuarios_virtuais):
+        raise SystemExit("Use pelo menos um usuário virtual por processo.")
+    anterior = None
+    if args.comparar:  # Lido antes: --saida pode ser o mesmo arquivo
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+
+    origem = preparar_banco(args.tamanho, args.dias, args.seed)
+    database_manager.fechar_pool()
+    caminho = os.path.join(PASTA_DADOS, "carga.db")
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+    backup.criar_backup(caminho, origem=origem, pausa=0)
+    database_manager.DATABASE_NAME = caminho
+    credenciais = amostrar_credenciais(args.seed)
+    if not all(credenciais[tipo] for tipo, sessao in
+               ((TIPO_USUARIO_COMUM, "comum"), (TIPO_COLABORADOR, "colaborador"),
+                (TIPO_ADMINISTRADOR, "admin")) if sessao in args.mix):
+        raise SystemExit("O banco não tem usuários de todos os tipos do mix.")
+
+    print(f"Carga: {args.usuarios_virtuais} usuários virtuais, "
+          f"{'modelo fechado' if not args.taxa else f'{args.taxa:g} sessões/s'}, modo {args.modo}, "
+          f"{args.segundos:g}s sobre {args.tamanho:,} usuários...")
+    if args.modo == "processos":
+        database_manager.fechar_pool()  # Os processos abrem as próprias conexões
+        total, duracao = executar_processos(caminho, args.processos, credenciais, args.usuarios_virtuais,
+                                            args.taxa, args.mix, args.pensar, args.segundos, args.seed)
+    else:
+        total, duracao = executar_carga(credenciais, args.usuarios_virtuais, args.taxa, args.mix,
+                                        args.pensar, args.segundos, args.seed)
+        database_manager.escritor.parar()
+        database_manager.fechar_pool()
+
+    parametros = {chave: valor for chave, valor in vars(args).items() if chave not in ("saida", "comparar")}
+    if args.modo == "threads":
+        del parametros["processos"]
+    dados = {
+        "ambiente": {"commit": commit_atual(), "python": platform.python_version(),
+                     "sqlite": sqlite3.sqlite_version, "perfil_sqlite": SQLITE_PERFIL,
+                     "escritor_agrupado": database_manager.ESCRITOR_AGRUPADO},
+        "parametros": parametros,
+        "limites_histograma_ms": list(LIMITES_HISTOGRAMA_MS),
+        **resumir(total, duracao),
+    }
+    for op in (*OPERACOES, "total"):
+        est = dados["operacoes"][op] if op != "total" else dados["total"]
+        if est["n"] or est["erros_lock"]:
+            print(f"  {op:<26} {est['ops_por_segundo']:>9,.1f} ops/s  p50={est['p50_ms']}ms  "
+                  f"p95={est['p95_ms']}ms  p99={est['p99_ms']}ms  erros de lock={est['erros_lock']}")
+    sessoes = dados["sessoes"]
+    print(f"  sessões   {sessoes['por_segundo']:>9,.1f}/s  " +
+          "  ".join(f"{tipo}={n}" for tipo, n in sessoes["concluidas"].items()) +
+          (f"  descartadas={sessoes['descartadas']}  atraso de início p99={sessoes['atraso_inicio']['p99_ms']}ms"
+           if args.taxa else ""))
+    if dados["erros_outros"]:
+        print(f"  outros erros: {dados['erros_outros']}")
+    if anterior:
+        print(f"\nComparação com {args.comparar}:")
+        comparar(anterior, dados)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+    print(f"\nResultados salvos em {args.saida}")
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
@@ -0,0 +1,448 @@
+# componentes_tk.py
+# Componentes Tk reutilizáveis pelas janelas do safespace_app
+import calendar
+import queue
+import tkinter as tk
+from tkinter import ttk
+from concurrent.futures import ThreadPoolExecutor
+
+from config import TAREFAS_MAX_WORKERS
+
+_pool_tarefas = None
+
+
+def _obter_pool_tarefas():
+    global _pool_tarefas
+    if _pool_tarefas is None:
+        _pool_tarefas = ThreadPoolExecutor(
+            max_workers=TAREFAS_MAX_WORKERS, thread_name_prefix="safespace-tarefa")
+    return _pool_tarefas
+
+
+class ExecutorTarefas:
+    """Roda chamadas bloqueantes (serviços/DAO) em threads de trabalho e entrega
+    o resultado na thread do Tk (fila consultada com `after`).
+
+    Tarefas com a mesma `chave` se substituem: ao disparar uma nova, a anterior
+    é cancelada se ainda não começou e, se já começou, seu resultado é
+    descartado. Assim só o pedido mais recente (ex.: o último usuário clicado)
+    chega à interface."""
+
+    INTERVALO_MS = 30
+
+    def __init__(self, widget, ao_mudar_ocupado=None):
+        self.widget = widget
+        self.ao_mudar_ocupado = ao_mudar_ocupado
+        self._resultados = queue.Queue()
+        self._geracoes = {}   # chave -> geração do pedido mais recente
+        self._futuros = {}    # chave -> Future do pedido mais recente
+        self._pendentes = 0
+        self._agendado = False
+        self._ativo = True
+        widget.bind("<Destroy>", self._on_destroy, add="+")
+
+    def executar(self, chave, funcao, args=(), ao_concluir=None, ao_falhar=None):
+        """Agenda funcao(*args); ao_concluir(resultado) ou ao_falhar(exceção)
+        são chamados na thread do Tk. chave=None nunca é considerada obsoleta."""
+        if chave is None:
+            chave = object()
+        geracao = self._geracoes.get(chave, 0) + 1
+        self._geracoes[chave] = geracao
+        anterior = self._futuros.get(chave)
+        if anterior is not None and anterior.cancel():
+            self._pendentes -= 1  # Nem chegou a rodar: não virá resultado
+        self._futuros[chave] = _obter_pool_tarefas().submit(
+            self._rodar, chave, geracao, funcao, args, ao_concluir, ao_falhar)
+        self._pendentes += 1
+        self._notificar()
+        if not self._agendado:
+            self._agendado = True
+            self.widget.after(self.INTERVALO_MS, self._processar)
+
+    def aguardar(self, janela, chave, funcao, args=()):
+        """Roda funcao(*args) em segundo plano e espera o resultado sem travar o
+        Tk (wait_variable em `janela`, ex.: a validação de um diálogo).
+        Retorna (resultado, exceção ou None)."""
+        concluido = tk.BooleanVar(janela, value=False)
+        saida = [None, None]
+
+        def terminar(indice):
+            def callback(valor):
+                saida[indice] = valor
+                concluido.set(True)
+            return callback
+        self.executar(chave, funcao, args, ao_concluir=terminar(0), ao_falhar=terminar(1))
+        janela.wait_variable(concluido)
+        return saida[0], saida[1]
+
+    def _rodar(self, chave, geracao, funcao, args, ao_concluir, ao_falhar):
+        # Thread de trabalho: não toca em widgets, só enfileira o resultado
+        try:
+            resultado, callback = funcao(*args), ao_concluir
+        except Exception as e:
+            resultado, callback = e, ao_falhar
+        self._resultados.put((chave, geracao, callback, resultado))
+
+    def _processar(self):
+        self._agendado = False
+        if not self._ativo:
+            return
+        while True:
+            try:
+                chave, geracao, callback, resultado = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._pendentes -= 1
+            if self._geracoes.get(chave) != geracao:
+                continue  # Pedido obsoleto: já existe um mais recente
+            if self._futuros.get(chave) is not None and self._futuros[chave].done():
+                del self._futuros[chave]
+            if callback is not None:
+                callback(resultado)
+        self._notificar()
+        if self._pendentes > 0 and self._ativo:
+            self._agendado = True
+            self.widget.after(self.INTERVALO_MS, self._processar)
+
+    def _notificar(self):
+        if self.ao_mudar_ocupado is not None and self._ativo:
+            self.ao_mudar_ocupado(self._pendentes > 0)
+
+    def _on_destroy(self, event):
+        if event.widget is self.widget:
+            self._ativo = False
+            for futuro in self._futuros.values():
+                futuro.cancel()
+
+
+class IndicadorCarregando(ttk.Label):
+    """Rótulo "Carregando..." e cursor de espera enquanto houver tarefas pendentes.
+    Use a instância como ao_mudar_ocupado do ExecutorTarefas."""
+
+    def __init__(self, master, janela, texto="Carregando...", **kwargs):
+        super().__init__(master, text="", **kwargs)
+        self.janela = janela
+        self.texto = texto
+
+    def __call__(self, ocupado):
+        self.config(text=self.texto if ocupado else "")
+        self.janela.config(cursor="watch" if ocupado else "")
+
+
+class TabelaVirtual(ttk.Frame):
+    """Treeview com rolagem virtual: só as linhas visíveis existem como itens
+    no widget, e as páginas são buscadas sob demanda ao rolar.
+
+    Em memória fica só a janela visível mais um buffer de linhas_buffer
+    linhas antes e depois dela (em páginas inteiras); as páginas fora disso
+    são descartadas e buscadas de novo, pelo cursor de keyset de cada página,
+    se o usuário voltar a elas. Os cursores (um por página já vista) são o
+    único estado que cresce com a profundidade da rolagem.
+
+    buscar_pagina(cursor, tamanho) deve retornar (linhas, proximo_cursor), com
+    proximo_cursor None na última página (mesmo contrato de
+    Usuario.listar_usuarios_paginado). formatar_linha converte uma linha de
+    dados nos valores exibidos nas colunas. Com um `executor` (ExecutorTarefas),
+    as páginas são buscadas em segundo plano e ao_erro(exceção) recebe falhas."""
+
+    def __init__(self, master, colunas, buscar_pagina, formatar_linha=None,
+                 tamanho_pagina=200, linhas_buffer=None, executor=None, ao_erro=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.executor = executor
+        self.ao_erro = ao_erro
+        self.colunas = colunas
+        self.buscar_pagina = buscar_pagina
+        self.formatar_linha = formatar_linha or (lambda linha: linha)
+        self.tamanho_pagina = tamanho_pagina
+        self.linhas_buffer = linhas_buffer  # None: duas telas
+
+        self.tree = ttk.Treeview(self, columns=colunas, show="headings",
+                                 selectmode="browse", height=1)
+        self.scroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+
+        self._paginas = {}         # Número da página -> linhas (só as próximas da janela)
+        self._cursores = [None]    # Cursor que busca cada página conhecida (a 0 começa do início)
+        self._tem_mais = True
+        self._buscando = None      # Página sendo buscada em segundo plano
+        self._geracao = 0          # Muda no recarregar: respostas antigas são ignoradas
+        self._topo = 0             # Índice da primeira linha visível
+        self._visiveis = 20        # Recalculado no <Configure>
+        self._selecionado = None   # Índice da linha selecionada
+        self._linha_selecionada = None
+        self._iids = []            # Itens da Treeview reaproveitados entre renderizações
+        self._valores = {}         # iid -> valores exibidos atualmente
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.rolar(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.rolar(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.rolar(1, "units"))
+        self.tree.bind("<Up>", lambda e: self._mover_selecao(-1))
+        self.tree.bind("<Down>", lambda e: self._mover_selecao(1))
+        self.tree.bind("<Prior>", lambda e: self.rolar(-1, "pages"))
+        self.tree.bind("<Next>", lambda e: self.rolar(1, "pages"))
+
+    # --- Dados ---
+
+    def recarregar(self):
+        """Descarta as linhas buscadas e volta para a primeira página."""
+        self._paginas = {}
+        self._cursores = [None]
+        self._tem_mais = True
+        self._buscando = None
+        self._geracao += 1
+        self._topo = 0
+        self._selecionado = None
+        self._linha_selecionada = None
+        self._renderizar()
+
+    def _conhecidas(self):
+        """Quantas linhas se sabe que existem (todas as páginas buscadas até agora)."""
+        if self._tem_mais:
+            return (len(self._cursores) - 1) * self.tamanho_pagina
+        ultima = len(self._cursores) - 1
+        return ultima * self.tamanho_pagina + len(self._paginas.get(ultima, ()))
+
+    def _linha(self, indice):
+        pagina = self._paginas.get(indice // self.tamanho_pagina)
+        deslocamento = indice % self.tamanho_pagina
+        return pagina[deslocamento] if pagina is not None and deslocamento < len(pagina) else None
+
+    def _buffer(self):
+        return self.linhas_buffer if self.linhas_buffer is not None else 2 * self._visiveis
+
+    def _paginas_da_janela(self):
+        """Intervalo de páginas com a janela visível e o buffer antes e depois."""
+        buffer = self._buffer()
+        primeira = max(0, self._topo - buffer) // self.tamanho_pagina
+        ultima = (self._topo + self._visiveis + buffer) // self.tamanho_pagina
+        return primeira, ultima
+
+    def _carregar_janela(self):
+        """Busca as páginas da janela que faltam (só as que têm cursor conhecido:
+        as seguintes aparecem conforme as anteriores chegam) e descarta as de fora.
+        Com executor, dispara uma busca e retorna sem esperar."""
+        primeira, ultima = self._paginas_da_janela()
+        for numero in [n for n in self._paginas if not primeira <= n <= ultima]:
+            del self._paginas[numero]
+        while True:
+            faltando = next((n for n in range(primeira, min(ultima + 1, len(self._cursores)))
+                             if n not in self._paginas), None)
+            if faltando is None:
+                return
+            if self.executor is None:
+                self._guardar_pagina(faltando, self.buscar_pagina(self._cursores[faltando], self.tamanho_pagina))
+                continue
+            if self._buscando != faltando:
+                # Mesma chave: uma busca anterior (de página que saiu da janela) é descartada
+                self._buscando = faltando
+                geracao = self._geracao
+                self.executor.executar(
+                    ("pagina", id(self)), self.buscar_pagina, (self._cursores[faltando], self.tamanho_pagina),
+                    ao_concluir=lambda resultado: self._on_pagina(geracao, faltando, resultado),
+                    ao_falhar=self._on_erro_pagina)
+            return
+
+    def _guardar_pagina(self, numero, resultado):
+        linhas, proximo = resultado
+        self._paginas[numero] = linhas
+        if numero == len(self._cursores) - 1:  # Página mais funda já vista
+            if proximo is None:
+                self._tem_mais = False
+            else:
+                self._cursores.append(proximo)
+
+    def _on_pagina(self, geracao, numero, resultado):
+        if geracao != self._geracao:
+            return
+        self._buscando = None
+        self._guardar_pagina(numero, resultado)
+        self._renderizar()  # Pede a próxima página se o buffer ainda não encheu
+
+    def _on_erro_pagina(self, erro):
+        self._buscando = None
+        self._tem_mais = False
+        if self.ao_erro is not None:
+            self.ao_erro(erro)
+
+    def linha_selecionada(self):
+        """Retorna a linha de dados selecionada (não formatada) ou None."""
+        return self._linha_selecionada
+
+    # --- Renderização ---
+
+    def _total_rolavel(self):
+        # Enquanto houver páginas por buscar, reserva espaço para mais uma
+        return max(1, self._conhecidas() + (self.tamanho_pagina if self._tem_mais else 0))
+
+    def _renderizar(self):
+        conhecidas = self._conhecidas()
+        self._topo = max(0, min(self._topo, conhecidas - self._visiveis))
+        self._carregar_janela()
+        conhecidas = self._conhecidas()  # Sem executor, a busca acima já terminou
+        self._topo = max(0, min(self._topo, conhecidas - self._visiveis))
+        janela = [self._linha(i) for i in range(self._topo, min(self._topo + self._visiveis, conhecidas))]
+        if self._selecionado is not None and self._linha_selecionada is None:
+            self._linha_selecionada = self._linha(self._selecionado)
+
+        # Reaproveita os itens existentes: só atualiza valores que mudaram
+        while len(self._iids) < len(janela):
+            self._iids.append(self.tree.insert("", tk.END, values=()))
+        while len(self._iids) > len(janela):
+            iid = self._iids.pop()
+            self._valores.pop(iid, None)
+            self.tree.delete(iid)
+        for iid, linha in zip(self._iids, janela):
+            # Página descartada sendo buscada de novo: linha provisória
+            valores = tuple(self.formatar_linha(linha)) if linha is not None else ("…",)
+            if self._valores.get(iid) != valores:
+                self.tree.item(iid, values=valores)
+                self._valores[iid] = valores
+
+        if self._selecionado is not None and self._topo <= self._selecionado < self._topo + len(janela):
+            iid = self._iids[self._selecionado - self._topo]
+            if self.tree.selection() != (iid,):
+                self.tree.selection_set(iid)
+            self.tree.focus(iid)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        total = self._total_rolavel()
+        self.scroll.set(self._topo / total, min(1.0, (self._topo + self._visiveis) / total))
+
+    # --- Eventos ---
+
+    def rolar(self, quantidade, unidade="units"):
+        passo = self._visiveis if unidade == "pages" else 1
+        self._topo = max(0, self._topo + int(quantidade) * passo)
+        self._renderizar()
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._topo = int(float(args[1]) * self._total_rolavel())
+            self._renderizar()
+        elif args[0] == "scroll":
+            self.rolar(args[1], args[2])
+
+    def _on_configure(self, event):
+        altura_linha = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        visiveis = max(1, (event.height - altura_linha) // altura_linha)
+        if visiveis != self._visiveis:
+            self._visiveis = visiveis
+            self._renderizar()
+
+    def _on_select(self, _event):
+        selecao = self.tree.selection()
+        if selecao and selecao[0] in self._iids:
+            indice = self._topo + self._iids.index(selecao[0])
+            linha = self._linha(indice)
+            if linha is not None:  # Linha provisória não é selecionável
+                self._selecionado, self._linha_selecionada = indice, linha
+
+    def _mover_selecao(self, delta):
+        conhecidas = self._conhecidas()
+        if not conhecidas:
+            return "break"
+        atual = self._selecionado if self._selecionado is not None else self._topo - delta
+        self._selecionado = max(0, min(atual + delta, conhecidas - 1))
+        self._linha_selecionada = self._linha(self._selecionado)  # None até a página chegar
+        # Mantém a linha selecionada dentro da janela visível
+        if self._selecionado < self._topo:
+            self._topo = self._selecionado
+        elif self._selecionado >= self._topo + self._visiveis:
+            self._topo = self._selecionado - self._visiveis + 1
+        self._renderizar()
+        self.tree.event_generate("<<TreeviewSelect>>")
+        return "break"
+
+
+class CalendarioHumor(ttk.Frame):
+    """Grade mensal de humor (6 semanas x 7 dias) criada uma única vez.
+
+    Trocar de mês só reconfigura os rótulos cujo texto mudou. Os humores de
+    cada mês ficam em cache e os meses vizinhos são pré-carregados em segundo
+    plano, então navegar para o mês anterior/seguinte é imediato.
+    buscar_mes(ano, mes) deve retornar {dia: sentimento}."""
+
+    DIAS_SEMANA = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+    MESES_EM_CACHE = 24
+
+    def __init__(self, master, buscar_mes, executor, ao_erro=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.buscar_mes = buscar_mes
+        self.executor = executor
+        self.ao_erro = ao_erro
+        self._meses = {}   # (ano, mes) -> {dia: sentimento}
+        self._atual = None
+        self._textos = {}  # rótulo -> texto exibido atualmente
+
+        for c, nome_dia in enumerate(self.DIAS_SEMANA):
+            ttk.Label(self, text=nome_dia, style="CalendarHeader.TLabel").grid(
+                row=0, column=c, sticky="nsew", padx=1, pady=1)
+            self.grid_columnconfigure(c, weight=1)
+        self._celulas = []  # (rótulo do dia, rótulo do humor), 42 células
+        for r in range(1, 7):
+            self.grid_rowconfigure(r, weight=1)
+            for c in range(7):
+                day_f = ttk.Frame(self, style="CalendarDay.TFrame",
+                                  borderwidth=1, relief="solid")
+                day_f.grid(row=r, column=c, padx=1, pady=1, sticky="nsew")
+                lbl_dia = ttk.Label(day_f, text="", style="CalendarDayNum.TLabel")
+                lbl_dia.pack(anchor="nw", padx=2, pady=1)
+                lbl_humor = ttk.Label(day_f, text="", style="CalendarMood.TLabel")
+                lbl_humor.pack(expand=True, fill=tk.BOTH, padx=2, pady=1)
+                self._celulas.append((lbl_dia, lbl_humor))
+
+    def mostrar(self, ano, mes):
+        """Exibe o mês (do cache, se já carregado) e pré-carrega os vizinhos."""
+        self._atual = (ano, mes)
+        if (ano, mes) in self._meses:
+            self._renderizar()
+        else:
+            self._carregar(ano, mes, ("calendario", id(self)))
+        for vizinho in (self._deslocar(ano, mes, -1), self._deslocar(ano, mes, 1)):
+            if vizinho not in self._meses:
+                self._carregar(*vizinho, ("calendario", id(self), vizinho))
+
+    def invalidar(self, ano, mes):
+        """Descarta o mês do cache (ex.: após registrar um humor) e o recarrega se visível."""
+        self._meses.pop((ano, mes), None)
+        if self._atual == (ano, mes):
+            self._carregar(ano, mes, ("calendario", id(self)))
+
+    @staticmethod
+    def _deslocar(ano, mes, delta):
+        indice = ano * 12 + (mes - 1) + delta
+        return indice // 12, indice % 12 + 1
+
+    def _carregar(self, ano, mes, chave):
+        self.executor.executar(chave, self.buscar_mes, (ano, mes),
+                               ao_concluir=lambda humores: self._on_mes(ano, mes, humores),
+                               ao_falhar=self.ao_erro)
+
+    def _on_mes(self, ano, mes, humores):
+        self._meses[(ano, mes)] = humores
+        while len(self._meses) > self.MESES_EM_CACHE:
+            self._meses.pop(next(iter(self._meses)))
+        if self._atual == (ano, mes):
+            self._renderizar()
+
+    def _definir_texto(self, rotulo, texto):
+        if self._textos.get(rotulo) != texto:
+            rotulo.config(text=texto)
+            self._textos[rotulo] = texto
+
+    def _renderizar(self):
+        ano, mes = self._atual
+        humores = self._meses[(ano, mes)]
+        dias = [d for semana in calendar.monthcalendar(ano, mes) for d in semana]
+        dias += [0] * (len(self._celulas) - len(dias))
+        for (lbl_dia, lbl_humor), dia_num in zip(self._celulas, dias):
+            sentimento = humores.get(dia_num, "") if dia_num else ""
+            # Limita o texto
+            display_s = (sentimento[:8]+"..") if len(sentimento) > 10 else sentimento
+            self._definir_texto(lbl_dia, str(dia_num) if dia_num else "")
+            self._definir_texto(lbl_humor, display_s)
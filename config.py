@@ -4,3 +4,86 @@ DATABASE_NAME = "database.db"
 TIPO_USUARIO_COMUM = 1
 TIPO_COLABORADOR = 2
 TIPO_ADMINISTRADOR = 3
+
+# Pool de conexões do database_manager
+POOL_TAMANHO = 5            # Máximo de conexões abertas ao mesmo tempo
+POOL_TIMEOUT = 10.0         # Segundos aguardando uma conexão livre
+POOL_CACHE_STATEMENTS = 128  # Statements preparados mantidos por conexão
+
+# Perfis de PRAGMAs aplicados a cada conexão nova do pool (na ordem do dict).
+# "wal": leitores não bloqueiam o escritor (e vice-versa), vários processos do
+# app gravam sem "database is locked". WAL não funciona em pastas de rede:
+# nesse caso use "compatibilidade" (journal com rollback, como o SQLite padrão).
+SQLITE_PERFIS = {
+    "wal": {
+        "busy_timeout": 5000,           # ms esperando o lock de escrita antes do erro
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",        # Seguro com WAL: só o último commit pode se perder numa queda de energia
+        "cache_size": -16384,           # Negativo = KiB (16MB por conexão)
+        "mmap_size": 268435456,         # Leituras até 256MB direto do mapeamento, sem cópia
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 1000,     # Páginas no WAL que disparam um checkpoint no commit
+        "journal_size_limit": 67108864,  # O arquivo -wal volta a no máximo 64MB após o checkpoint
+    },
+    "compatibilidade": {
+        "busy_timeout": 5000,
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+}
+SQLITE_PERFIL = "wal"
+SQLITE_INTERVALO_CHECKPOINT = 60.0  # Segundos entre checkpoints PASSIVE periódicos (0 desliga)
+
+# Escritas de humor e questionário por uma thread única, com um commit por lote
+# (database_manager.EscritorAgrupado). False: cada escrita faz o próprio commit.
+ESCRITOR_AGRUPADO = True
+ESCRITOR_MAX_LOTE = 256      # Escritas por transação
+ESCRITOR_ESPERA_MAX = 0.002  # Segundos que a primeira escrita do lote espera por companhia
+
+# services_async: threads que fazem o I/O do banco e limite de chamadas em andamento.
+# Acima de ASYNC_MAX_PENDENTES quem chama aguarda a vez (backpressure); depois de
+# ASYNC_ESPERA_MAX segundos aguardando recebe ServicoSobrecarregado.
+# Uma thread por conexão do pool (menos a do escritor agrupado): thread a mais só
+# esperaria conexão. Para mais threads, aumente POOL_TAMANHO; um ASYNC_THREADS
+# maior que as conexões é reduzido pelo executor, com um RuntimeWarning.
+ASYNC_THREADS = POOL_TAMANHO - (1 if ESCRITOR_AGRUPADO else 0)
+ASYNC_MAX_PENDENTES = 2000
+ASYNC_ESPERA_MAX = 30.0
+
+# API HTTP/JSON local (api_http.py)
+API_HOST = "127.0.0.1"
+API_PORTA = 8080
+API_SESSAO_TTL = 8 * 3600     # Segundos de validade do token de login
+API_MAX_CORPO = 1024 * 1024   # Bytes aceitos no corpo de uma requisição
+API_TIMEOUT_OCIOSO = 15.0     # Segundos que uma conexão keep-alive fica aberta sem requisições
+API_TAMANHO_PAGINA_MAX = 500
+
+# Tarefas em segundo plano das janelas Tk (componentes_tk.ExecutorTarefas)
+TAREFAS_MAX_WORKERS = 4
+
+# Cache de consultas de usuário por id/email (database_manager.cache_usuarios)
+CACHE_USUARIOS_TAMANHO = 1024
+CACHE_USUARIOS_TTL = 30.0  # Segundos; limita dados velhos vindos de outros processos
+
+# Questionários (coluna questionario_perguntas.questionario)
+QUESTIONARIO_BEM_ESTAR = 1
+QUESTIONARIO_PET = 2
+
+# Classificação dos sentimentos do humor diário (análises); os demais contam como neutros
+SENTIMENTOS_POSITIVOS = ("Feliz", "Contente", "Animado(a)", "Relaxado(a)")
+SENTIMENTOS_NEGATIVOS = ("Triste", "Ansioso(a)", "Cansado(a)", "Estressado(a)", "Irritado(a)")
+
+# Resumo de humor por usuário (tabela humor_resumo): janela das contagens por classe.
+# Depois de mudar, rode: python manutencao.py reconstruir-resumo
+JANELA_RESUMO_HUMOR_DIAS = 30
+
+# Nomes dos questionários em exportações/importações
+NOMES_QUESTIONARIOS = {QUESTIONARIO_BEM_ESTAR: "bem_estar", QUESTIONARIO_PET: "pet"}
+
+# Backup online (backup.py / python manutencao.py backup|snapshot|restaurar)
+BACKUP_DIRETORIO = "backups"
+BACKUP_PAGINAS_POR_PASSO = 1024  # Páginas copiadas por passo (4MB com páginas de 4KB)
+BACKUP_PAUSA_PASSOS = 0.005      # Segundos entre passos, sem lock no banco: as escritas do app seguem
+BACKUP_MAX_REINICIOS = 3         # Escritas durante a cópia a reiniciam; depois disso copia em um passo só
+BACKUP_RETENCAO = 7              # Snapshots mantidos no diretório
+BACKUP_INTERVALO = 3600          # Segundos entre snapshots agendados
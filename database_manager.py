@@ -1,17 +1,538 @@
 # backend/database_manager.py
 import sqlite3
 import json
+import calendar
+import queue
+import time
+from concurrent.futures import Future
+from datetime import date
+import threading
+import atexit
 # Garanta que config.py está acessível
 from config import DATABASE_NAME, TIPO_ADMINISTRADOR, TIPO_COLABORADOR, TIPO_USUARIO_COMUM
+from config import POOL_TAMANHO, POOL_TIMEOUT, POOL_CACHE_STATEMENTS
+from config import SQLITE_PERFIS, SQLITE_PERFIL, SQLITE_INTERVALO_CHECKPOINT
+from config import ESCRITOR_AGRUPADO, ESCRITOR_MAX_LOTE, ESCRITOR_ESPERA_MAX
+from config import CACHE_USUARIOS_TAMANHO, CACHE_USUARIOS_TTL
+from config import QUESTIONARIO_BEM_ESTAR, QUESTIONARIO_PET
+from config import SENTIMENTOS_POSITIVOS, SENTIMENTOS_NEGATIVOS, JANELA_RESUMO_HUMOR_DIAS
+from cache import CacheLRU
+
+
+class PoolConexoes:
+    """Pool de conexões SQLite de longa duração, compartilhado entre threads.
+
+    Cada conexão é usada por uma thread de cada vez (emprestar/devolver), então
+    é seguro abri-las com check_same_thread=False. O cache de statements do
+    sqlite3 é por conexão, por isso reaproveitar conexões também reaproveita
+    as consultas já preparadas.
+
+    Cada conexão nova recebe os PRAGMAs do perfil (SQLITE_PERFIS); com WAL,
+    iniciar_checkpoints() mantém o arquivo -wal curto mesmo com leitores
+    sempre ativos."""
+
+    def __init__(self, caminho, tamanho=POOL_TAMANHO, timeout=POOL_TIMEOUT, perfil=SQLITE_PERFIL):
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self.timeout = timeout
+        self.perfil = perfil
+        self.pragmas = SQLITE_PERFIS[perfil]
+        self._livres = queue.LifoQueue()  # LIFO: reusa a conexão mais "quente"
+        self._criadas = 0
+        self._lock = threading.Lock()
+        self._parar_checkpoints = threading.Event()
+        self.fechado = False
+
+    def _nova_conexao(self):
+        conn = sqlite3.connect(self.caminho, check_same_thread=False,
+                               cached_statements=POOL_CACHE_STATEMENTS)
+        for pragma, valor in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+        return conn
+
+    @property
+    def usa_wal(self):
+        return str(self.pragmas.get("journal_mode", "")).upper() == "WAL"
+
+    @staticmethod
+    def _saudavel(conn):
+        try:
+            conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _descartar(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._criadas -= 1
+
+    def emprestar(self):
+        """Retorna uma conexão livre, criando uma nova se o pool ainda não está cheio."""
+        if self.fechado:
+            raise sqlite3.ProgrammingError("Pool de conexões já foi fechado.")
+        try:
+            conn = self._livres.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                pode_criar = self._criadas < self.tamanho
+                if pode_criar:
+                    self._criadas += 1
+            if pode_criar:
+                try:
+                    return self._nova_conexao()
+                except sqlite3.Error:
+                    with self._lock:
+                        self._criadas -= 1
+                    raise
+            try:
+                conn = self._livres.get(timeout=self.timeout)
+            except queue.Empty:
+                raise sqlite3.OperationalError(
+                    "Tempo esgotado aguardando uma conexão livre do pool.")
+        if not self._saudavel(conn):
+            # Conexão quebrada: substitui por uma nova no mesmo "slot"
+            self._descartar(conn)
+            with self._lock:
+                self._criadas += 1
+            try:
+                conn = self._nova_conexao()
+            except sqlite3.Error:
+                with self._lock:
+                    self._criadas -= 1
+                raise
+        return conn
+
+    def devolver(self, conn):
+        """Devolve a conexão ao pool (desfazendo transação pendente, se houver)."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._descartar(conn)
+            return
+        if self.fechado:
+            self._descartar(conn)
+            return
+        self._livres.put(conn)
+
+    def checkpoint(self, modo="PASSIVE"):
+        """Copia as páginas do WAL para o banco. PASSIVE não espera por
+        leitores nem escritores. Retorna (ocupado, páginas no WAL, copiadas)."""
+        conn = self.emprestar()
+        try:
+            return conn.execute(f"PRAGMA wal_checkpoint({modo})").fetchone()
+        finally:
+            self.devolver(conn)
+
+    def iniciar_checkpoints(self, intervalo):
+        """Thread (daemon) com um checkpoint PASSIVE a cada `intervalo` segundos até fechar()."""
+        def executar():
+            while not self._parar_checkpoints.wait(intervalo):
+                try:
+                    self.checkpoint()
+                except sqlite3.Error:
+                    pass  # Banco ocupado ou pool fechando: tenta no próximo ciclo
+        threading.Thread(target=executar, name="sqlite-checkpoint", daemon=True).start()
+
+    def fechar(self):
+        """Fecha todas as conexões livres; as emprestadas são fechadas ao voltar."""
+        self.fechado = True
+        self._parar_checkpoints.set()
+        while True:
+            try:
+                conn = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            self._descartar(conn)
+
+
+class _ConexaoDoPool:
+    """Context manager devolvido por conectar(): empresta a conexão do pool,
+    faz commit/rollback como o `with sqlite3.Connection` faria e a devolve."""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = None
+
+    def __enter__(self):
+        self._conn = self._pool.emprestar()
+        return self._conn.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._conn.__exit__(exc_type, exc, tb)
+        finally:
+            self._pool.devolver(self._conn)
+            self._conn = None
+        return False
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obter_pool():
+    """Retorna o pool do banco atual (recriado se DATABASE_NAME ou SQLITE_PERFIL
+    mudou ou se foi fechado)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.fechado or _pool.caminho != DATABASE_NAME or _pool.perfil != SQLITE_PERFIL:
+            if _pool is not None:
+                _pool.fechar()
+            _pool = PoolConexoes(DATABASE_NAME, perfil=SQLITE_PERFIL)
+            if _pool.usa_wal and SQLITE_INTERVALO_CHECKPOINT > 0:
+                _pool.iniciar_checkpoints(SQLITE_INTERVALO_CHECKPOINT)
+        return _pool
+
+
+def fechar_pool():
+    """Fecha o pool de conexões (chamado automaticamente ao sair do programa)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.fechar()
+            _pool = None
+
+
+atexit.register(fechar_pool)
 
 
 def conectar():
-    """Cria a conexão com o banco de dados SQLite."""
-    return sqlite3.connect(DATABASE_NAME)
+    """Empresta uma conexão do pool; use sempre com `with conectar() as conn:`."""
+    return _ConexaoDoPool(obter_pool())
+
+
+class EscritorAgrupado:
+    """Thread única que executa as escritas enfileiradas com group commit.
+
+    Cada escrita é uma função operacao(cursor). A thread junta as que chegam
+    juntas (até max_lote, esperando no máximo espera_max segundos pela
+    segunda) em uma única transação, cada uma em seu SAVEPOINT: se uma falha,
+    só ela é desfeita e recebe a exceção. O resultado de cada escrita só é
+    entregue depois do COMMIT do lote, então quem chama executar() continua
+    com a semântica síncrona de antes, mas o banco faz um commit (e um fsync)
+    por lote, não por escrita.
+
+    A espera pela segunda escrita só acontece se há outra escrita em andamento
+    ou se o lote anterior teve mais de uma: uma escrita sozinha vai direto
+    para o commit, sem pagar espera_max de latência."""
+
+    def __init__(self, max_lote=ESCRITOR_MAX_LOTE, espera_max=ESCRITOR_ESPERA_MAX):
+        self.max_lote = max_lote
+        self.espera_max = espera_max
+        self.escritas = 0
+        self.commits = 0
+        self._fila = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._em_andamento = 0  # Chamadas de executar() ainda sem resultado
+        self._tamanho_ultimo_lote = 0
+
+    def executar(self, operacao):
+        """Enfileira operacao(cursor) e bloqueia até o commit; retorna o
+        resultado dela ou levanta a exceção que ela (ou o commit) levantou."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("executar() chamado de dentro de uma escrita agrupada.")
+        futuro = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._laco, name="sqlite-escritor", daemon=True)
+                self._thread.start()
+            self._em_andamento += 1
+            self._fila.put((operacao, futuro))
+        try:
+            return futuro.result()
+        finally:
+            with self._lock:
+                self._em_andamento -= 1
+
+    def parar(self):
+        """Processa o que já está na fila e encerra a thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._fila.put(None)
+        if thread is not None:
+            thread.join()
+
+    def _proximo_lote(self):
+        item = self._fila.get()
+        if item is None:
+            return None
+        lote = [item]
+        # Sem outra escrita em andamento nem lote anterior com companhia, não espera
+        concorrencia = self._em_andamento > 1 or self._tamanho_ultimo_lote > 1
+        prazo = time.monotonic() + (self.espera_max if concorrencia else 0)
+        while len(lote) < self.max_lote:
+            try:
+                item = self._fila.get(timeout=max(prazo - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is None:
+                self._fila.put(None)  # Encerra depois deste lote
+                break
+            lote.append(item)
+        self._tamanho_ultimo_lote = len(lote)
+        return lote
+
+    def _laco(self):
+        while True:
+            lote = self._proximo_lote()
+            if lote is None:
+                return
+            self._executar_lote(lote)
+
+    def _executar_lote(self, lote):
+        resultados = []
+        try:
+            with conectar() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                for operacao, futuro in lote:
+                    cursor.execute("SAVEPOINT escrita")
+                    try:
+                        resultados.append((futuro, operacao(cursor), None))
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO escrita")
+                        resultados.append((futuro, None, e))
+                    cursor.execute("RELEASE escrita")
+        except Exception as e:  # BEGIN/COMMIT falhou: nada do lote foi gravado
+            for _, futuro in lote:
+                futuro.set_exception(e)
+            return
+        self.commits += 1
+        self.escritas += len(lote)
+        for futuro, resultado, erro in resultados:
+            if erro is None:
+                futuro.set_result(resultado)
+            else:
+                futuro.set_exception(erro)
+
+
+escritor = EscritorAgrupado()
+atexit.register(escritor.parar)
+
+
+def executar_escrita(operacao):
+    """Executa operacao(cursor) e faz commit: pelo escritor agrupado se
+    ESCRITOR_AGRUPADO, senão em uma transação própria. Retorna o resultado dela."""
+    if ESCRITOR_AGRUPADO:
+        return escritor.executar(operacao)
+    with conectar() as conn:
+        resultado = operacao(conn.cursor())
+        conn.commit()
+        return resultado
+
+
+def _migracao_humor_um_por_dia(cursor):
+    """Remove humores duplicados no mesmo dia (mantém o primeiro registrado)
+    e garante UNIQUE(usuario_id, data). O índice de cobertura
+    idx_humor_usuario_data (usuario_id, data, sentimento) continua atendendo
+    as buscas por dia, mês (BETWEEN) e histórico sem ler a tabela."""
+    cursor.execute("""
+        DELETE FROM humor_diario
+        WHERE id NOT IN (SELECT MIN(id) FROM humor_diario GROUP BY usuario_id, data)
+    """)
+    if cursor.rowcount > 0:
+        print(f"Migração: {cursor.rowcount} registro(s) de humor duplicado(s) removido(s).")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_humor_usuario_data
+        ON humor_diario (usuario_id, data, sentimento)
+    """)
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_humor_usuario_dia
+        ON humor_diario (usuario_id, data)
+    """)
+
+
+def _migracao_indices_ordenacao_usuarios(cursor):
+    """Índices para a listagem paginada ordenada por coluna (o desempate por id
+    vem de graça: o rowid faz parte de toda entrada de índice). email já tem o
+    índice do UNIQUE; type também atende o filtro por tipo ordenado por id."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_nome ON usuarios (nome)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_idade ON usuarios (idade)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_type ON usuarios (type)")
+
+
+def _migracao_humor_codificado(cursor):
+    """Troca a tabela humor_diario (data TEXT + sentimento TEXT por linha) por:
+    - sentimentos: dicionário texto -> id pequeno;
+    - humor_registro: (usuario_id, dia, sentimento_id) só com inteiros, dia =
+      dias desde 1970-01-01, WITHOUT ROWID com chave (usuario_id, dia): a
+      própria tabela é o índice das buscas, sem um índice separado.
+    humor_diario continua existindo como view (data ISO, sentimento texto)
+    para consultas de leitura antigas."""
+    cursor.execute("""
+        CREATE TABLE sentimentos (
+            id INTEGER PRIMARY KEY,
+            texto TEXT NOT NULL UNIQUE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE humor_registro (
+            usuario_id INTEGER NOT NULL,
+            dia INTEGER NOT NULL, -- Dias desde 1970-01-01
+            sentimento_id INTEGER NOT NULL,
+            PRIMARY KEY (usuario_id, dia),
+            FOREIGN KEY (usuario_id) REFERENCES usuarios(id),
+            FOREIGN KEY (sentimento_id) REFERENCES sentimentos(id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        INSERT INTO sentimentos (texto)
+        SELECT DISTINCT sentimento FROM humor_diario ORDER BY sentimento
+    """)
+    cursor.execute("""
+        INSERT OR IGNORE INTO humor_registro (usuario_id, dia, sentimento_id)
+        SELECT h.usuario_id, CAST(strftime('%s', h.data) AS INTEGER) / 86400, s.id
+        FROM humor_diario h JOIN sentimentos s ON s.texto = h.sentimento
+        WHERE strftime('%s', h.data) IS NOT NULL
+    """)
+    cursor.execute("DROP TABLE humor_diario")
+    cursor.execute("""
+        CREATE VIEW humor_diario AS
+        SELECT h.usuario_id, date(h.dia * 86400, 'unixepoch') AS data, s.texto AS sentimento
+        FROM humor_registro h JOIN sentimentos s ON s.id = h.sentimento_id
+    """)
+
+
+# ALTER TABLE ... DROP COLUMN existe a partir do SQLite 3.35
+SQLITE_TEM_DROP_COLUMN = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+def _migracao_questionarios_normalizados(cursor):
+    """Tira os questionários do JSON em usuarios:
+    - questionario_perguntas: catálogo (questionário, texto da pergunta) -> id;
+    - questionario_respostas: (usuario_id, pergunta_id, resposta), WITHOUT ROWID.
+    O índice (pergunta_id, resposta) permite contar respostas entre usuários
+    sem ler as linhas de cada um. As colunas JSON antigas são removidas."""
+    cursor.execute("""
+        CREATE TABLE questionario_perguntas (
+            id INTEGER PRIMARY KEY,
+            questionario INTEGER NOT NULL,
+            texto TEXT NOT NULL,
+            UNIQUE (questionario, texto)
+        )
+    """)
+    # resposta sem tipo declarado: guarda int (questões numéricas do pet) e texto como vieram
+    cursor.execute("""
+        CREATE TABLE questionario_respostas (
+            usuario_id INTEGER NOT NULL,
+            pergunta_id INTEGER NOT NULL,
+            resposta NOT NULL,
+            PRIMARY KEY (usuario_id, pergunta_id),
+            FOREIGN KEY (usuario_id) REFERENCES usuarios(id),
+            FOREIGN KEY (pergunta_id) REFERENCES questionario_perguntas(id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute(
+        "CREATE INDEX idx_questionario_respostas_pergunta ON questionario_respostas(pergunta_id, resposta)")
+    for coluna, questionario in (("respostas_questionario", QUESTIONARIO_BEM_ESTAR),
+                                 ("respostas_pet_apoio", QUESTIONARIO_PET)):
+        # Só listas de {"pergunta": ..., "resposta": ...}; JSON inválido é descartado
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO questionario_perguntas (questionario, texto)
+            SELECT ?, json_extract(j.value, '$.pergunta')
+            FROM usuarios u, json_each(u.{coluna}) j
+            WHERE json_valid(u.{coluna}) AND json_type(u.{coluna}) = 'array' AND j.type = 'object'
+            ORDER BY u.id, j.key
+        """, (questionario,))
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO questionario_respostas (usuario_id, pergunta_id, resposta)
+            SELECT u.id, p.id, json_extract(j.value, '$.resposta')
+            FROM usuarios u, json_each(u.{coluna}) j
+            JOIN questionario_perguntas p
+                ON p.questionario = ? AND p.texto = json_extract(j.value, '$.pergunta')
+            WHERE json_valid(u.{coluna}) AND json_type(u.{coluna}) = 'array' AND j.type = 'object'
+        """, (questionario,))
+    if SQLITE_TEM_DROP_COLUMN:
+        cursor.execute("ALTER TABLE usuarios DROP COLUMN respostas_questionario")
+        cursor.execute("ALTER TABLE usuarios DROP COLUMN respostas_pet_apoio")
+    else:
+        _recriar_usuarios_sem_json(cursor)
+
+
+def _recriar_usuarios_sem_json(cursor):
+    """DROP COLUMN para SQLite < 3.35: recria usuarios sem as colunas JSON,
+    mantendo ids, a sequência do AUTOINCREMENT e os índices da migração 2."""
+    sequencia = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'usuarios'").fetchone()
+    cursor.execute("""
+        CREATE TABLE usuarios_nova (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            senha TEXT NOT NULL,
+            idade INTEGER,
+            type INTEGER,
+            pet_sugerido TEXT
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO usuarios_nova (id, nome, email, senha, idade, type, pet_sugerido)
+        SELECT id, nome, email, senha, idade, type, pet_sugerido FROM usuarios
+    """)
+    cursor.execute("DROP TABLE usuarios")
+    cursor.execute("ALTER TABLE usuarios_nova RENAME TO usuarios")
+    if sequencia:
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'usuarios'", sequencia)
+    _migracao_indices_ordenacao_usuarios(cursor)
+
+
+def _migracao_resumo_humor(cursor):
+    """Classifica os sentimentos (valencia: 1 positivo, 0 neutro, -1 negativo) e
+    cria humor_resumo, uma linha por usuário mantida a cada registro de humor
+    na mesma transação: último dia/sentimento, sequência de dias seguidos, total
+    e, por classe, uma máscara de bits dos últimos JANELA_RESUMO_HUMOR_DIAS dias
+    (bit i = registro em ultimo_dia - i). As contagens da janela saem das
+    máscaras, sem reler humor_registro."""
+    cursor.execute("ALTER TABLE sentimentos ADD COLUMN valencia INTEGER NOT NULL DEFAULT 0")
+    cursor.executemany("UPDATE sentimentos SET valencia = ? WHERE id = ?", [
+        (valencia_sentimento(texto), id_sentimento)
+        for id_sentimento, texto in cursor.execute("SELECT id, texto FROM sentimentos").fetchall()])
+    cursor.execute("""
+        CREATE TABLE humor_resumo (
+            usuario_id INTEGER PRIMARY KEY,
+            ultimo_dia INTEGER NOT NULL,
+            ultimo_sentimento_id INTEGER NOT NULL,
+            sequencia_atual INTEGER NOT NULL, -- Dias seguidos com registro até ultimo_dia
+            total_registros INTEGER NOT NULL,
+            mascara_positivos INTEGER NOT NULL,
+            mascara_neutros INTEGER NOT NULL,
+            mascara_negativos INTEGER NOT NULL,
+            FOREIGN KEY (usuario_id) REFERENCES usuarios(id),
+            FOREIGN KEY (ultimo_sentimento_id) REFERENCES sentimentos(id)
+        )
+    """)
+    _reconstruir_resumo_humor(cursor)
+
+
+# Lista ordenada (versão, função); a versão aplicada fica em PRAGMA user_version
+MIGRACOES = [
+    (1, _migracao_humor_um_por_dia),
+    (2, _migracao_indices_ordenacao_usuarios),
+    (3, _migracao_humor_codificado),
+    (4, _migracao_questionarios_normalizados),
+    (5, _migracao_resumo_humor),
+]
+
+
+def aplicar_migracoes(conn):
+    """Aplica, em ordem, as migrações de schema ainda não aplicadas ao banco."""
+    cursor = conn.cursor()
+    versao_atual = cursor.execute("PRAGMA user_version").fetchone()[0]
+    for versao, migracao in MIGRACOES:
+        if versao > versao_atual:
+            migracao(cursor)
+            cursor.execute(f"PRAGMA user_version = {versao}")
+            versao_atual = versao
 
 
 def criar_tabelas_iniciais():
-    """Cria as tabelas 'usuarios' e 'humor_diario' e o usuário admin default."""
+    """Cria as tabelas 'usuarios' e 'humor_diario', aplica as migrações e cria o usuário admin default."""
     with conectar() as conn:
         cursor = conn.cursor()
         cursor.execute("""
@@ -36,6 +557,7 @@ def criar_tabelas_iniciais():
                 FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
             );
         """)
+        aplicar_migracoes(conn)
         conn.commit()
         cursor.execute("SELECT COUNT(*) FROM usuarios WHERE email = 'admin'")
         if cursor.fetchone()[0] == 0:
@@ -50,20 +572,108 @@ def criar_tabelas_iniciais():
                 print("Usuário 'admin' já existe ou houve um conflito.")
 
 
+# Colunas aceitas na ordenação paginada -> posição na linha retornada
+COLUNAS_ORDENACAO_USUARIOS = {"id": 0, "nome": 1, "email": 2, "idade": 4, "type": 5}
+
+
+def _trechos_keyset(coluna, descendente, cursor_pagina):
+    """Lista, em ordem, os trechos (condição, params) que vêm depois do cursor
+    (valor, id). Cada trecho é uma busca por intervalo no índice da coluna.
+
+    A ordenação segue o SQLite (NULLs primeiro em ASC, por último em DESC) e o
+    trecho de NULLs é consultado à parte: um row value com NULL não compara, e
+    um OR entre os dois trechos faria o SQLite varrer o índice desde o início."""
+    op = "<" if descendente else ">"
+    nulos, nao_nulos = f"{coluna} IS NULL", f"{coluna} IS NOT NULL"
+    if cursor_pagina is None:
+        return [(nao_nulos, ()), (nulos, ())] if descendente else [(nulos, ()), (nao_nulos, ())]
+    valor, ultimo_id = cursor_pagina
+    if valor is None:
+        trecho_nulos = (f"{nulos} AND id {op} ?", (ultimo_id,))
+        return [trecho_nulos] if descendente else [trecho_nulos, (nao_nulos, ())]
+    trecho = (f"({coluna}, id) {op} (?, ?)", (valor, ultimo_id))
+    return [trecho, (nulos, ())] if descendente else [trecho]
+
+
+# Linha de login: dados do usuário, se respondeu o questionário de bem-estar
+# (0/1), pet sugerido e se respondeu o questionário de pet (0/1)
+SQL_USUARIO_COMPLETO = f"""
+    SELECT u.id, u.nome, u.email, u.senha, u.idade, u.type,
+        EXISTS (SELECT 1 FROM questionario_respostas r JOIN questionario_perguntas p ON p.id = r.pergunta_id
+                WHERE r.usuario_id = u.id AND p.questionario = {QUESTIONARIO_BEM_ESTAR}),
+        u.pet_sugerido,
+        EXISTS (SELECT 1 FROM questionario_respostas r JOIN questionario_perguntas p ON p.id = r.pergunta_id
+                WHERE r.usuario_id = u.id AND p.questionario = {QUESTIONARIO_PET})
+    FROM usuarios u
+"""
+
+
+# Buscas de humor de um usuário: todas pela chave (usuario_id, dia) de
+# humor_registro, sem SCAN (ver tests/test_planos_consulta.py)
+SQL_HUMOR_DIA = (
+    "SELECT h.usuario_id, date(h.dia * 86400, 'unixepoch'), s.texto "
+    "FROM humor_registro h JOIN sentimentos s ON s.id = h.sentimento_id "
+    "WHERE h.usuario_id = ? AND h.dia = ?")
+SQL_HUMOR_HISTORICO = (
+    "SELECT date(h.dia * 86400, 'unixepoch'), s.texto "
+    "FROM humor_registro h JOIN sentimentos s ON s.id = h.sentimento_id "
+    "WHERE h.usuario_id = ? ORDER BY h.dia DESC LIMIT ?")
+SQL_HUMOR_MENSAL = (
+    "SELECT h.dia, s.texto FROM humor_registro h JOIN sentimentos s ON s.id = h.sentimento_id "
+    "WHERE h.usuario_id = ? AND h.dia BETWEEN ? AND ?")
+
+
+# Filtro por uma lista de ids passada como um único parâmetro JSON (sem limite
+# de variáveis do SQLite e com um só statement preparado para qualquer tamanho)
+EM_LISTA_IDS = "IN (SELECT value FROM json_each(?))"
+
+
+def _lista_ids(ids):
+    return json.dumps(list(ids))
+
+
+def iterar_linhas(sql, params=(), tamanho_lote=5000):
+    """Gerador das linhas de uma consulta, buscadas com fetchmany: a memória usada
+    não depende do tamanho do resultado. A conexão fica emprestada do pool até
+    o gerador terminar (ou ser fechado)."""
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        while True:
+            linhas = cursor.fetchmany(tamanho_lote)
+            if not linhas:
+                return
+            yield from linhas
+
+
+# Linhas de usuarios por ("id", id) e ("email", email); as escritas do DAO invalidam
+cache_usuarios = CacheLRU(CACHE_USUARIOS_TAMANHO, CACHE_USUARIOS_TTL)
+
+
+def invalidar_cache_usuario(id_usuario=None, *emails):
+    """Remove do cache as entradas do usuário (por id e pelos emails informados)."""
+    cache_usuarios.invalidar(*(("email", e) for e in emails))
+    if id_usuario is not None:
+        cache_usuarios.invalidar_se(
+            lambda chave, linha: chave == ("id", id_usuario) or (linha is not None and linha[0] == id_usuario))
+
+
 class Usuario:  # Sua classe DAO para usuários
     @staticmethod
     def buscar_usuario_por_email(email):
-        with conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM usuarios WHERE email = ?", (email,))
-            return cursor.fetchone()
+        def carregar():
+            with conectar() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT * FROM usuarios WHERE email = ?", (email,))
+                return cursor.fetchone()
+        return cache_usuarios.obter_ou_carregar(("email", email), carregar)
 
     @staticmethod
     def buscar_usuario_por_email_senha_tipo(email, senha, tipo_usuario):
         with conectar() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, nome, email, senha, idade, type, respostas_questionario, pet_sugerido, respostas_pet_apoio FROM usuarios WHERE email = ? AND senha = ? AND type = ?",
+                SQL_USUARIO_COMPLETO + "WHERE u.email = ? AND u.senha = ? AND u.type = ?",
                 (email, senha, tipo_usuario)
             )
             return cursor.fetchone()
@@ -74,15 +684,15 @@ class Usuario:  # Sua classe DAO para usuários
             cursor = conn.cursor()
             try:
                 cursor.execute(
-                    "INSERT INTO usuarios (nome, email, senha, idade, type, respostas_questionario, pet_sugerido, respostas_pet_apoio) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                    (nome, email, senha, idade, user_type,
-                     json.dumps(
-                         respostas_questionario) if respostas_questionario else None,
-                     pet_sugerido,
-                     json.dumps(respostas_pet_apoio) if respostas_pet_apoio else None)
+                    "INSERT INTO usuarios (nome, email, senha, idade, type, pet_sugerido) VALUES (?, ?, ?, ?, ?, ?)",
+                    (nome, email, senha, idade, user_type, pet_sugerido)
                 )
+                id_usuario = cursor.lastrowid
+                _gravar_respostas(cursor, id_usuario, QUESTIONARIO_BEM_ESTAR, respostas_questionario)
+                _gravar_respostas(cursor, id_usuario, QUESTIONARIO_PET, respostas_pet_apoio)
                 conn.commit()
-                return cursor.lastrowid
+                invalidar_cache_usuario(None, email)  # Pode haver um "não existe" em cache
+                return id_usuario
             except sqlite3.IntegrityError:
                 return None
 
@@ -102,6 +712,43 @@ class Usuario:  # Sua classe DAO para usuários
                 "SELECT id, nome, idade FROM usuarios WHERE type = ?", (tipo_usuario,))
             return cursor.fetchall()
 
+    @staticmethod
+    def listar_usuarios_paginado(ordenar_por="id", descendente=False, tamanho_pagina=50,
+                                 cursor_pagina=None, tipo_usuario=None):
+        """Lista usuários uma página por vez (paginação por keyset, sem OFFSET).
+           Retorna (linhas, proximo_cursor); proximo_cursor é None na última página.
+           As linhas têm o mesmo formato de listar_todos_usuarios."""
+        if ordenar_por not in COLUNAS_ORDENACAO_USUARIOS:
+            raise ValueError(f"Coluna de ordenação inválida: {ordenar_por}")
+        direcao = "DESC" if descendente else "ASC"
+        if ordenar_por == "id":
+            ordem = f"id {direcao}"
+            trechos = [("1", ())] if cursor_pagina is None else [
+                (f"id {'<' if descendente else '>'} ?", (cursor_pagina[1],))]
+        else:
+            ordem = f"{ordenar_por} {direcao}, id {direcao}"
+            trechos = _trechos_keyset(ordenar_por, descendente, cursor_pagina)
+        filtro_tipo, params_tipo = ("type = ? AND ", (tipo_usuario,)) if tipo_usuario is not None else ("", ())
+
+        # Busca uma linha a mais só para saber se existe próxima página
+        linhas = []
+        with conectar() as conn:
+            cursor = conn.cursor()
+            for condicao, params in trechos:
+                faltam = tamanho_pagina + 1 - len(linhas)
+                if faltam <= 0:
+                    break
+                cursor.execute(
+                    f"SELECT id, nome, email, senha, idade, type FROM usuarios "
+                    f"WHERE {filtro_tipo}{condicao} ORDER BY {ordem} LIMIT ?",
+                    (*params_tipo, *params, faltam))
+                linhas.extend(cursor.fetchall())
+        if len(linhas) <= tamanho_pagina:
+            return linhas, None
+        linhas = linhas[:tamanho_pagina]
+        ultima = linhas[-1]
+        return linhas, (ultima[COLUNAS_ORDENACAO_USUARIOS[ordenar_por]], ultima[0])
+
     @staticmethod
     def atualizar_dados_usuario(id_usuario, nome, email, senha, idade):
         with conectar() as conn:
@@ -113,46 +760,50 @@ class Usuario:  # Sua classe DAO para usuários
                     WHERE id = ?
                 """, (nome, email, senha, idade, id_usuario))
                 conn.commit()
+                invalidar_cache_usuario(id_usuario, email)
                 return True
             except sqlite3.IntegrityError:
                 return False
 
     @staticmethod
-    def atualizar_respostas_questionario_usuario(id_usuario, respostas_json_string):
-        with conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE usuarios SET respostas_questionario = ? WHERE id = ?",
-                (respostas_json_string, id_usuario)
-            )
-            conn.commit()
+    # respostas: lista de {"pergunta": texto, "resposta": valor}
+    def atualizar_respostas_questionario_usuario(id_usuario, respostas):
+        executar_escrita(lambda cursor: _gravar_respostas(cursor, id_usuario, QUESTIONARIO_BEM_ESTAR, respostas))
 
     @staticmethod
-    def atualizar_pet_usuario(id_usuario, pet_sugerido, respostas_pet_apoio_json_string):
-        with conectar() as conn:
-            cursor = conn.cursor()
+    def atualizar_pet_usuario(id_usuario, pet_sugerido, respostas_pet_apoio):
+        def gravar(cursor):
             cursor.execute(
-                "UPDATE usuarios SET pet_sugerido = ?, respostas_pet_apoio = ? WHERE id = ?",
-                (pet_sugerido, respostas_pet_apoio_json_string, id_usuario)
+                "UPDATE usuarios SET pet_sugerido = ? WHERE id = ?",
+                (pet_sugerido, id_usuario)
             )
-            conn.commit()
+            _gravar_respostas(cursor, id_usuario, QUESTIONARIO_PET, respostas_pet_apoio)
+        executar_escrita(gravar)
+        invalidar_cache_usuario(id_usuario)
 
     @staticmethod
     def deletar_usuario_por_id(id_usuario):
         with conectar() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "DELETE FROM humor_diario WHERE usuario_id = ?", (id_usuario,))
+                "DELETE FROM humor_registro WHERE usuario_id = ?", (id_usuario,))
+            cursor.execute(
+                "DELETE FROM humor_resumo WHERE usuario_id = ?", (id_usuario,))
+            cursor.execute(
+                "DELETE FROM questionario_respostas WHERE usuario_id = ?", (id_usuario,))
             cursor.execute("DELETE FROM usuarios WHERE id = ?", (id_usuario,))
             conn.commit()
+        invalidar_cache_usuario(id_usuario)
 
     @staticmethod
     def buscar_usuario_por_id(id_usuario):
-        with conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT * FROM usuarios WHERE id = ?", (id_usuario,))
-            return cursor.fetchone()
+        def carregar():
+            with conectar() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT * FROM usuarios WHERE id = ?", (id_usuario,))
+                return cursor.fetchone()
+        return cache_usuarios.obter_ou_carregar(("id", id_usuario), carregar)
 
     # MODIFICADO: buscar_colaboradores_com_email
     @staticmethod
@@ -165,45 +816,309 @@ class Usuario:  # Sua classe DAO para usuários
             return cursor.fetchall()  # Retorna lista de tuplas (nome, email)
 
     @staticmethod
+    def buscar_nomes_por_ids(ids_usuarios):
+        """{id: nome} dos usuários informados, em uma única consulta."""
+        with conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT id, nome FROM usuarios WHERE id {EM_LISTA_IDS}", (_lista_ids(ids_usuarios),))
+            return dict(cursor.fetchall())
+
+    @staticmethod
+    # Retorna (nome, pet_sugerido); as respostas vêm de QuestionarioDAO
     def buscar_detalhes_usuario_para_colaborador(id_usuario):
         with conectar() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT nome, respostas_questionario, pet_sugerido, respostas_pet_apoio FROM usuarios WHERE id = ? AND type = ?",
+                "SELECT nome, pet_sugerido FROM usuarios WHERE id = ? AND type = ?",
                 (id_usuario, TIPO_USUARIO_COMUM)
             )
             return cursor.fetchone()
 
+    @staticmethod
+    def buscar_detalhes_usuarios_para_colaborador(ids_usuarios):
+        """{id: (nome, pet_sugerido)} dos usuários comuns entre os informados, em uma consulta."""
+        with conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT id, nome, pet_sugerido FROM usuarios WHERE id {EM_LISTA_IDS} AND type = ?",
+                (_lista_ids(ids_usuarios), TIPO_USUARIO_COMUM)
+            )
+            return {linha[0]: linha[1:] for linha in cursor.fetchall()}
 
-class HumorDiarioDAO:
+
+def ids_perguntas(cursor, questionario, textos):
+    """Ids das perguntas no catálogo, na ordem de `textos`, inserindo as que faltam."""
+    cursor.executemany(
+        "INSERT OR IGNORE INTO questionario_perguntas (questionario, texto) VALUES (?, ?)",
+        [(questionario, t) for t in textos])
+    ids = dict(cursor.execute(
+        "SELECT texto, id FROM questionario_perguntas WHERE questionario = ?", (questionario,)).fetchall())
+    return [ids[t] for t in textos]
+
+
+def _gravar_respostas(cursor, usuario_id, questionario, respostas):
+    """Substitui as respostas do usuário para um questionário (na transação do chamador).
+    respostas: lista de {"pergunta": texto, "resposta": valor}."""
+    if not respostas:
+        return
+    pergunta_ids = ids_perguntas(cursor, questionario, [r["pergunta"] for r in respostas])
+    cursor.execute(
+        "DELETE FROM questionario_respostas WHERE usuario_id = ? AND pergunta_id IN "
+        "(SELECT id FROM questionario_perguntas WHERE questionario = ?)", (usuario_id, questionario))
+    cursor.executemany(
+        "INSERT OR REPLACE INTO questionario_respostas (usuario_id, pergunta_id, resposta) VALUES (?, ?, ?)",
+        [(usuario_id, pid, r["resposta"]) for pid, r in zip(pergunta_ids, respostas)])
+
+
+class QuestionarioDAO:
     @staticmethod
-    def inserir_humor_diario(usuario_id, data, sentimento):
+    def buscar_respostas_usuario(usuario_id):
+        """Respostas do usuário a todos os questionários: (questionario, pergunta, resposta),
+           na ordem em que as perguntas entraram no catálogo."""
         with conectar() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "INSERT INTO humor_diario (usuario_id, data, sentimento) VALUES (?, ?, ?)",
-                (usuario_id, data, sentimento)
+                "SELECT p.questionario, p.texto, r.resposta FROM questionario_respostas r "
+                "JOIN questionario_perguntas p ON p.id = r.pergunta_id "
+                "WHERE r.usuario_id = ? ORDER BY p.questionario, p.id",
+                (usuario_id,)
             )
-            conn.commit()
+            return cursor.fetchall()
 
     @staticmethod
-    # data no formato 'YYYY-MM-DD'
-    def buscar_humor_diario_usuario_data(usuario_id, data):
+    def buscar_respostas_usuarios(ids_usuarios):
+        """Como buscar_respostas_usuario, para vários usuários em uma consulta:
+           linhas (usuario_id, questionario, pergunta, resposta) ordenadas por usuário."""
         with conectar() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, usuario_id, data, sentimento FROM humor_diario WHERE usuario_id = ? AND data = ?",
-                (usuario_id, data)
+                "SELECT r.usuario_id, p.questionario, p.texto, r.resposta FROM questionario_respostas r "
+                "JOIN questionario_perguntas p ON p.id = r.pergunta_id "
+                f"WHERE r.usuario_id {EM_LISTA_IDS} ORDER BY r.usuario_id, p.questionario, p.id",
+                (_lista_ids(ids_usuarios),)
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def contar_respostas(questionario):
+        """Quantos usuários deram cada resposta a cada pergunta de um questionário:
+           lista de (pergunta, resposta, total)."""
+        with conectar() as conn:
+            cursor = conn.cursor()
+            # Agrega direto no índice (já ordenado por pergunta_id, resposta); o
+            # texto da pergunta só é buscado para as poucas linhas agregadas
+            cursor.execute("""
+                SELECT p.texto, c.resposta, c.total
+                FROM (SELECT pergunta_id, resposta, COUNT(*) AS total FROM questionario_respostas
+                      WHERE pergunta_id IN (SELECT id FROM questionario_perguntas WHERE questionario = ?)
+                      GROUP BY pergunta_id, resposta) c
+                JOIN questionario_perguntas p ON p.id = c.pergunta_id
+                ORDER BY c.pergunta_id, c.resposta
+            """, (questionario,))
+            return cursor.fetchall()
+
+
+_EPOCA = date(1970, 1, 1).toordinal()
+
+
+def data_para_dia(data):
+    """Converte date ou 'YYYY-MM-DD' no número do dia usado em humor_registro."""
+    if isinstance(data, str):
+        data = date.fromisoformat(data)
+    return data.toordinal() - _EPOCA
+
+
+def dia_para_data(dia):
+    """Converte o número do dia de humor_registro em date."""
+    return date.fromordinal(dia + _EPOCA)
+
+
+_POSITIVOS = {s.lower() for s in SENTIMENTOS_POSITIVOS}
+_NEGATIVOS = {s.lower() for s in SENTIMENTOS_NEGATIVOS}
+
+
+def valencia_sentimento(texto):
+    """+1 para sentimentos positivos, -1 para negativos e 0 para os demais."""
+    texto = (texto or "").strip().lower()
+    if texto in _POSITIVOS:
+        return 1
+    if texto in _NEGATIVOS:
+        return -1
+    return 0
+
+
+def obter_sentimento(cursor, sentimento):
+    """(id, valencia) do sentimento no dicionário, inserindo-o se ainda não existe."""
+    linha = cursor.execute("SELECT id, valencia FROM sentimentos WHERE texto = ?", (sentimento,)).fetchone()
+    if linha:
+        return linha
+    valencia = valencia_sentimento(sentimento)
+    cursor.execute("INSERT INTO sentimentos (texto, valencia) VALUES (?, ?)", (sentimento, valencia))
+    return cursor.lastrowid, valencia
+
+
+_MASCARA_JANELA = (1 << JANELA_RESUMO_HUMOR_DIAS) - 1
+
+
+def _desloca(coluna):
+    # Máscara antiga "envelhecida" até o novo último dia
+    return (f"CASE WHEN excluded.ultimo_dia - ultimo_dia >= {JANELA_RESUMO_HUMOR_DIAS} THEN 0 "
+            f"ELSE ({coluna} << (excluded.ultimo_dia - ultimo_dia)) & {_MASCARA_JANELA} END")
+
+
+# Registro mais novo que o último do resumo: atualização O(1) em um statement.
+# O WHERE recusa registros fora de ordem (rowcount 0), que recalculam o usuário.
+_SQL_RESUMO_INCREMENTAL = f"""
+    INSERT INTO humor_resumo (usuario_id, ultimo_dia, ultimo_sentimento_id, sequencia_atual,
+        total_registros, mascara_positivos, mascara_neutros, mascara_negativos)
+    VALUES (?, ?, ?, 1, 1, ?, ?, ?)
+    ON CONFLICT (usuario_id) DO UPDATE SET
+        sequencia_atual = CASE WHEN excluded.ultimo_dia = ultimo_dia + 1 THEN sequencia_atual + 1 ELSE 1 END,
+        total_registros = total_registros + 1,
+        mascara_positivos = {_desloca("mascara_positivos")} | excluded.mascara_positivos,
+        mascara_neutros = {_desloca("mascara_neutros")} | excluded.mascara_neutros,
+        mascara_negativos = {_desloca("mascara_negativos")} | excluded.mascara_negativos,
+        ultimo_dia = excluded.ultimo_dia,
+        ultimo_sentimento_id = excluded.ultimo_sentimento_id
+    WHERE excluded.ultimo_dia > humor_resumo.ultimo_dia
+"""
+
+
+def _bits_classe(condicao):
+    return (f"SUM(CASE WHEN {condicao} AND dia > ultimo - {JANELA_RESUMO_HUMOR_DIAS} "
+            f"THEN 1 << (ultimo - dia) ELSE 0 END)")
+
+
+# Recalcula o resumo a partir de humor_registro. Sequência: dias seguidos têm o
+# mesmo valor de dia - posição ("ilha"); a sequência atual é a ilha do último dia
+_SQL_RESUMO_COMPLETO = f"""
+    INSERT OR REPLACE INTO humor_resumo (usuario_id, ultimo_dia, ultimo_sentimento_id,
+        sequencia_atual, total_registros, mascara_positivos, mascara_neutros, mascara_negativos)
+    WITH ordenado AS (
+        SELECT h.usuario_id, h.dia, h.sentimento_id, s.valencia,
+            MAX(h.dia) OVER usuario AS ultimo,
+            h.dia - ROW_NUMBER() OVER (usuario ORDER BY h.dia) AS ilha
+        FROM humor_registro h JOIN sentimentos s ON s.id = h.sentimento_id
+        {{filtro}}
+        WINDOW usuario AS (PARTITION BY h.usuario_id)
+    ), marcado AS (
+        SELECT *, FIRST_VALUE(ilha) OVER (PARTITION BY usuario_id ORDER BY dia DESC) AS ilha_final
+        FROM ordenado
+    )
+    SELECT usuario_id, ultimo, MAX(CASE WHEN dia = ultimo THEN sentimento_id END),
+        SUM(ilha = ilha_final), COUNT(*),
+        {_bits_classe("valencia > 0")}, {_bits_classe("valencia = 0")}, {_bits_classe("valencia < 0")}
+    FROM marcado GROUP BY usuario_id
+"""
+
+
+def _reconstruir_resumo_humor(cursor, usuario_id=None):
+    """Recalcula humor_resumo de um usuário (ou de todos) na transação do chamador."""
+    if usuario_id is None:
+        cursor.execute("DELETE FROM humor_resumo")
+        cursor.execute(_SQL_RESUMO_COMPLETO.format(filtro=""))
+    else:
+        cursor.execute("DELETE FROM humor_resumo WHERE usuario_id = ?", (usuario_id,))
+        cursor.execute(_SQL_RESUMO_COMPLETO.format(filtro="WHERE h.usuario_id = ?"), (usuario_id,))
+
+
+def reconstruir_resumo_humor_usuarios(cursor, ids_usuarios):
+    """Recalcula humor_resumo dos usuários informados na transação do chamador
+    (ex.: após inserir humor em lote direto em humor_registro)."""
+    lista = _lista_ids(ids_usuarios)
+    cursor.execute(f"DELETE FROM humor_resumo WHERE usuario_id {EM_LISTA_IDS}", (lista,))
+    cursor.execute(_SQL_RESUMO_COMPLETO.format(filtro=f"WHERE h.usuario_id {EM_LISTA_IDS}"), (lista,))
+
+
+def _atualizar_resumo_humor(cursor, usuario_id, dia, sentimento_id, valencia):
+    """Aplica um novo registro de humor ao resumo do usuário (mesma transação do INSERT)."""
+    cursor.execute(_SQL_RESUMO_INCREMENTAL, (usuario_id, dia, sentimento_id,
+                                             int(valencia > 0), int(valencia == 0), int(valencia < 0)))
+    if cursor.rowcount == 0:  # Dia anterior ao último registrado
+        _reconstruir_resumo_humor(cursor, usuario_id)
+
+
+class HumorDiarioDAO:
+    @staticmethod
+    def inserir_humor_diario(usuario_id, data, sentimento):
+        dia = data_para_dia(data)
+
+        def gravar(cursor):
+            sentimento_id, valencia = obter_sentimento(cursor, sentimento)
+            cursor.execute(
+                "INSERT INTO humor_registro (usuario_id, dia, sentimento_id) VALUES (?, ?, ?)",
+                (usuario_id, dia, sentimento_id)
             )
+            _atualizar_resumo_humor(cursor, usuario_id, dia, sentimento_id, valencia)
+        executar_escrita(gravar)
+
+    @staticmethod
+    def inserir_humor_diario_se_ausente(usuario_id, data, sentimento):
+        """Registra o humor do dia em um único statement (sem corrida entre
+        verificar e inserir). Retorna True se criou o registro, False se o
+        usuário já tinha humor registrado nessa data."""
+        dia = data_para_dia(data)
+
+        def gravar(cursor):
+            sentimento_id, valencia = obter_sentimento(cursor, sentimento)
+            cursor.execute(
+                "INSERT INTO humor_registro (usuario_id, dia, sentimento_id) VALUES (?, ?, ?) "
+                "ON CONFLICT (usuario_id, dia) DO NOTHING",
+                (usuario_id, dia, sentimento_id)
+            )
+            criado = cursor.rowcount == 1
+            if criado:
+                _atualizar_resumo_humor(cursor, usuario_id, dia, sentimento_id, valencia)
+            return criado
+        return executar_escrita(gravar)
+
+    @staticmethod
+    # data: date ou 'YYYY-MM-DD'; retorna (usuario_id, data 'YYYY-MM-DD', sentimento)
+    def buscar_humor_diario_usuario_data(usuario_id, data):
+        with conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_HUMOR_DIA, (usuario_id, data_para_dia(data)))
             return cursor.fetchone()
 
     @staticmethod
     def buscar_historico_humor_usuario(id_usuario, limite=7):
+        with conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_HUMOR_HISTORICO, (id_usuario, limite))
+            return cursor.fetchall()
+
+    @staticmethod
+    def buscar_historicos_humor_usuarios(ids_usuarios, limite=7):
+        """{usuario_id: [(data, sentimento), ...]} com os `limite` registros mais
+           recentes de cada usuário, em uma consulta (ROW_NUMBER por usuário)."""
+        with conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT h.usuario_id, date(h.dia * 86400, 'unixepoch'), s.texto
+                FROM (SELECT usuario_id, dia, sentimento_id,
+                             ROW_NUMBER() OVER (PARTITION BY usuario_id ORDER BY dia DESC) AS posicao
+                      FROM humor_registro WHERE usuario_id {EM_LISTA_IDS}) h
+                JOIN sentimentos s ON s.id = h.sentimento_id
+                WHERE h.posicao <= ?
+                ORDER BY h.usuario_id, h.dia DESC
+            """, (_lista_ids(ids_usuarios), limite))
+            historicos = {}
+            for usuario_id, data, sentimento in cursor.fetchall():
+                historicos.setdefault(usuario_id, []).append((data, sentimento))
+            return historicos
+
+    @staticmethod
+    def buscar_humor_intervalo(usuario_id, data_inicio, data_fim):
+        """Registros (dia, sentimento) de um usuário entre duas datas (inclusive),
+           em ordem, numa única busca por intervalo na chave (usuario_id, dia).
+           dia é o número do dia (ver data_para_dia)."""
         with conectar() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT data, sentimento FROM humor_diario WHERE usuario_id = ? ORDER BY data DESC LIMIT ?",
-                (id_usuario, limite)
+                "SELECT h.dia, s.texto FROM humor_registro h JOIN sentimentos s ON s.id = h.sentimento_id "
+                "WHERE h.usuario_id = ? AND h.dia BETWEEN ? AND ? ORDER BY h.dia",
+                (usuario_id, data_para_dia(data_inicio), data_para_dia(data_fim))
             )
             return cursor.fetchall()
 
@@ -212,27 +1127,35 @@ class HumorDiarioDAO:
     def buscar_humor_mensal(usuario_id, ano, mes):
         """Busca todos os registros de humor para um usuário em um ano/mês específico.
            Retorna um dicionário {dia: sentimento}."""
-        # Formata o mês para ter dois dígitos (ex: 7 -> '07')
-        mes_formatado = f"{mes:02d}"
-        data_inicio = f"{ano}-{mes_formatado}-01"
-        # Para o fim do mês, podemos usar um truque ou calcular o último dia.
-        # Aqui, vamos buscar todos que começam com 'AAAA-MM-'
-        data_like = f"{ano}-{mes_formatado}-%"
+        # Intervalo fechado de dias do primeiro ao último dia do mês
+        primeiro = data_para_dia(date(ano, mes, 1))
+        ultimo = primeiro + calendar.monthrange(ano, mes)[1] - 1
+        with conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_HUMOR_MENSAL, (usuario_id, primeiro, ultimo))
+            # Dia do mês direto do número do dia, sem interpretar texto
+            return {dia - primeiro + 1: sentimento for dia, sentimento in cursor.fetchall()}
 
-        humores_do_mes = {}
+    @staticmethod
+    def buscar_resumos_humor(ids_usuarios):
+        """{usuario_id: (ultimo_dia, ultimo_sentimento, sequencia_atual, total_registros,
+           mascara_positivos, mascara_neutros, mascara_negativos)} em uma única consulta
+           (ver _migracao_resumo_humor). Usuários sem humor registrado ficam de fora."""
         with conectar() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT data, sentimento FROM humor_diario WHERE usuario_id = ? AND data LIKE ?",
-                (usuario_id, data_like)
-            )
-            for row in cursor.fetchall():
-                # Extrai o dia da data 'YYYY-MM-DD'
-                try:
-                    dia = int(row[0].split('-')[2])
-                    # Armazena sentimento para o dia
-                    humores_do_mes[dia] = row[1]
-                except (IndexError, ValueError):
-                    print(
-                        f"Formato de data inválido encontrado no banco: {row[0]}")
-        return humores_do_mes
+                "SELECT r.usuario_id, r.ultimo_dia, s.texto, r.sequencia_atual, r.total_registros, "
+                "r.mascara_positivos, r.mascara_neutros, r.mascara_negativos "
+                "FROM humor_resumo r JOIN sentimentos s ON s.id = r.ultimo_sentimento_id "
+                f"WHERE r.usuario_id {EM_LISTA_IDS}",
+                (_lista_ids(ids_usuarios),))
+            return {linha[0]: linha[1:] for linha in cursor.fetchall()}
+
+    @staticmethod
+    def reconstruir_resumo_humor():
+        """Recalcula humor_resumo do zero. Retorna a quantidade de usuários resumidos."""
+        with conectar() as conn:
+            cursor = conn.cursor()
+            _reconstruir_resumo_humor(cursor)
+            conn.commit()
+            return cursor.execute("SELECT COUNT(*) FROM humor_resumo").fetchone()[0]
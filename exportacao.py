@@ -0,0 +1,108 @@
+# exportacao.py
+"""Exportação em streaming de usuários, respostas de questionário e humor.
+
+Cada conjunto é lido com fetchmany (database_manager.iterar_linhas) e escrito
+linha a linha em CSV ou NDJSON (JSON Lines), opcionalmente com gzip: a
+memória usada é a mesma para 1 mil ou 10 milhões de linhas. As consultas
+seguem a ordem das chaves primárias, então o SQLite não precisa ordenar.
+
+Exemplo (ver manutencao.py):
+    python manutencao.py exportar humor --formato ndjson --saida humor.ndjson.gz
+"""
+import csv
+import gzip
+import json
+import time
+
+import database_manager
+from config import NOMES_QUESTIONARIOS
+
+FORMATOS = ("csv", "ndjson")
+INTERVALO_PROGRESSO = 1.0  # Segundos entre chamadas de ao_progresso
+
+_NOME_QUESTIONARIO_SQL = "CASE p.questionario {} END".format(
+    " ".join(f"WHEN {codigo} THEN '{nome}'" for codigo, nome in NOMES_QUESTIONARIOS.items()))
+
+# conjunto -> (colunas, consulta). A senha não é exportada.
+CONJUNTOS = {
+    "usuarios": (
+        ("id", "nome", "email", "idade", "type", "pet_sugerido"),
+        "SELECT id, nome, email, idade, type, pet_sugerido FROM usuarios ORDER BY id",
+    ),
+    "respostas": (
+        ("usuario_id", "questionario", "pergunta", "resposta"),
+        f"SELECT r.usuario_id, {_NOME_QUESTIONARIO_SQL}, p.texto, r.resposta "
+        "FROM questionario_respostas r JOIN questionario_perguntas p ON p.id = r.pergunta_id "
+        "ORDER BY r.usuario_id, r.pergunta_id",
+    ),
+    "humor": (
+        ("usuario_id", "data", "sentimento"),
+        "SELECT h.usuario_id, date(h.dia * 86400, 'unixepoch'), s.texto "
+        "FROM humor_registro h JOIN sentimentos s ON s.id = h.sentimento_id "
+        "ORDER BY h.usuario_id, h.dia",
+    ),
+}
+
+
+class _ContadorBytes:
+    """Envolve o arquivo de saída contando os bytes escritos em UTF-8 (antes do gzip)."""
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self.escritos = 0
+
+    def write(self, texto):
+        # ASCII (a maior parte das linhas): 1 byte por caractere, sem codificar
+        self.escritos += len(texto) if texto.isascii() else len(texto.encode("utf-8"))
+        return self.arquivo.write(texto)
+
+
+def _abrir_saida(caminho, comprimir):
+    if comprimir:
+        # Nível 6 (o do gzip de linha de comando): bem mais rápido que o 9 padrão do Python
+        return gzip.open(caminho, "wt", compresslevel=6, encoding="utf-8", newline="")
+    return open(caminho, "w", encoding="utf-8", newline="")
+
+
+def _escritor(saida, formato, colunas):
+    """Função que escreve uma linha (tupla na ordem de `colunas`) no formato pedido."""
+    if formato == "csv":
+        escritor_csv = csv.writer(saida)
+        escritor_csv.writerow(colunas)
+        return escritor_csv.writerow
+
+    def escrever_ndjson(linha):
+        saida.write(json.dumps(dict(zip(colunas, linha)), ensure_ascii=False))
+        saida.write("\n")
+    return escrever_ndjson
+
+
+def exportar(conjunto, caminho, formato="csv", comprimir=None, tamanho_lote=5000, ao_progresso=None):
+    """Exporta um conjunto de CONJUNTOS para `caminho`.
+    comprimir=None decide pela extensão (.gz). ao_progresso(linhas, segundos)
+    é chamado no máximo uma vez por INTERVALO_PROGRESSO.
+    Retorna {"linhas", "segundos", "linhas_por_segundo", "bytes"}, com bytes
+    o tamanho em UTF-8 do conteúdo (sem compressão)."""
+    if conjunto not in CONJUNTOS:
+        raise ValueError(f"Conjunto inválido: {conjunto} (use {', '.join(CONJUNTOS)})")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato} (use {', '.join(FORMATOS)})")
+    if comprimir is None:
+        comprimir = caminho.endswith(".gz")
+    colunas, sql = CONJUNTOS[conjunto]
+    inicio = time.perf_counter()
+    proximo_aviso = inicio + INTERVALO_PROGRESSO
+    total = 0
+    with _abrir_saida(caminho, comprimir) as arquivo:
+        saida = _ContadorBytes(arquivo)
+        escrever = _escritor(saida, formato, colunas)
+        for linha in database_manager.iterar_linhas(sql, tamanho_lote=tamanho_lote):
+            escrever(linha)
+            total += 1
+            if ao_progresso and total % 1000 == 0 and time.perf_counter() >= proximo_aviso:
+                ao_progresso(total, time.perf_counter() - inicio)
+                proximo_aviso = time.perf_counter() + INTERVALO_PROGRESSO
+    decorrido = time.perf_counter() - inicio
+    return {"linhas": total, "segundos": round(decorrido, 3),
+            "linhas_por_segundo": round(total / decorrido) if decorrido > 0 else None,
+            "bytes": saida.escritos}
@@ -0,0 +1,314 @@
+# importacao.py
+"""Importação em streaming de usuários e registros de humor (CSV ou NDJSON).
+
+O arquivo é lido registro a registro e processado em lotes: cada registro
+passa pelos mesmos validadores do cadastro (validators.py), a unicidade dos
+emails é verificada com uma única consulta por lote e os aceitos entram com
+executemany, um lote por transação. Registros recusados vão para um arquivo
+de erros no formato de entrada, com a linha e o motivo, para correção e
+nova importação; a senha sai mascarada (SENHA_OCULTA) e precisa ser
+preenchida de novo.
+
+Exemplo (ver manutencao.py):
+    python manutencao.py importar usuarios parceiro.csv --erros parceiro.erros.csv
+"""
+import csv
+import functools
+import gzip
+import itertools
+import json
+import re
+import time
+from datetime import date
+
+import database_manager
+from config import TIPO_USUARIO_COMUM, TIPO_COLABORADOR, TIPO_ADMINISTRADOR
+from validators import validar_nome_completo, validar_email, validar_senha
+
+FORMATOS = ("csv", "ndjson")
+INTERVALO_PROGRESSO = 1.0  # Segundos entre chamadas de ao_progresso
+IDADE_MAXIMA = 120
+SENHA_OCULTA = "***"  # No lugar da senha no arquivo de erros
+
+# "senha": "..." numa linha NDJSON que não pôde ser lida como objeto
+_SENHA_NO_TEXTO = re.compile(r'("senha"\s*:\s*)"(?:[^"\\]|\\.)*"?')
+
+_SQL_INSERIR_USUARIO = ("INSERT INTO usuarios (nome, email, senha, idade, type, pet_sugerido) "
+                        "VALUES (?, ?, ?, ?, ?, ?)")
+# Dia já registrado para o usuário: mantém o registro existente (como o app faz)
+_SQL_INSERIR_HUMOR = ("INSERT INTO humor_registro (usuario_id, dia, sentimento_id) VALUES (?, ?, ?) "
+                      "ON CONFLICT (usuario_id, dia) DO NOTHING")
+
+
+class RegistroInvalido(ValueError):
+    """Motivo da recusa de um registro; vai para o arquivo de erros."""
+
+
+def formato_pelo_nome(caminho):
+    """'csv' ou 'ndjson' pela extensão do arquivo (ignorando um .gz final)."""
+    nome = caminho[:-3] if caminho.endswith(".gz") else caminho
+    if nome.endswith(".csv"):
+        return "csv"
+    if nome.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    raise ValueError(f"Não foi possível deduzir o formato de {caminho} (use {', '.join(FORMATOS)})")
+
+
+def _abrir(caminho, modo):
+    # utf-8-sig: aceita CSVs salvos pelo Excel (com BOM) na leitura
+    codificacao = "utf-8-sig" if modo == "r" else "utf-8"
+    if caminho.endswith(".gz"):
+        return gzip.open(caminho, modo + "t", encoding=codificacao, newline="")
+    return open(caminho, modo, encoding=codificacao, newline="")
+
+
+def _registros(arquivo, formato):
+    """Gera (número da linha, registro) do arquivo; registro é um dict ou,
+    se a linha não pôde ser lida, um RegistroInvalido."""
+    if formato == "csv":
+        leitor = csv.DictReader(arquivo)
+        for registro in leitor:
+            yield leitor.line_num, registro
+        return
+    for numero, texto in enumerate(arquivo, 1):
+        if not texto.strip():
+            continue
+        try:
+            registro = json.loads(texto)
+        except ValueError as e:
+            registro = RegistroInvalido(f"JSON inválido: {e}")
+        if not isinstance(registro, dict):
+            if not isinstance(registro, RegistroInvalido):
+                registro = RegistroInvalido("a linha não é um objeto JSON")
+            registro.texto = texto.rstrip("\r\n")  # Vai como está para o arquivo de erros
+        yield numero, registro
+
+
+class _ArquivoErros:
+    """Arquivo de registros recusados, criado só na primeira recusa.
+    CSV: colunas da entrada + linha e erro. NDJSON: {"linha", "erro", "registro"}.
+    As recusas de um bloco (validação e lote) ficam pendentes até descarregar(),
+    que as grava na ordem das linhas do arquivo de entrada."""
+
+    def __init__(self, caminho, formato):
+        self.caminho = caminho
+        self.formato = formato
+        self.total = 0
+        self._pendentes = []
+        self._arquivo = None
+        self._escrever = None
+
+    def registrar(self, linha, registro, erro):
+        self.total += 1
+        if self.caminho is not None:
+            self._pendentes.append((linha, registro, erro))
+
+    def descarregar(self):
+        self._pendentes.sort(key=lambda pendente: pendente[0])
+        for linha, registro, erro in self._pendentes:
+            self._gravar(linha, registro, erro)
+        self._pendentes.clear()
+
+    def _gravar(self, linha, registro, erro):
+        if self._arquivo is None:
+            self._arquivo = _abrir(self.caminho, "w")
+            if self.formato == "csv":
+                campos = ["linha", "erro"] + [c for c in (registro if isinstance(registro, dict) else {})
+                                              if c is not None]
+                escritor = csv.DictWriter(self._arquivo, campos, extrasaction="ignore")
+                escritor.writeheader()
+                self._escrever = escritor.writerow
+        if isinstance(registro, dict) and registro.get("senha") is not None:
+            registro = {**registro, "senha": SENHA_OCULTA}
+        if self.formato == "csv":
+            self._escrever({**registro, "linha": linha, "erro": erro})
+        else:
+            original = registro if isinstance(registro, dict) else getattr(registro, "texto", None)
+            if isinstance(original, str):
+                original = _SENHA_NO_TEXTO.sub(rf'\1"{SENHA_OCULTA}"', original)
+            self._arquivo.write(json.dumps({"linha": linha, "erro": erro, "registro": original},
+                                           ensure_ascii=False))
+            self._arquivo.write("\n")
+
+    def fechar(self):
+        self.descarregar()
+        if self._arquivo is not None:
+            self._arquivo.close()
+
+
+def _texto(registro, campo):
+    valor = registro.get(campo)
+    return "" if valor is None else str(valor).strip()
+
+
+def _inteiro(registro, campo):
+    valor = _texto(registro, campo)
+    if not valor:
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise RegistroInvalido(f"{campo} inválido: {valor}") from None
+
+
+def _validar_usuario(registro):
+    """Registro -> tupla de _SQL_INSERIR_USUARIO, com as regras do cadastro."""
+    nome = _texto(registro, "nome")
+    email = _texto(registro, "email")
+    senha = registro.get("senha")
+    senha = "" if senha is None else str(senha)
+    if not validar_nome_completo(nome):
+        raise RegistroInvalido("nome deve ter nome e sobrenome")
+    if not validar_email(email):
+        raise RegistroInvalido(f"email inválido: {email}")
+    if not validar_senha(senha):
+        raise RegistroInvalido("senha deve ter letras, números e no mínimo 8 caracteres")
+    idade = _inteiro(registro, "idade")
+    if idade is not None and not 0 < idade <= IDADE_MAXIMA:
+        raise RegistroInvalido(f"idade fora do intervalo: {idade}")
+    tipo = _inteiro(registro, "type")
+    tipo = TIPO_USUARIO_COMUM if tipo is None else tipo
+    if tipo not in (TIPO_USUARIO_COMUM, TIPO_COLABORADOR, TIPO_ADMINISTRADOR):
+        raise RegistroInvalido(f"type inválido: {tipo}")
+    return (nome, email, senha, idade, tipo, _texto(registro, "pet_sugerido") or None)
+
+
+def _validar_humor(registro, hoje=None):
+    """Registro -> (usuario_id ou email, dia, sentimento). O usuário vem da
+    coluna usuario_id (formato de exportacao.py) ou email. `hoje` é fixado
+    por importar() para toda a importação."""
+    usuario_id = _inteiro(registro, "usuario_id")
+    email = _texto(registro, "email")
+    if usuario_id is None and not email:
+        raise RegistroInvalido("informe usuario_id ou email")
+    texto_data = _texto(registro, "data")
+    try:
+        data = date.fromisoformat(texto_data)
+    except ValueError:
+        raise RegistroInvalido(f"data inválida (use AAAA-MM-DD): {texto_data}") from None
+    if data > (hoje or date.today()):
+        raise RegistroInvalido(f"data no futuro: {texto_data}")
+    sentimento = _texto(registro, "sentimento")
+    if not sentimento:
+        raise RegistroInvalido("sentimento ausente")
+    return (usuario_id if usuario_id is not None else email,
+            database_manager.data_para_dia(data), sentimento)
+
+
+def _em_lista(conn, sql, valores):
+    return conn.execute(sql.format(em=database_manager.EM_LISTA_IDS), (json.dumps(list(valores)),))
+
+
+def _importar_lote_usuarios(conn, lote, recusar, contexto):
+    """Insere os usuários válidos do lote; retorna quantos foram inseridos."""
+    existentes = {email for (email,) in _em_lista(
+        conn, "SELECT email FROM usuarios WHERE email {em}", {t[1] for _, _, t in lote})}
+    aceitos = []
+    for linha, registro, tupla in lote:
+        email = tupla[1]
+        if email in existentes:
+            recusar(linha, registro, f"email já cadastrado: {email}")
+            continue
+        existentes.add(email)  # Repetido mais adiante no mesmo lote
+        aceitos.append(tupla)
+    conn.executemany(_SQL_INSERIR_USUARIO, aceitos)
+    return len(aceitos)
+
+
+def _importar_lote_humor(conn, lote, recusar, contexto):
+    """Insere os registros de humor do lote e recalcula o resumo dos usuários
+    afetados na mesma transação; retorna quantos registros foram inseridos."""
+    ids_informados = {t[0] for _, _, t in lote if isinstance(t[0], int)}
+    emails = {t[0] for _, _, t in lote if isinstance(t[0], str)}
+    ids_existentes = {i for (i,) in _em_lista(
+        conn, "SELECT id FROM usuarios WHERE id {em}", ids_informados)} if ids_informados else set()
+    ids_por_email = dict(_em_lista(
+        conn, "SELECT email, id FROM usuarios WHERE email {em}", emails)) if emails else {}
+
+    sentimentos = contexto.setdefault("sentimentos", {})
+    cursor = conn.cursor()
+    linhas = []
+    for linha, registro, (usuario, dia, sentimento) in lote:
+        usuario_id = ids_por_email.get(usuario) if isinstance(usuario, str) else \
+            (usuario if usuario in ids_existentes else None)
+        if usuario_id is None:
+            recusar(linha, registro, f"usuário não encontrado: {usuario}")
+            continue
+        if sentimento not in sentimentos:
+            sentimentos[sentimento] = database_manager.obter_sentimento(cursor, sentimento)[0]
+        linhas.append((usuario_id, dia, sentimentos[sentimento]))
+    if not linhas:
+        return 0
+    cursor.executemany(_SQL_INSERIR_HUMOR, linhas)
+    inseridos = cursor.rowcount
+    database_manager.reconstruir_resumo_humor_usuarios(cursor, {u for u, _, _ in linhas})
+    return inseridos
+
+
+# conjunto -> (validação de um registro, importação de um lote validado)
+CONJUNTOS = {
+    "usuarios": (_validar_usuario, _importar_lote_usuarios),
+    "humor": (_validar_humor, _importar_lote_humor),
+}
+
+
+def importar(conjunto, caminho, formato=None, caminho_erros=None, tamanho_lote=10000, ao_progresso=None):
+    """Importa um conjunto de CONJUNTOS do arquivo `caminho` (.gz aceito).
+    formato=None decide pela extensão. Registros recusados vão para
+    `caminho_erros` (se informado). ao_progresso(lidas, segundos) é chamado no
+    máximo uma vez por INTERVALO_PROGRESSO.
+    Retorna {"lidas", "importadas", "recusadas", "ignoradas", "segundos", "linhas_por_segundo"};
+    ignoradas são registros de humor de um dia que o usuário já tinha."""
+    if conjunto not in CONJUNTOS:
+        raise ValueError(f"Conjunto inválido: {conjunto} (use {', '.join(CONJUNTOS)})")
+    formato = formato or formato_pelo_nome(caminho)
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato} (use {', '.join(FORMATOS)})")
+    validar, importar_lote = CONJUNTOS[conjunto]
+    if validar is _validar_humor:
+        validar = functools.partial(_validar_humor, hoje=date.today())
+    erros = _ArquivoErros(caminho_erros, formato)
+    contexto = {}  # Compartilhado pelos lotes (ex.: ids de sentimento já resolvidos)
+    lidas = importadas = ignoradas = 0
+    inicio = time.perf_counter()
+    proximo_aviso = inicio + INTERVALO_PROGRESSO
+    try:
+        with _abrir(caminho, "r") as arquivo:
+            registros = _registros(arquivo, formato)
+            while True:
+                bloco = list(itertools.islice(registros, tamanho_lote))
+                if not bloco:
+                    break
+                lidas += len(bloco)
+                lote = []
+                for linha, registro in bloco:
+                    try:
+                        if isinstance(registro, RegistroInvalido):
+                            raise registro
+                        tupla = validar(registro)
+                    except RegistroInvalido as e:
+                        erros.registrar(linha, registro, str(e))
+                        continue
+                    lote.append((linha, registro, tupla))
+                if not lote:
+                    erros.descarregar()
+                    continue
+                recusadas_antes = erros.total
+                with database_manager.conectar() as conn:
+                    # IMMEDIATE: nenhum outro processo grava entre a verificação e o INSERT
+                    conn.execute("BEGIN IMMEDIATE")
+                    inseridas = importar_lote(conn, lote, erros.registrar, contexto)
+                importadas += inseridas
+                ignoradas += len(lote) - (erros.total - recusadas_antes) - inseridas
+                erros.descarregar()
+                if ao_progresso and time.perf_counter() >= proximo_aviso:
+                    ao_progresso(lidas, time.perf_counter() - inicio)
+                    proximo_aviso = time.perf_counter() + INTERVALO_PROGRESSO
+    finally:
+        erros.fechar()
+    if conjunto == "usuarios" and importadas:
+        database_manager.cache_usuarios.limpar()  # Pode haver "não existe" em cache para os novos emails
+    decorrido = time.perf_counter() - inicio
+    return {"lidas": lidas, "importadas": importadas, "recusadas": erros.total, "ignoradas": ignoradas,
+            "segundos": round(decorrido, 3),
+            "linhas_por_segundo": round(lidas / decorrido) if decorrido > 0 else None}
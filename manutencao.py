@@ -0,0 +1,141 @@
+# manutencao.py
+"""Tarefas de manutenção do banco do SafeSpace.
+
+Exemplo:
+    python manutencao.py reconstruir-resumo
+    python manutencao.py --banco bench_data/bench_100000_d60_s42.db reconstruir-resumo
+    python manutencao.py exportar usuarios --formato csv --saida usuarios.csv.gz
+    python manutencao.py importar usuarios parceiro.csv
+    python manutencao.py snapshot --manter 24 --intervalo 3600
+    python manutencao.py restaurar backups/safespace-20240101-030000.db
+"""
+import argparse
+import time
+
+import backup
+import database_manager
+import exportacao
+import importacao
+
+
+def reconstruir_resumo():
+    """Recalcula humor_resumo a partir de humor_registro (ex.: após inserções diretas)."""
+    inicio = time.perf_counter()
+    total = database_manager.HumorDiarioDAO.reconstruir_resumo_humor()
+    print(f"Resumo de humor recalculado para {total:,} usuários em {time.perf_counter() - inicio:.1f}s.")
+
+
+def _mostrar_progresso(rotulo):
+    def mostrar(linhas, segundos):
+        print(f"  {rotulo}: {linhas:,} linhas ({linhas / segundos:,.0f} linhas/s)", end="\r")
+    return mostrar
+
+
+def exportar(conjunto, formato, saida, comprimir):
+    saida = saida or f"{conjunto}.{formato}{'.gz' if comprimir else ''}"
+    est = exportacao.exportar(conjunto, saida, formato, comprimir or None,
+                              ao_progresso=_mostrar_progresso(conjunto))
+    print(f"  {conjunto}: {est['linhas']:,} linhas em {est['segundos']:.1f}s "
+          f"({est['linhas_por_segundo'] or 0:,} linhas/s, {est['bytes'] / 2**20:,.1f}MB sem compressão) -> {saida}")
+
+
+def importar(conjunto, arquivo, formato, erros, tamanho_lote):
+    formato = formato or importacao.formato_pelo_nome(arquivo)
+    erros = erros or f"{arquivo.removesuffix('.gz').rsplit('.', 1)[0]}.erros.{formato}"
+    est = importacao.importar(conjunto, arquivo, formato, erros, tamanho_lote,
+                              ao_progresso=_mostrar_progresso(conjunto))
+    print(f"  {conjunto}: {est['lidas']:,} lidas, {est['importadas']:,} importadas, "
+          f"{est['recusadas']:,} recusadas, {est['ignoradas']:,} ignoradas em {est['segundos']:.1f}s "
+          f"({est['linhas_por_segundo'] or 0:,} linhas/s)")
+    if est["recusadas"]:
+        print(f"  Registros recusados (com linha e motivo) em {erros}")
+
+
+def _mostrar_backup(metricas):
+    reinicios = f", {metricas['reinicios']} reinício(s)" if metricas["reinicios"] else ""
+    passo_unico = ", terminado em passo único" if metricas["passo_unico"] else ""
+    print(f"Backup {metricas['arquivo']}: {metricas['paginas']:,} páginas ({metricas['bytes'] / 2**20:,.1f}MB) "
+          f"em {metricas['passos']} passos, cópia {metricas['segundos_copia']:.2f}s + "
+          f"verificação {metricas['segundos_verificacao']:.2f}s{reinicios}{passo_unico}")
+    for removido in metricas.get("removidos", []):
+        print(f"  Removido pela retenção: {removido}")
+
+
+def fazer_backup(saida):
+    _mostrar_backup(backup.criar_backup(saida))
+
+
+def fazer_snapshots(diretorio, manter, intervalo):
+    if not intervalo:
+        _mostrar_backup(backup.snapshot(diretorio, manter))
+        return
+    print(f"Snapshot a cada {intervalo}s em {diretorio}, mantendo {manter} (Ctrl+C para parar).")
+    try:
+        backup.agendar_snapshots(intervalo, diretorio, manter, ao_concluir=_mostrar_backup,
+                                 ao_erro=lambda e: print(f"Falha no snapshot: {e}"))
+    except KeyboardInterrupt:
+        pass
+
+
+def restaurar(arquivo, salvar_atual):
+    try:
+        metricas = backup.restaurar_backup(arquivo, salvar_atual=salvar_atual)
+    except backup.BackupInvalido as e:
+        raise SystemExit(f"Restauração cancelada: {e}")
+    if metricas["copia_anterior"]:
+        print(f"Banco anterior salvo em {metricas['copia_anterior']}")
+    linhas = ", ".join(f"{tabela}: {total:,}" for tabela, total in metricas["tabelas"].items())
+    print(f"Restaurado {metricas['arquivo']} -> {metricas['destino']} em {metricas['segundos']:.1f}s, "
+          f"verificado ({linhas}).")
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Tarefas de manutenção do banco do SafeSpace.")
+    parser.add_argument("--banco", help="Arquivo do banco (padrão: DATABASE_NAME do config).")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comandos.add_parser("reconstruir-resumo", help="Recalcula a tabela humor_resumo do zero.")
+    p_exportar = comandos.add_parser("exportar", help="Exporta um conjunto de dados em streaming.")
+    p_exportar.add_argument("conjunto", choices=list(exportacao.CONJUNTOS))
+    p_exportar.add_argument("--formato", choices=exportacao.FORMATOS, default="csv")
+    p_exportar.add_argument("--saida", help="Arquivo de saída (padrão: <conjunto>.<formato>[.gz]).")
+    p_exportar.add_argument("--gzip", action="store_true",
+                            help="Comprime com gzip (automático se --saida termina em .gz).")
+    p_importar = comandos.add_parser("importar", help="Importa usuários ou humor de CSV/NDJSON em lotes.")
+    p_importar.add_argument("conjunto", choices=list(importacao.CONJUNTOS))
+    p_importar.add_argument("arquivo", help="Arquivo .csv, .ndjson ou .jsonl (opcionalmente .gz).")
+    p_importar.add_argument("--formato", choices=importacao.FORMATOS, help="Padrão: pela extensão.")
+    p_importar.add_argument("--erros", help="Arquivo dos registros recusados (padrão: <arquivo>.erros.<formato>).")
+    p_importar.add_argument("--lote", type=int, default=10000, help="Registros por transação.")
+    p_backup = comandos.add_parser("backup", help="Backup online do banco para um arquivo, sem parar o app.")
+    p_backup.add_argument("saida", help="Arquivo de destino.")
+    p_snapshot = comandos.add_parser("snapshot", help="Snapshot com data no nome e retenção (opcionalmente agendado).")
+    p_snapshot.add_argument("--diretorio", default=backup.BACKUP_DIRETORIO)
+    p_snapshot.add_argument("--manter", type=int, default=backup.BACKUP_RETENCAO,
+                            help="Snapshots mantidos (padrão: BACKUP_RETENCAO).")
+    p_snapshot.add_argument("--intervalo", type=int,
+                            help="Segundos entre snapshots; sem ele, cria um só e sai.")
+    p_restaurar = comandos.add_parser("restaurar", help="Verifica um backup e o restaura sobre o banco.")
+    p_restaurar.add_argument("arquivo")
+    p_restaurar.add_argument("--sem-copia", action="store_true",
+                             help="Não salva o banco atual antes de restaurar.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.banco:
+        database_manager.DATABASE_NAME = args.banco
+    if args.comando == "restaurar":  # Não cria/migra nada antes de restaurar
+        restaurar(args.arquivo, not args.sem_copia)
+        raise SystemExit
+    database_manager.criar_tabelas_iniciais()
+    if args.comando == "reconstruir-resumo":
+        reconstruir_resumo()
+    elif args.comando == "exportar":
+        exportar(args.conjunto, args.formato, args.saida, args.gzip)
+    elif args.comando == "importar":
+        importar(args.conjunto, args.arquivo, args.formato, args.erros, args.lote)
+    elif args.comando == "backup":
+        fazer_backup(args.saida)
+    elif args.comando == "snapshot":
+        fazer_snapshots(args.diretorio, args.manter, args.intervalo)
@@ -1,13 +1,16 @@
 # populate_db.py
 import sqlite3
-import json
 import random
+import argparse
+import itertools
+import time
 from datetime import datetime, timedelta
 
 # Imports dos seus módulos
 try:
-    from database_manager import criar_tabelas_iniciais, Usuario, HumorDiarioDAO, conectar
-    from config import TIPO_COLABORADOR, TIPO_USUARIO_COMUM
+    from database_manager import criar_tabelas_iniciais, Usuario, HumorDiarioDAO, conectar, cache_usuarios, data_para_dia, ids_perguntas
+    from database_manager import valencia_sentimento
+    from config import TIPO_COLABORADOR, TIPO_USUARIO_COMUM, QUESTIONARIO_BEM_ESTAR, QUESTIONARIO_PET
     from services import logica_sugestao_pet  # Para gerar sugestão de pet coerente
 except ImportError as e:
     print(f"Erro de importação: {e}")
@@ -180,14 +183,13 @@ def populate():
                     data_humor_str = data_humor_dt.strftime("%Y-%m-%d")
                     sentimento = random.choice(HUMOR_SENTIMENTOS)
 
-                    # Evita duplicar humor para o mesmo dia (improvável com datas aleatórias, mas bom ter)
-                    if not HumorDiarioDAO.buscar_humor_diario_usuario_data(user_id, data_humor_str):
-                        try:
-                            HumorDiarioDAO.inserir_humor_diario(
-                                user_id, data_humor_str, sentimento)
-                        except Exception as e_humor:
-                            print(
-                                f"      Erro ao inserir humor para usuário {user_id} na data {data_humor_str}: {e_humor}")
+                    # Datas repetidas são ignoradas pela chave (usuario_id, dia)
+                    try:
+                        HumorDiarioDAO.inserir_humor_diario_se_ausente(
+                            user_id, data_humor_str, sentimento)
+                    except Exception as e_humor:
+                        print(
+                            f"      Erro ao inserir humor para usuário {user_id} na data {data_humor_str}: {e_humor}")
         else:
             print(
                 f"  Falha ao adicionar usuário comum '{nome}' (email: {email}).")
@@ -196,14 +198,176 @@ def populate():
     print("IMPORTANTE: Execute este script idealmente apenas uma vez em um banco de dados novo.")
 
 
+# --- Modo em massa (datasets grandes para benchmark) ---
+
+# Um a cada N usuários gerados em massa é colaborador; o tipo sai do próprio id,
+# assim o gerador de humor não precisa guardar a lista de ids em memória
+PROPORCAO_COLABORADOR_BULK = 20
+
+
+def _variantes_questionarios():
+    """Pré-calcula todas as combinações de respostas (bem-estar e pet) como
+    listas de (pergunta_id, resposta), garantindo as perguntas no catálogo."""
+    with conectar() as conn:
+        cursor = conn.cursor()
+        ids_bem_estar = ids_perguntas(cursor, QUESTIONARIO_BEM_ESTAR, BEM_ESTAR_PERGUNTAS)
+        ids_pet = ids_perguntas(cursor, QUESTIONARIO_PET, [c["key"] for c in PET_PERGUNTAS_CONFIG])
+    bem_estar = [
+        list(zip(ids_bem_estar, combinacao))
+        for combinacao in itertools.product(["sim", "não"], repeat=len(BEM_ESTAR_PERGUNTAS))
+    ]
+    opcoes_pet = [range(c["min"], c["max"] + 1) if c["tipo"] == "int" else c["opcoes"]
+                  for c in PET_PERGUNTAS_CONFIG]
+    pet = []
+    for combinacao in itertools.product(*opcoes_pet):
+        respostas_dict = {c["key"]: v for c, v in zip(PET_PERGUNTAS_CONFIG, combinacao)}
+        pet.append((logica_sugestao_pet(respostas_dict), list(zip(ids_pet, combinacao))))
+    return bem_estar, pet
+
+
+def tipo_usuario_bulk(user_id):
+    return TIPO_COLABORADOR if user_id % PROPORCAO_COLABORADOR_BULK == 0 else TIPO_USUARIO_COMUM
+
+
+def gerar_usuarios_em_massa(quantidade, id_inicial, respostas_pendentes):
+    """Gerador de tuplas prontas para o INSERT em usuarios (ids explícitos).
+    As respostas de questionário de cada usuário gerado são acrescentadas em
+    `respostas_pendentes` como (usuario_id, pergunta_id, resposta)."""
+    bem_estar, pet = _variantes_questionarios()
+    for user_id in range(id_inicial, id_inicial + quantidade):
+        nome = generate_random_name()
+        partes = nome.lower().split(" ")
+        # O id no email garante unicidade sem manter um set de emails em memória
+        email = f"{partes[0]}.{partes[-1]}.{user_id}@{random.choice(DOMAINS)}"
+        user_type = tipo_usuario_bulk(user_id)
+        pet_sugerido = None
+        if user_type == TIPO_USUARIO_COMUM:
+            idade = generate_random_age(18, 60)
+            if random.random() < 0.7:
+                respostas_pendentes.extend(
+                    (user_id, pid, r) for pid, r in random.choice(bem_estar))
+                if random.random() < 0.6:
+                    pet_sugerido, respostas_pet = random.choice(pet)
+                    respostas_pendentes.extend((user_id, pid, r) for pid, r in respostas_pet)
+        else:
+            idade = generate_random_age(25, 55)
+        yield (user_id, nome, email, SIMPLE_PASSWORD, idade, user_type, pet_sugerido)
+
+
+def _ids_sentimentos():
+    """Garante HUMOR_SENTIMENTOS no dicionário 'sentimentos' e retorna seus ids."""
+    with conectar() as conn:
+        conn.executemany("INSERT OR IGNORE INTO sentimentos (texto, valencia) VALUES (?, ?)",
+                         [(s, valencia_sentimento(s)) for s in HUMOR_SENTIMENTOS])
+        ids = dict(conn.execute("SELECT texto, id FROM sentimentos").fetchall())
+    return [ids[s] for s in HUMOR_SENTIMENTOS]
+
+
+def gerar_humores_em_massa(id_inicial, quantidade, dias_historico, data_final, ids_sentimentos):
+    """Gerador de (usuario_id, dia, sentimento_id) para os usuários comuns gerados,
+    no máximo um por dia nos últimos `dias_historico` dias até `data_final`."""
+    ultimo_dia = data_para_dia(data_final)
+    dias = range(ultimo_dia, ultimo_dia - dias_historico, -1)
+    for user_id in range(id_inicial, id_inicial + quantidade):
+        if tipo_usuario_bulk(user_id) != TIPO_USUARIO_COMUM or random.random() >= 0.8:
+            continue
+        frequencia = random.uniform(0.3, 0.9)  # Quão assíduo é o usuário
+        for dia in dias:
+            if random.random() < frequencia:
+                yield (user_id, dia, random.choice(ids_sentimentos))
+
+
+def inserir_em_lotes(sql, linhas, tamanho_lote, rotulo, apos_lote=None):
+    """Consome o gerador `linhas` com executemany, um commit por lote.
+    apos_lote(conn), se informado, roda na mesma transação de cada lote.
+    Retorna o total inserido e imprime o progresso em linhas/s."""
+    total = 0
+    inicio = time.perf_counter()
+    while True:
+        lote = list(itertools.islice(linhas, tamanho_lote))
+        if not lote:
+            break
+        with conectar() as conn:
+            conn.executemany(sql, lote)
+            if apos_lote:
+                apos_lote(conn)
+        total += len(lote)
+        decorrido = time.perf_counter() - inicio
+        print(f"  {rotulo}: {total:,} linhas ({total / decorrido:,.0f} linhas/s)", end="\r")
+    decorrido = time.perf_counter() - inicio
+    taxa = total / decorrido if decorrido > 0 else 0.0
+    print(f"  {rotulo}: {total:,} linhas em {decorrido:.1f}s ({taxa:,.0f} linhas/s)")
+    return total
+
+
+def populate_bulk(quantidade_usuarios, dias_historico=60, seed=None, tamanho_lote=50000, data_final=None):
+    """Gera um banco de tamanho de produção: usuários e humor em lotes com executemany.
+    O histórico de humor termina em `data_final` (padrão: hoje)."""
+    if seed is not None:
+        random.seed(seed)
+    criar_tabelas_iniciais()
+    with conectar() as conn:
+        id_inicial = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM usuarios").fetchone()[0]
+
+    print(f"Gerando {quantidade_usuarios:,} usuários a partir do ID {id_inicial}...")
+    respostas_pendentes = []
+
+    def gravar_respostas(conn):
+        # Respostas dos usuários do lote, gravadas no mesmo commit
+        conn.executemany(
+            "INSERT INTO questionario_respostas (usuario_id, pergunta_id, resposta) VALUES (?, ?, ?)",
+            respostas_pendentes)
+        respostas_pendentes.clear()
+
+    inserir_em_lotes(
+        "INSERT INTO usuarios (id, nome, email, senha, idade, type, pet_sugerido) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        gerar_usuarios_em_massa(quantidade_usuarios, id_inicial, respostas_pendentes),
+        tamanho_lote, "usuarios", apos_lote=gravar_respostas)
+
+    print(f"Gerando até {dias_historico} dias de humor por usuário comum...")
+    inserir_em_lotes(
+        "INSERT INTO humor_registro (usuario_id, dia, sentimento_id) VALUES (?, ?, ?) "
+        "ON CONFLICT (usuario_id, dia) DO NOTHING",
+        gerar_humores_em_massa(id_inicial, quantidade_usuarios, dias_historico,
+                               data_final or datetime.now().date(), _ids_sentimentos()),
+        tamanho_lote, "humor_registro")
+    print("Recalculando o resumo de humor por usuário...")
+    HumorDiarioDAO.reconstruir_resumo_humor()  # Inserções diretas não passam pelo DAO
+    cache_usuarios.limpar()  # Inserções diretas não passam pelo DAO
+    print("População em massa concluída!")
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Popula o banco do SafeSpace com dados de teste.")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Modo em massa (executemany em lotes) para datasets grandes.")
+    parser.add_argument("--usuarios", type=int, default=100000,
+                        help="Quantidade de usuários no modo em massa (padrão: 100000).")
+    parser.add_argument("--dias", type=int, default=60,
+                        help="Dias de histórico de humor por usuário (padrão: 60).")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Semente aleatória para datasets reprodutíveis.")
+    parser.add_argument("--lote", type=int, default=50000,
+                        help="Linhas por transação no modo em massa (padrão: 50000).")
+    parser.add_argument("-y", "--sim", action="store_true",
+                        help="Não pedir confirmação.")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    confirm = input(
+    args = _parse_args()
+    confirm = 's' if args.sim else input(
         "ATENÇÃO: Este script irá adicionar dados de teste ao banco.\n"
         "Se já existem dados, pode haver conflitos de email ou duplicação de histórico de humor.\n"
         "É recomendado executar em um banco de dados limpo ou após backup.\n"
         "Deseja continuar? (s/N): "
     ).strip().lower()
-    if confirm == 's':
-        populate()
-    else:
+    if confirm != 's':
         print("Operação cancelada pelo usuário.")
+    elif args.bulk:
+        populate_bulk(args.usuarios, args.dias, args.seed, args.lote)
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+        populate()
@@ -3,9 +3,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, scrolledtext
 import sys
 import os
-import json
 from datetime import datetime
-import calendar  # Para o calendário de humor
 
 # Imports diretos dos módulos backend
 try:
@@ -14,6 +12,7 @@ try:
     import validators
     # Para criar_tabelas_iniciais e acesso direto ao DAO se necessário
     import database_manager
+    from componentes_tk import TabelaVirtual, ExecutorTarefas, IndicadorCarregando, CalendarioHumor
 
     from config import TIPO_ADMINISTRADOR, TIPO_COLABORADOR, TIPO_USUARIO_COMUM
     from database_manager import Usuario as UsuarioDAO  # Usando Usuario como o DAO
@@ -26,6 +25,8 @@ except ImportError as e:
         "  - database_manager.py\n"
         "  - services.py\n"
         "  - validators.py\n"
+        "  - componentes_tk.py\n"
+        "  - cache.py\n"
         "estejam no MESMO DIRETÓRIO que este script (safespace_app.py).\n\n"
         "A aplicação não pode continuar."
     )
@@ -40,6 +41,8 @@ except ImportError as e:
         pass
     sys.exit(1)
 
+TAMANHO_PAGINA_UI = 200  # Usuários buscados por página nas listagens
+
 # --- Função Utilitária Global ---
 
 
@@ -55,7 +58,11 @@ def center_window_util(window, width, height):
 
 
 class UnifiedLoginDialog(simpledialog.Dialog):
-    def __init__(self, parent, title="Login SafeSpace"):
+    def __init__(self, parent, executor, title="Login SafeSpace"):
+        # Executor da janela principal: reaproveitado a cada abertura do diálogo
+        self.executor = executor
+        self._user_data = None
+        self._autenticando = False
         super().__init__(parent, title)
 
     def body(self, master_frame):
@@ -68,24 +75,42 @@ class UnifiedLoginDialog(simpledialog.Dialog):
             row=1, column=0, sticky="w", padx=5, pady=5)
         self.senha_entry = ttk.Entry(master_frame, width=35, show="*")
         self.senha_entry.grid(row=1, column=1, padx=5, pady=5)
+        self.status = IndicadorCarregando(master_frame, self, texto="Autenticando...")
+        self.status.grid(row=2, column=0, columnspan=2, sticky="w", padx=5)
         return self.email_entry
 
     def validate(self):
+        if self._autenticando:
+            return 0
         if not self.email_entry.get() or not self.senha_entry.get():
             messagebox.showwarning(
                 "Entrada Inválida", "Email e senha são obrigatórios.", parent=self)
             return 0
+        # Autentica em segundo plano; wait_variable mantém o Tk respondendo
+        self._autenticando = True
+        self.status(True)
+        self._user_data, erro = self.executor.aguardar(
+            self, "login", services.autenticar_e_obter_dados_completos,
+            (self.email_entry.get(), self.senha_entry.get()))
+        self.status(False)
+        self._autenticando = False
+        if erro:
+            messagebox.showerror(
+                "Erro", f"Erro ao autenticar: {erro}", parent=self)
+            return 0
+        if not self._user_data:
+            messagebox.showerror(
+                "Falha no Login", "Email ou senha incorretos.", parent=self)
+            return 0
         return 1
 
+    def cancel(self, event=None):
+        if self._autenticando:
+            return  # Espera a autenticação em andamento terminar
+        super().cancel(event)
+
     def apply(self):
-        email, senha = self.email_entry.get(), self.senha_entry.get()
-        user_data = services.autenticar_e_obter_dados_completos(email, senha)
-        if user_data:
-            self.result = user_data
-        else:
-            messagebox.showerror(
-                "Falha no Login", "Email ou senha incorretos.", parent=self)
-            self.result = None
+        self.result = self._user_data
 
 
 class UserFormDialog(simpledialog.Dialog):  # Usado pelo Admin
@@ -181,9 +206,18 @@ class AdminWindow:
                        command=cmd).pack(side=tk.LEFT, padx=5)
         ttk.Button(af, text="Recarregar", style="Admin.TButton",
                    command=self.load_users).pack(side=tk.RIGHT, padx=5)
+        self.status = IndicadorCarregando(af, self.master)
+        self.status.pack(side=tk.RIGHT, padx=10)
+        self.executor = ExecutorTarefas(self.master, ao_mudar_ocupado=self.status)
         cols = ("id", "nome", "email", "idade", "tipo")
-        self.tree = ttk.Treeview(
-            mf, columns=cols, show="headings", selectmode="browse")
+        self._ordem = ("id", False)  # (coluna no banco, descendente)
+        self.tabela = TabelaVirtual(
+            mf, cols, lambda cur, n: UsuarioDAO.listar_usuarios_paginado(
+                ordenar_por=self._ordem[0], descendente=self._ordem[1],
+                tamanho_pagina=n, cursor_pagina=cur),
+            formatar_linha=self._formatar_usuario, tamanho_pagina=TAMANHO_PAGINA_UI,
+            executor=self.executor, ao_erro=self._erro("Erro ao carregar"))
+        self.tree = self.tabela.tree
         for col in cols:
             self.tree.heading(col, text=col.capitalize(
             ), anchor=tk.W, command=lambda c=col: self.sort_treeview(c, False))
@@ -191,65 +225,66 @@ class AdminWindow:
                              "id", "idade", "tipo"] else 60, minwidth=40)
         self.tree.column("nome", width=200)
         self.tree.column("email", width=250)
-        self.tree.pack(expand=True, fill=tk.BOTH, pady=10)
-        sb = ttk.Scrollbar(self.tree, orient=tk.VERTICAL,
-                           command=self.tree.yview)
-        self.tree.configure(yscroll=sb.set)
-        sb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tabela.pack(expand=True, fill=tk.BOTH, pady=10)
         self.load_users()
 
-    def sort_treeview(self, col, reverse):  # Simplificado
-        data = [(self.tree.set(child, col), child)
-                for child in self.tree.get_children('')]
-        is_num = col in ['id', 'idade']
-        def key_func(x): return (int(x[0]) if x[0].isdigit(
-        ) else x[0].lower()) if is_num and x[0] != '-' else str(x[0]).lower()
-        data.sort(key=key_func, reverse=reverse)
-        for i, (_, child) in enumerate(data):
-            self.tree.move(child, '', i)
+    @staticmethod
+    def _formatar_usuario(linha):
+        id, nome, email, _, idade, tipo_n = linha
+        tipos = {TIPO_USUARIO_COMUM: "Usuário",
+                 TIPO_COLABORADOR: "Colaborador", TIPO_ADMINISTRADOR: "Admin"}
+        return (id, nome, email, idade if idade else '-', tipos.get(tipo_n, str(tipo_n)))
+
+    def sort_treeview(self, col, reverse):
+        # Ordenação feita no banco (índices por coluna): recarrega a 1ª página
+        self._ordem = ("type" if col == "tipo" else col, reverse)
+        self.load_users()
         self.tree.heading(
             col, command=lambda c=col: self.sort_treeview(c, not reverse))
 
     def load_users(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        try:
-            for id, nome, email, _, idade, tipo_n in UsuarioDAO.listar_todos_usuarios():
-                tipos = {TIPO_USUARIO_COMUM: "Usuário",
-                         TIPO_COLABORADOR: "Colaborador", TIPO_ADMINISTRADOR: "Admin"}
-                self.tree.insert("", tk.END, values=(
-                    id, nome, email, idade if idade else '-', tipos.get(tipo_n, str(tipo_n))))
-        except Exception as e:
-            messagebox.showerror(
-                "Erro", f"Erro ao carregar: {e}", parent=self.master)
+        self.tabela.recarregar()
+
+    def _erro(self, prefixo):
+        """Callback de falha das tarefas em segundo plano."""
+        return lambda e: messagebox.showerror(
+            "Erro", f"{prefixo}: {e}", parent=self.master)
+
+    def _mostrar_resultado(self, titulo):
+        """Callback que exibe a mensagem do serviço e recarrega a lista em caso de sucesso."""
+        def mostrar(res):
+            messagebox.showinfo(titulo, res, parent=self.master)
+            if "sucesso" in res.lower():
+                self.load_users()
+        return mostrar
 
     def get_selected_user_id(self):
-        iid = self.tree.focus()
-        if not iid:
+        linha = self.tabela.linha_selecionada()
+        if linha is None:
             messagebox.showwarning(
                 "Seleção", "Selecione um usuário.", parent=self.master)
             return None
-        return int(self.tree.item(iid, "values")[0])
+        return int(linha[0])
 
     def open_add_user_dialog(self):
         d = UserFormDialog(self.master, "Adicionar Usuário")
         if d.result:
             n, e, s, i_s, t = d.result
             i = int(i_s) if i_s.isdigit() else None
-            if UsuarioDAO.buscar_usuario_por_email(e):
-                messagebox.showerror(
-                    "Erro", "Email já existe.", parent=self.master)
-                return
-            res = services.registrar_novo_usuario(n, e, s, i, t)
-            messagebox.showinfo("Cadastro", res, parent=self.master)
-            if "sucesso" in res.lower():
-                self.load_users()
+            # registrar_novo_usuario já recusa email duplicado
+            self.executor.executar(None, services.registrar_novo_usuario, (n, e, s, i, t),
+                                   ao_concluir=self._mostrar_resultado("Cadastro"),
+                                   ao_falhar=self._erro("Erro ao cadastrar"))
 
     def open_update_user_dialog(self):
         uid = self.get_selected_user_id()
         if uid is None:
             return
-        ud = UsuarioDAO.buscar_usuario_por_id(uid)
+        self.executor.executar("editar", UsuarioDAO.buscar_usuario_por_id, (uid,),
+                               ao_concluir=lambda ud: self._editar_usuario(uid, ud),
+                               ao_falhar=self._erro("Erro ao buscar usuário"))
+
+    def _editar_usuario(self, uid, ud):
         if not ud:
             messagebox.showerror(
                 "Erro", "Usuário não encontrado.", parent=self.master)
@@ -260,25 +295,27 @@ class AdminWindow:
             n, e_n, s_n, i_s, _ = d.result
             i_n = int(i_s) if i_s.isdigit() else (ud[4] if i_s == '' else None)
             s_f = s_n or ud[3]
-            if e_n != ud[2] and UsuarioDAO.buscar_usuario_por_email(e_n):
-                messagebox.showerror(
-                    "Erro", "Novo email já em uso.", parent=self.master)
-                return
-            res = services.atualizar_info_usuario(uid, n, e_n, s_f, i_n)
-            messagebox.showinfo("Atualização", res, parent=self.master)
-            if "sucesso" in res.lower():
-                self.load_users()
+            # atualizar_info_usuario já recusa email em uso por outro usuário
+            self.executor.executar(None, services.atualizar_info_usuario, (uid, n, e_n, s_f, i_n),
+                                   ao_concluir=self._mostrar_resultado("Atualização"),
+                                   ao_falhar=self._erro("Erro ao atualizar"))
 
     def delete_selected_user(self):
         uid = self.get_selected_user_id()
         if uid is None:
             return
-        ud = UsuarioDAO.buscar_usuario_por_id(uid)
+        self.executor.executar("deletar", UsuarioDAO.buscar_usuario_por_id, (uid,),
+                               ao_concluir=lambda ud: self._confirmar_delecao(uid, ud),
+                               ao_falhar=self._erro("Erro ao buscar usuário"))
+
+    def _confirmar_delecao(self, uid, ud):
         nome = ud[1] if ud else f"ID {uid}"
         if messagebox.askyesno("Confirmar", f"Excluir '{nome}' (ID:{uid})?", parent=self.master):
-            res = services.deletar_usuario_por_id(uid)
-            messagebox.showinfo("Deleção", res, parent=self.master)
-            self.load_users()
+            def ao_concluir(res):
+                messagebox.showinfo("Deleção", res, parent=self.master)
+                self.load_users()
+            self.executor.executar(None, services.deletar_usuario_por_id, (uid,),
+                                   ao_concluir=ao_concluir, ao_falhar=self._erro("Erro ao deletar"))
 
 
 class ColaboradorMainWindow:
@@ -306,16 +343,25 @@ class ColaboradorMainWindow:
                    command=self.load_common_users).pack(side=tk.LEFT, padx=2)
         ttk.Button(cf, text="Ver Detalhes", style="Colab.TButton",
                    command=self.display_selected_user_details).pack(side=tk.LEFT, padx=2)
-        cols = ("id", "nome", "idade")
-        self.ut = ttk.Treeview(
-            lfc, columns=cols, show="headings", selectmode="browse")
+        ttk.Button(cf, text="Triagem", style="Colab.TButton",
+                   command=self.display_triagem).pack(side=tk.LEFT, padx=2)
+        self.status = IndicadorCarregando(cf, self.master)
+        self.status.pack(side=tk.LEFT, padx=8)
+        self.executor = ExecutorTarefas(self.master, ao_mudar_ocupado=self.status)
+        cols = ("id", "nome", "idade", "humor", "seq", "neg")
+        titulos = {"humor": "Último humor", "seq": "Seq.", "neg": "Neg. 30d"}
+        self.tabela = TabelaVirtual(
+            lfc, cols, lambda cur, n: services.listar_pagina_usuarios_com_resumo(
+                n, cur, TIPO_USUARIO_COMUM),
+            formatar_linha=self._formatar_usuario,
+            tamanho_pagina=TAMANHO_PAGINA_UI, executor=self.executor,
+            ao_erro=lambda e: messagebox.showerror(
+                "Erro", f"Erro ao listar: {e}", parent=self.master))
+        self.ut = self.tabela.tree
         for c in cols:
-            self.ut.heading(c, text=c.capitalize())
-            self.ut.column(c, width=100 if c == "nome" else 50, anchor=tk.W)
-        self.ut.pack(expand=True, fill=tk.BOTH, pady=5)
-        scl = ttk.Scrollbar(self.ut, orient=tk.VERTICAL, command=self.ut.yview)
-        self.ut.configure(yscroll=scl.set)
-        scl.pack(side=tk.RIGHT, fill=tk.Y)
+            self.ut.heading(c, text=titulos.get(c, c.capitalize()))
+            self.ut.column(c, width=100 if c in ("nome", "humor") else 50, anchor=tk.W)
+        self.tabela.pack(expand=True, fill=tk.BOTH, pady=5)
         dfc = ttk.Frame(pw, padding=10)
         pw.add(dfc, weight=2)
         dlf = ttk.LabelFrame(dfc, text="Detalhes do Usuário", padding=10)
@@ -326,6 +372,14 @@ class ColaboradorMainWindow:
         self._cfg_tags()
         self.load_common_users()
 
+    @staticmethod
+    def _formatar_usuario(linha):
+        resumo = linha[6]
+        if not resumo:
+            return (linha[0], linha[1], linha[4] if linha[4] else '-', '-', '-', '-')
+        return (linha[0], linha[1], linha[4] if linha[4] else '-', resumo["ultimo_sentimento"],
+                resumo["sequencia_atual"], resumo["negativos"])
+
     def _cfg_tags(self): self.dta.tag_configure("title", font=('Arial', 12, "bold", "underline"), spacing3=10); self.dta.tag_configure("subtitle", font=('Arial', 10, "bold"),
                                                                                                                                        spacing3=3); self.dta.tag_configure("item_q", font=('Arial', 10), lmargin1=10); self.dta.tag_configure("item_r", font=('Arial', 10, "italic"), lmargin1=20, spacing3=5)
 
@@ -333,24 +387,16 @@ class ColaboradorMainWindow:
         1.0, tk.END); self.dta.config(state="disabled")
 
     def load_common_users(self):
-        for i in self.ut.get_children():
-            self.ut.delete(i)
-            self._clear_dta()
-        try:
-            for uid, nome, idade in UsuarioDAO.listar_usuarios_por_tipo(TIPO_USUARIO_COMUM):
-                self.ut.insert("", "end", values=(
-                    uid, nome, idade if idade else '-'))
-        except Exception as e:
-            messagebox.showerror(
-                "Erro", f"Erro ao listar: {e}", parent=self.master)
+        self._clear_dta()
+        self.tabela.recarregar()
 
     def get_sel_uid(self):
-        iid = self.ut.focus()
-        if not iid:
+        linha = self.tabela.linha_selecionada()
+        if linha is None:
             messagebox.showwarning(
                 "Seleção", "Selecione um usuário.", parent=self.master)
             return None
-        return int(self.ut.item(iid, "values")[0])
+        return int(linha[0])
 
     def display_selected_user_details(self):
         uid = self.get_sel_uid()
@@ -359,8 +405,19 @@ class ColaboradorMainWindow:
             return
         self.dta.config(state="normal")
         self.dta.delete(1.0, tk.END)
+        self.dta.insert(tk.END, "Carregando...\n", ("item_q",))
+        self.dta.config(state="disabled")
+        # Mesma chave: se outro usuário for escolhido antes, este resultado é descartado
+        self.executor.executar("detalhes", services.obter_dados_completos_usuario, (uid,),
+                               ao_concluir=lambda d: self._mostrar_detalhes(uid, d),
+                               ao_falhar=lambda e: self._mostrar_detalhes(uid, None, e))
+
+    def _mostrar_detalhes(self, uid, d, erro=None):
+        self.dta.config(state="normal")
+        self.dta.delete(1.0, tk.END)
         try:
-            d = services.obter_dados_completos_usuario(uid)
+            if erro is not None:
+                raise erro
             if not d:
                 self.dta.insert(
                     tk.END, "Usuário não encontrado.\n", ("item_q",))
@@ -384,6 +441,11 @@ class ColaboradorMainWindow:
                 elif isinstance(content, (dict, str)):
                     self.dta.insert(tk.END, f"  {str(content)}\n", ("item_q",))
                 self.dta.insert(tk.END, "\n")
+            r = d.get('resumo_humor')
+            if r:
+                self.dta.insert(tk.END, "Resumo do Humor:\n", ("subtitle",))
+                self.dta.insert(tk.END, f"  Último: {r['ultimo_sentimento']} ({r['ultimo_dia']}), sequência de {r['sequencia_atual']} dia(s), {r['total_registros']} registro(s)\n", ("item_q",))
+                self.dta.insert(tk.END, f"Últimos {r['janela_dias']} dias: {r['positivos']} positivo(s), {r['neutros']} neutro(s), {r['negativos']} negativo(s)\n", ("item_r",))
         except Exception as e:
             messagebox.showerror(
                 "Erro Detalhes", f"Erro: {e}", parent=self.master)
@@ -391,13 +453,53 @@ class ColaboradorMainWindow:
         finally:
             self.dta.config(state="disabled")
 
+    def display_triagem(self):
+        self.dta.config(state="normal")
+        self.dta.delete(1.0, tk.END)
+        self.dta.insert(tk.END, "Analisando todos os usuários...\n", ("item_q",))
+        self.dta.config(state="disabled")
+        # Mesma chave dos detalhes: o painel mostra só o último pedido
+        self.executor.executar("detalhes", services.obter_triagem_populacional,
+                               ao_concluir=self._mostrar_triagem,
+                               ao_falhar=lambda e: self._mostrar_triagem(None, e))
+
+    def _mostrar_triagem(self, triagem, erro=None):
+        self.dta.config(state="normal")
+        self.dta.delete(1.0, tk.END)
+        try:
+            if erro is not None:
+                raise erro
+
+            def pct(v): return f"{v:.0%}" if v is not None else "-"
+            self.dta.insert(
+                tk.END, f"Triagem de risco ({triagem['usuarios_analisados']} usuários)\n", ("title",))
+            self.dta.insert(tk.END, "Maior risco primeiro:\n", ("subtitle",))
+            for r in triagem["ranking"]:
+                seta = "↓" if (r["tendencia"] or 0) < 0 else "→"
+                self.dta.insert(tk.END, f"  {r['nome']} (ID: {r['usuario_id']}): risco {pct(r['risco'])} {seta}\n", ("item_q",))
+                self.dta.insert(tk.END, f"sim {pct(r['proporcao_sim'])}, humor negativo {pct(r['proporcao_negativa'])}\n", ("item_r",))
+            self.dta.insert(tk.END, "\nPrevalência de 'sim' por pergunta:\n", ("subtitle",))
+            for pergunta, (proporcao, respondentes) in triagem["prevalencia"].items():
+                self.dta.insert(tk.END, f"  {pergunta}: {pct(proporcao)} de {respondentes}\n", ("item_q",))
+            self.dta.insert(tk.END, "\nPor faixa etária:\n", ("subtitle",))
+            for f in triagem["faixas_etarias"]:
+                self.dta.insert(tk.END, f"  {f['faixa']}: {f['usuarios']} usuários, risco médio {pct(f['risco_medio'])}\n", ("item_q",))
+        except Exception as e:
+            messagebox.showerror(
+                "Erro Triagem", f"Erro: {e}", parent=self.master)
+            self.dta.insert(tk.END, f"Erro: {e}\n")
+        finally:
+            self.dta.config(state="disabled")
+
 # --- Classes de Diálogo e Janela do Usuário ---
 
 
 # Mesma lógica do UserFormDialog, mas para TIPO_USUARIO_COMUM
 class UsuarioCadastroDialog(simpledialog.Dialog):
-    def __init__(self, parent, title="Cadastrar Novo Usuário"):
+    def __init__(self, parent, executor, title="Cadastrar Novo Usuário"):
         self.parent_for_messagebox = parent
+        self.executor = executor
+        self._cadastrando = False
         super().__init__(parent, title)
 
     def body(self, mf):
@@ -414,9 +516,13 @@ class UsuarioCadastroDialog(simpledialog.Dialog):
         self.entries["senha"].grid(row=2, column=1, padx=5, pady=3)
         self.entries["idade"] = ttk.Entry(mf, width=35)
         self.entries["idade"].grid(row=3, column=1, padx=5, pady=3)
+        self.status = IndicadorCarregando(mf, self, texto="Cadastrando...")
+        self.status.grid(row=4, column=0, columnspan=2, sticky="w", padx=5)
         return self.entries["nome"]
 
     def validate(self):
+        if self._cadastrando:
+            return 0
         v = {k: e.get() for k, e in self.entries.items()}
         if not validators.validar_nome_completo(v["nome"]):
             messagebox.showwarning("Inválido", "Nome.", parent=self)
@@ -424,24 +530,37 @@ class UsuarioCadastroDialog(simpledialog.Dialog):
         if not validators.validar_email(v["email"]):
             messagebox.showwarning("Inválido", "Email.", parent=self)
             return 0
-        if UsuarioDAO.buscar_usuario_por_email(v["email"]):
-            messagebox.showwarning("Inválido", "Email já existe.", parent=self)
-            return 0
         if not validators.validar_senha(v["senha"]):
             messagebox.showwarning("Inválido", "Senha.", parent=self)
             return 0
         if v["idade"] and not v["idade"].isdigit():
             messagebox.showwarning("Inválido", "Idade num.", parent=self)
             return 0
+        # Cadastra em segundo plano; email repetido mantém o diálogo aberto
+        self._cadastrando = True
+        self.status(True)
+        res, erro = self.executor.aguardar(
+            self, None, services.registrar_novo_usuario,
+            (v["nome"], v["email"], v["senha"], int(v["idade"]) if v["idade"] else None, TIPO_USUARIO_COMUM))
+        self.status(False)
+        self._cadastrando = False
+        if erro:
+            messagebox.showerror("Erro", f"Erro ao cadastrar: {erro}", parent=self)
+            return 0
+        if res == "Email já cadastrado.":
+            messagebox.showwarning("Inválido", "Email já existe.", parent=self)
+            return 0
+        self._resposta = res
         return 1
 
+    def cancel(self, event=None):
+        if self._cadastrando:
+            return  # Espera o cadastro em andamento terminar
+        super().cancel(event)
+
     def apply(self):
-        n, e, s, i_s = (self.entries[k].get()
-                        for k in ["nome", "email", "senha", "idade"])
-        i = int(i_s) if i_s.isdigit() else None
-        res = services.registrar_novo_usuario(n, e, s, i, TIPO_USUARIO_COMUM)
-        messagebox.showinfo("Cadastro", res, parent=self.parent_for_messagebox)
-        self.result = "sucesso" in res.lower()
+        messagebox.showinfo("Cadastro", self._resposta, parent=self.parent_for_messagebox)
+        self.result = "sucesso" in self._resposta.lower()
 
 
 class QuestionarioBemEstarDialog(simpledialog.Dialog):
@@ -551,6 +670,9 @@ class UsuarioMainWindow:
         style.configure("CalendarHeader.TLabel", padding=3, font=(
             'Arial', 9, 'bold'), anchor="center", background="#d0d0d0")
 
+        self.status = IndicadorCarregando(self.master, self.master, style="User.TLabel")
+        self.executor = ExecutorTarefas(self.master, ao_mudar_ocupado=self.status)
+
         self.prompt_registrar_humor_diario()
 
         self.notebook = ttk.Notebook(self.master, padding=10)
@@ -564,27 +686,42 @@ class UsuarioMainWindow:
         self.notebook.add(self.tab_apoio, text=' Apoio e Feedback ')
         self._criar_aba_apoio_feedback(self.tab_apoio)
         self.notebook.pack(expand=True, fill="both")
+        self.status.pack(side=tk.BOTTOM, anchor="w", padx=12)
         self._atualizar_ui_baseado_em_dados_usuario()
 
+    def _erro(self, prefixo):
+        """Callback de falha das tarefas em segundo plano."""
+        return lambda e: messagebox.showerror(
+            "Erro", f"{prefixo}: {e}", parent=self.master)
+
     def prompt_registrar_humor_diario(self):
-        # (como na sua última versão funcional, mas atualiza calendário)
-        reg_exist = services.obter_registro_humor_hoje(self.user_data["id"])
+        # Consulta e registro em segundo plano; a pergunta aparece quando a consulta volta
+        self.executor.executar("humor_hoje", services.obter_registro_humor_hoje, (self.user_data["id"],),
+                               ao_concluir=self._perguntar_humor_diario,
+                               ao_falhar=self._erro("Erro ao consultar humor"))
+
+    def _perguntar_humor_diario(self, reg_exist):
         if reg_exist:
             messagebox.showinfo(
-                "Humor", f"Humor de hoje: '{reg_exist[3]}'.", parent=self.master)
+                "Humor", f"Humor de hoje: '{reg_exist[2]}'.", parent=self.master)
             return
         sent = simpledialog.askstring(
             "Humor Diário", f"Olá {self.user_data['nome'].split(' ')[0]}! Como se sente?", parent=self.master)
         if sent is not None and sent.strip():
-            res = services.registrar_sentimento_diario(
-                self.user_data["id"], sent.strip())
-            if "sucesso" in res.lower() and hasattr(self, 'calendar_frame_actual'):
-                self._desenhar_calendario_humor()
-            messagebox.showinfo("Humor", res, parent=self.master)
+            self.executor.executar(None, services.registrar_sentimento_diario,
+                                   (self.user_data["id"], sent.strip()),
+                                   ao_concluir=self._humor_registrado,
+                                   ao_falhar=self._erro("Erro ao registrar humor"))
         elif sent is not None:
             messagebox.showinfo(
                 "Humor", "Nenhum sentimento registrado.", parent=self.master)
 
+    def _humor_registrado(self, res):
+        if "sentimento registrado" in res.lower() and hasattr(self, 'calendario'):
+            hoje = datetime.now()
+            self.calendario.invalidar(hoje.year, hoje.month)
+        messagebox.showinfo("Humor", res, parent=self.master)
+
     def _criar_aba_bem_estar(self, parent_frame):
         ttk.Label(parent_frame, text="Recursos e Monitoramento",
                   style="Subtitle.User.TLabel").pack(pady=5, anchor="center")
@@ -614,8 +751,12 @@ class UsuarioMainWindow:
         self.next_month_button = ttk.Button(
             nav_frame, text="Próx. >>", command=lambda: self._change_month(1))
         self.next_month_button.pack(side=tk.RIGHT, padx=3)
-        self.calendar_frame_actual = ttk.Frame(calendar_container)
-        self.calendar_frame_actual.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.calendario = CalendarioHumor(
+            calendar_container, lambda y, m: services.obter_humor_mensal(
+                self.user_data["id"], y, m), self.executor,
+            ao_erro=lambda e: messagebox.showerror(
+                "Erro", f"Erro ao carregar humor: {e}", parent=self.master))
+        self.calendario.pack(fill=tk.BOTH, expand=True, pady=5)
         self._desenhar_calendario_humor()
 
     def _change_month(self, delta):
@@ -630,40 +771,12 @@ class UsuarioMainWindow:
         self._desenhar_calendario_humor()
 
     def _desenhar_calendario_humor(self):
-        for w in self.calendar_frame_actual.winfo_children():
-            w.destroy()
         y, m = self.current_calendar_date.year, self.current_calendar_date.month
         nomes_meses = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
                        "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
         self.month_year_label.config(text=f"{nomes_meses[m-1]} {y}")
-
-        humores = services.obter_humor_mensal(self.user_data["id"], y, m)
-        cal_list = calendar.monthcalendar(y, m)
-        dias_semana_nomes = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
-        for c, nome_dia in enumerate(dias_semana_nomes):
-            ttk.Label(self.calendar_frame_actual, text=nome_dia, style="CalendarHeader.TLabel").grid(
-                row=0, column=c, sticky="nsew", padx=1, pady=1)
-            self.calendar_frame_actual.grid_columnconfigure(c, weight=1)
-
-        for r, semana in enumerate(cal_list, start=1):
-            self.calendar_frame_actual.grid_rowconfigure(r, weight=1)
-            for c, dia_num in enumerate(semana):
-                day_f = ttk.Frame(self.calendar_frame_actual, style="CalendarDay.TFrame",
-                                  borderwidth=1, relief="solid")  # Use TFrame
-                day_f.grid(row=r, column=c, padx=1, pady=1, sticky="nsew")
-                if dia_num != 0:
-                    ttk.Label(day_f, text=str(dia_num), style="CalendarDayNum.TLabel").pack(
-                        anchor="nw", padx=2, pady=1)
-                    sentimento = humores.get(dia_num)
-                    if sentimento:
-                        # Limita o texto
-                        display_s = (
-                            sentimento[:8]+"..") if len(sentimento) > 10 else sentimento
-                        lbl_s = ttk.Label(
-                            day_f, text=display_s, style="CalendarMood.TLabel")
-                        lbl_s.pack(expand=True, fill=tk.BOTH, padx=2, pady=1)
-                        # Add tooltip (requer classe externa ou lógica simples)
-                        # ToolTip(lbl_s, text=sentimento)
+        # Grade persistente: usa o mês em cache/pré-carregado ou busca em segundo plano
+        self.calendario.mostrar(y, m)
 
     def _criar_aba_pet_apoio(self, parent_frame):
         # ... (como na sua última versão funcional)
@@ -687,7 +800,7 @@ class UsuarioMainWindow:
 
     def _atualizar_ui_baseado_em_dados_usuario(self):
         q_bem_estar_feito = bool(
-            self.user_data.get("respostas_questionario_json"))
+            self.user_data.get("respondeu_questionario"))
         if q_bem_estar_feito:
             self.btn_q_bem_estar.config(
                 text="Questionário Bem-Estar (Respondido)", state=tk.DISABLED)
@@ -703,7 +816,7 @@ class UsuarioMainWindow:
     def _atualizar_info_pet_label(self):
         # ... (como na sua última versão funcional) ...
         q_bem_estar_feito = bool(
-            self.user_data.get("respostas_questionario_json"))
+            self.user_data.get("respondeu_questionario"))
         if self.user_data.get("pet_sugerido"):
             self.pet_info_label.config(
                 text=f"Pet sugerido: {self.user_data['pet_sugerido']}!")
@@ -714,7 +827,7 @@ class UsuarioMainWindow:
                 text="Responda ao Questionário de Bem-Estar primeiro.")
 
     def abrir_janela_indicacoes(self):
-        if not self.user_data.get("respostas_questionario_json"):
+        if not self.user_data.get("respondeu_questionario"):
             messagebox.showinfo(
                 "Atenção", "Responda ao Questionário de Bem-Estar para ver indicações.", parent=self.master)
             return
@@ -734,49 +847,59 @@ class UsuarioMainWindow:
         ttk.Button(win, text="Fechar", command=win.destroy).pack(pady=10)
 
     def abrir_questionario_bem_estar(self):
-        if self.user_data.get("respostas_questionario_json"):
+        if self.user_data.get("respondeu_questionario"):
             messagebox.showinfo(
                 "Completo", "Questionário de Bem-Estar já respondido.", parent=self.master)
             return
         # ... (restante da lógica como na sua última versão funcional) ...
         dialog = QuestionarioBemEstarDialog(self.master)
         if dialog.result:
-            services.processar_questionario_bem_estar(
-                self.user_data["id"], dialog.result)
-            self.user_data["respostas_questionario_json"] = json.dumps(
-                dialog.result)  # Atualiza local
-            messagebox.showinfo(
-                "Salvo", "Respostas salvas!", parent=self.master)
-            self._atualizar_ui_baseado_em_dados_usuario()
-            if hasattr(self, 'calendar_frame_actual'):
-                self._desenhar_calendario_humor()  # Atualiza calendário
+            self.executor.executar(None, services.processar_questionario_bem_estar,
+                                   (self.user_data["id"], dialog.result),
+                                   ao_concluir=self._questionario_bem_estar_salvo,
+                                   ao_falhar=self._erro("Erro ao salvar respostas"))
+
+    def _questionario_bem_estar_salvo(self, _):
+        self.user_data["respondeu_questionario"] = True  # Atualiza local
+        messagebox.showinfo(
+            "Salvo", "Respostas salvas!", parent=self.master)
+        self._atualizar_ui_baseado_em_dados_usuario()
+        if hasattr(self, 'calendario'):
+            self._desenhar_calendario_humor()  # Atualiza calendário
 
     def abrir_questionario_pet(self):
         # ... (como na sua última versão funcional) ...
-        if not self.user_data.get("respostas_questionario_json"):
+        if not self.user_data.get("respondeu_questionario"):
             messagebox.showwarning(
                 "Atenção", "Responda ao Questionário de Bem-Estar primeiro.", parent=self.master)
             return
         dialog = QuestionarioPetDialog(self.master)
         if hasattr(dialog, 'result_dict_logica') and dialog.result_dict_logica:
-            sugestao = services.processar_questionario_pet_e_sugerir(
-                self.user_data["id"], dialog.result_dict_logica, dialog.result_lista_db)
-            if sugestao:
-                self.user_data["pet_sugerido"] = sugestao
-                self.user_data["respostas_pet_apoio_json"] = json.dumps(
-                    dialog.result_lista_db)
-                messagebox.showinfo(
-                    "Pet Sugerido", f"Seu pet ideal: {sugestao}", parent=self.master)
-            else:
-                messagebox.showinfo(
-                    "Pet", "Não foi possível gerar sugestão.", parent=self.master)
-            self._atualizar_ui_baseado_em_dados_usuario()
+            self.executor.executar(None, services.processar_questionario_pet_e_sugerir,
+                                   (self.user_data["id"], dialog.result_dict_logica, dialog.result_lista_db),
+                                   ao_concluir=self._questionario_pet_salvo,
+                                   ao_falhar=self._erro("Erro ao salvar respostas"))
+
+    def _questionario_pet_salvo(self, sugestao):
+        if sugestao:
+            self.user_data["pet_sugerido"] = sugestao
+            self.user_data["respondeu_pet"] = True
+            messagebox.showinfo(
+                "Pet Sugerido", f"Seu pet ideal: {sugestao}", parent=self.master)
+        else:
+            messagebox.showinfo(
+                "Pet", "Não foi possível gerar sugestão.", parent=self.master)
+        self._atualizar_ui_baseado_em_dados_usuario()
 
     def abrir_janela_contato_colaborador(self):
         # MODIFICADO para exibir nome e email
         # Espera-se [(nome, email), ...]
-        colaboradores_info = services.obter_colaboradores_para_encaminhamento()
+        self.executor.executar("contato", services.obter_colaboradores_para_encaminhamento,
+                               ao_concluir=self._mostrar_janela_contato,
+                               ao_falhar=lambda e: messagebox.showerror(
+                                   "Erro", f"Erro ao buscar colaboradores: {e}", parent=self.master))
 
+    def _mostrar_janela_contato(self, colaboradores_info):
         win = tk.Toplevel(self.master)
         win.title("Contato Profissional")
         win.geometry("500x400")
@@ -804,7 +927,7 @@ class UsuarioMainWindow:
 
     def dar_feedback_indicacoes(self):
         # ... (como na sua última versão funcional, com a verificação adicionada) ...
-        if not self.user_data.get("respostas_questionario_json"):
+        if not self.user_data.get("respondeu_questionario"):
             messagebox.showinfo(
                 "Atenção", "Responda ao Questionário e veja as indicações antes de dar feedback.", parent=self.master)
             return
@@ -844,6 +967,8 @@ class MainApplicationGUI:
             messagebox.showerror("Erro DB", f"Falha DB: {e}")
             self.root.destroy()
             return
+        # Um executor para a janela principal, usado por todos os diálogos abertos nela
+        self.executor = ExecutorTarefas(self.root)
         mf = ttk.Frame(self.root, padding=20, style="Main.TFrame")
         mf.pack(expand=True, fill=tk.BOTH)
         ttk.Label(mf, text="Bem-vindo(a) ao SafeSpace!",
@@ -856,16 +981,16 @@ class MainApplicationGUI:
                    style="Exit.TButton").pack(pady=(20, 10), ipady=6)
 
     def open_unified_login_dialog(self):
-        d = UnifiedLoginDialog(self.root)
+        d = UnifiedLoginDialog(self.root, self.executor)
         user_data = d.result
         if user_data:
             self.root.withdraw()
             self.redirect_to_profile(user_data)
 
-    def open_user_registration_dialog(self): UsuarioCadastroDialog(self.root)
+    def open_user_registration_dialog(self): UsuarioCadastroDialog(self.root, self.executor)
 
     def redirect_to_profile(self, user_data_completa):
-        uid, nome, email, _, idade, u_type, rq_json, pet_sug, rpet_json = user_data_completa
+        uid, nome, email, _, idade, u_type, respondeu_q, pet_sug, respondeu_pet = user_data_completa
         profile_win = tk.Toplevel(self.root)
         profile_win.protocol("WM_DELETE_WINDOW",
                              lambda: self._on_profile_close(profile_win))
@@ -875,7 +1000,7 @@ class MainApplicationGUI:
             ColaboradorMainWindow(profile_win, nome)
         elif u_type == TIPO_USUARIO_COMUM:
             current_user_dict = {"id": uid, "nome": nome, "email": email, "idade": idade,
-                                 "respostas_questionario_json": rq_json, "pet_sugerido": pet_sug, "respostas_pet_apoio_json": rpet_json}
+                                 "respondeu_questionario": bool(respondeu_q), "pet_sugerido": pet_sug, "respondeu_pet": bool(respondeu_pet)}
             UsuarioMainWindow(profile_win, current_user_dict)
         else:
             messagebox.showerror(
@@ -1,10 +1,13 @@
 # backend/services.py
-import json
+import itertools
 import random
+from array import array
 import database_manager  # Importa o módulo todo
-from datetime import datetime
-from database_manager import Usuario, HumorDiarioDAO  # Importa as classes DAO
+import analytics
+from datetime import date
+from database_manager import Usuario, HumorDiarioDAO, QuestionarioDAO  # Importa as classes DAO
 from config import TIPO_USUARIO_COMUM, TIPO_COLABORADOR, TIPO_ADMINISTRADOR  # Importa config
+from config import QUESTIONARIO_BEM_ESTAR, QUESTIONARIO_PET, JANELA_RESUMO_HUMOR_DIAS
 
 # ... (autenticar_usuario, autenticar_e_obter_dados_completos, registrar_novo_usuario - como estavam) ...
 
@@ -17,7 +20,7 @@ def autenticar_e_obter_dados_completos(email, senha):
     with database_manager.conectar() as conn:
         cursor = conn.cursor()
         cursor.execute(
-            "SELECT id, nome, email, senha, idade, type, respostas_questionario, pet_sugerido, respostas_pet_apoio FROM usuarios WHERE email = ? AND senha = ?",
+            database_manager.SQL_USUARIO_COMPLETO + "WHERE u.email = ? AND u.senha = ?",
             (email, senha)
         )
         return cursor.fetchone()
@@ -35,11 +38,24 @@ def atualizar_info_usuario(id_usuario, nome, email, senha, idade):
     usuario_existente = Usuario.buscar_usuario_por_id(id_usuario)
     if not usuario_existente:
         return "Usuário não encontrado."
-    if email != usuario_existente[2] and Usuario.buscar_usuario_por_email(email) and Usuario.buscar_usuario_por_email(email)[0] != id_usuario:
-        return "Este email já está cadastrado para outro usuário."
+    if email != usuario_existente[2]:
+        dono_email = Usuario.buscar_usuario_por_email(email)
+        if dono_email and dono_email[0] != id_usuario:
+            return "Este email já está cadastrado para outro usuário."
     return "Usuário atualizado com sucesso." if Usuario.atualizar_dados_usuario(id_usuario, nome, email, senha, idade) else "Erro ao atualizar usuário."
 
 
+def atualizar_campos_usuario(id_usuario, campos):
+    """Como atualizar_info_usuario, mas só com os campos de `campos`
+    ({"nome", "email", "senha", "idade"}); os demais ficam como estão."""
+    usuario_existente = Usuario.buscar_usuario_por_id(id_usuario)
+    if not usuario_existente:
+        return "Usuário não encontrado."
+    _, nome, email, senha, idade = usuario_existente[:5]
+    return atualizar_info_usuario(id_usuario, campos.get("nome", nome), campos.get("email", email),
+                                  campos.get("senha", senha), campos.get("idade", idade))
+
+
 def deletar_usuario_por_id(id_usuario):
     # ... (como antes)
     usuario_a_deletar = Usuario.buscar_usuario_por_id(id_usuario)
@@ -51,13 +67,18 @@ def deletar_usuario_por_id(id_usuario):
     return "Usuário e seus registros de humor excluídos com sucesso."
 
 
+def obter_estatisticas_cache_usuarios():
+    """Acertos/falhas do cache de consultas de usuário por id/email."""
+    return database_manager.cache_usuarios.estatisticas()
+
+
 def processar_questionario_bem_estar(usuario_id, respostas_lista_de_dict):
     # ... (como antes)
     try:
         Usuario.atualizar_respostas_questionario_usuario(
-            usuario_id, json.dumps(respostas_lista_de_dict))
-    except TypeError as e:
-        print(f"Erro JSON (bem-estar): {e}")
+            usuario_id, respostas_lista_de_dict)
+    except (KeyError, TypeError) as e:
+        print(f"Erro nas respostas (bem-estar): {e}")
 
 
 def logica_sugestao_pet(respostas_dict_para_logica):
@@ -78,7 +99,7 @@ def processar_questionario_pet_e_sugerir(usuario_id, respostas_dict_para_logica,
     sugestao = logica_sugestao_pet(respostas_dict_para_logica)
     try:
         Usuario.atualizar_pet_usuario(
-            usuario_id, sugestao, json.dumps(respostas_lista_para_salvar))
+            usuario_id, sugestao, respostas_lista_para_salvar)
     except Exception as e:
         print(f"Erro ao salvar pet: {e}")
         return None
@@ -87,18 +108,17 @@ def processar_questionario_pet_e_sugerir(usuario_id, respostas_dict_para_logica,
 
 def registrar_sentimento_diario(usuario_id, sentimento):
     # ... (como antes) ...
-    data_hoje = datetime.now().strftime("%Y-%m-%d")
-    if HumorDiarioDAO.buscar_humor_diario_usuario_data(usuario_id, data_hoje):
-        return "Humor já registrado hoje."
-    if sentimento:
-        HumorDiarioDAO.inserir_humor_diario(usuario_id, data_hoje, sentimento)
+    if not sentimento:
+        return "Nenhum sentimento fornecido."
+    # Upsert atômico: a chave (usuario_id, dia) garante um humor por dia
+    if HumorDiarioDAO.inserir_humor_diario_se_ausente(usuario_id, date.today(), sentimento):
         return "Sentimento registrado."
-    return "Nenhum sentimento fornecido."
+    return "Humor já registrado hoje."
 
 
 def obter_registro_humor_hoje(usuario_id):
     # ... (como antes) ...
-    return HumorDiarioDAO.buscar_humor_diario_usuario_data(usuario_id, datetime.now().strftime("%Y-%m-%d"))
+    return HumorDiarioDAO.buscar_humor_diario_usuario_data(usuario_id, date.today())
 
 # MODIFICADO:
 
@@ -122,27 +142,161 @@ def obter_humor_mensal(usuario_id, ano, mes):
     return HumorDiarioDAO.buscar_humor_mensal(usuario_id, ano, mes)
 
 
+class HumorIntervalo:
+    """Humor dia a dia de um usuário em [inicio, fim], em formato compacto.
+
+    codigos[i] é o código (inteiro pequeno) do sentimento do dia inicio + i,
+    com 0 para dia sem registro; sentimentos[codigo] traduz o código para o
+    texto (sentimentos[0] é None)."""
+
+    def __init__(self, inicio, fim, codigos, sentimentos):
+        self.inicio = inicio
+        self.fim = fim
+        self.codigos = codigos
+        self.sentimentos = sentimentos
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def sentimento_em(self, dia):
+        """Sentimento registrado na data `dia` (date) ou None."""
+        offset = (dia - self.inicio).days
+        if not 0 <= offset < len(self.codigos):
+            return None
+        return self.sentimentos[self.codigos[offset]]
+
+
+def _como_data(valor):
+    return date.fromisoformat(valor) if isinstance(valor, str) else valor
+
+
+def obter_humor_intervalo(usuario_id, inicio, fim):
+    """Busca o humor de um usuário entre inicio e fim (date ou 'YYYY-MM-DD',
+    inclusive) em uma única consulta. Retorna um HumorIntervalo; um ano
+    inteiro ocupa ~730 bytes de códigos."""
+    inicio, fim = _como_data(inicio), _como_data(fim)
+    total_dias = max(0, (fim - inicio).days + 1)
+    codigos = array('H', bytes(2 * total_dias))  # 'H': até 65535 sentimentos distintos
+    sentimentos = [None]
+    codigo_por_sentimento = {}
+    dia_inicio = database_manager.data_para_dia(inicio)
+    for dia, sentimento in HumorDiarioDAO.buscar_humor_intervalo(usuario_id, inicio, fim):
+        codigo = codigo_por_sentimento.get(sentimento)
+        if codigo is None:
+            codigo = codigo_por_sentimento[sentimento] = len(sentimentos)
+            sentimentos.append(sentimento)
+        codigos[dia - dia_inicio] = codigo
+    return HumorIntervalo(inicio, fim, codigos, sentimentos)
+
+
+def _resumo_humor(linha, hoje=None):
+    """Linha de HumorDiarioDAO.buscar_resumos_humor -> dict, com as contagens
+    da janela contadas a partir de hoje (as máscaras são relativas ao último dia)."""
+    ultimo_dia, sentimento, sequencia, total, *mascaras = linha
+    atraso = database_manager.data_para_dia(hoje or date.today()) - ultimo_dia
+    dias_validos = max(0, min(JANELA_RESUMO_HUMOR_DIAS, JANELA_RESUMO_HUMOR_DIAS - atraso))
+    janela = (1 << dias_validos) - 1
+    positivos, neutros, negativos = ((m & janela).bit_count() for m in mascaras)
+    return {"ultimo_dia": database_manager.dia_para_data(ultimo_dia).isoformat(),
+            "ultimo_sentimento": sentimento,
+            # Sem registro ontem nem hoje, a sequência já foi interrompida
+            "sequencia_atual": sequencia if atraso <= 1 else 0,
+            "total_registros": total, "janela_dias": JANELA_RESUMO_HUMOR_DIAS,
+            "positivos": positivos, "neutros": neutros, "negativos": negativos}
+
+
+def obter_resumos_humor(ids_usuarios):
+    """{usuario_id: resumo} lido de humor_resumo em uma consulta, sem varrer o histórico."""
+    hoje = date.today()
+    return {uid: _resumo_humor(linha, hoje)
+            for uid, linha in HumorDiarioDAO.buscar_resumos_humor(ids_usuarios).items()}
+
+
+def obter_resumo_humor(usuario_id):
+    """Último humor, sequência de dias, total e contagens por classe na janela
+    (None se o usuário nunca registrou humor)."""
+    return obter_resumos_humor([usuario_id]).get(usuario_id)
+
+
+def listar_pagina_usuarios_com_resumo(tamanho_pagina, cursor_pagina=None, tipo_usuario=None):
+    """Como Usuario.listar_usuarios_paginado, com o resumo de humor (ou None)
+    acrescentado ao fim de cada linha: uma consulta a mais por página."""
+    linhas, proximo = Usuario.listar_usuarios_paginado(
+        tamanho_pagina=tamanho_pagina, cursor_pagina=cursor_pagina, tipo_usuario=tipo_usuario)
+    resumos = obter_resumos_humor(l[0] for l in linhas)
+    return [(*l, resumos.get(l[0])) for l in linhas], proximo
+
+
+def obter_dados_completos_usuarios(ids_usuarios, tamanho_lote=500, limite_historico=7):
+    """Gerador de (id, dados) para vários usuários comuns, no mesmo formato de
+    obter_dados_completos_usuario. Consome `ids_usuarios` (lista ou iterador) em
+    lotes de `tamanho_lote`: quatro consultas por lote (usuários, respostas,
+    últimos humores via ROW_NUMBER e resumo), não por usuário. Ids inexistentes
+    ou que não são de usuário comum são pulados."""
+    ids = iter(ids_usuarios)
+    while True:
+        lote = list(itertools.islice(ids, tamanho_lote))
+        if not lote:
+            return
+        detalhes = Usuario.buscar_detalhes_usuarios_para_colaborador(lote)
+        if not detalhes:
+            continue
+        respostas = {}
+        for usuario_id, questionario, pergunta, resposta in QuestionarioDAO.buscar_respostas_usuarios(detalhes):
+            respostas.setdefault((usuario_id, questionario), []).append(
+                {"pergunta": pergunta, "resposta": resposta})
+        historicos = HumorDiarioDAO.buscar_historicos_humor_usuarios(detalhes, limite_historico)
+        resumos = obter_resumos_humor(detalhes)
+        for usuario_id in lote:
+            if usuario_id not in detalhes:
+                continue
+            nome_usuario, pet_sugerido = detalhes[usuario_id]
+            yield usuario_id, {
+                "nome": nome_usuario,
+                "respostas_questionario_bem_estar": respostas.get((usuario_id, QUESTIONARIO_BEM_ESTAR), []),
+                "pet_sugerido": pet_sugerido,
+                "respostas_questionario_pet_apoio": respostas.get((usuario_id, QUESTIONARIO_PET), []),
+                "historico_humor": historicos.get(usuario_id, []),
+                "resumo_humor": resumos.get(usuario_id)}
+
+
 def obter_dados_completos_usuario(id_usuario):
-    # ... (como antes, já corrigido e sem o alerta) ...
-    detalhes_usuario_tupla = Usuario.buscar_detalhes_usuario_para_colaborador(
-        id_usuario)
+    """Dados de um usuário comum para o colaborador (None se não existe ou não é
+    usuário comum). Mesmo formato de obter_dados_completos_usuarios, mas com as
+    buscas por chave de um usuário só, sem montar um lote."""
+    detalhes_usuario_tupla = Usuario.buscar_detalhes_usuario_para_colaborador(id_usuario)
     if not detalhes_usuario_tupla:
         return None
-    nome_usuario, respostas_q_json, pet_sugerido, respostas_pa_json_str = detalhes_usuario_tupla
-    respostas_questionario, respostas_pet_apoio = [], []
-    if respostas_q_json:
-        try:
-            respostas_questionario = json.loads(respostas_q_json)
-        except json.JSONDecodeError:
-            print(f"Erro JSON bem-estar user {id_usuario}")
-    if respostas_pa_json_str:
-        try:
-            parsed_data = json.loads(respostas_pa_json_str)
-            if isinstance(parsed_data, list):
-                respostas_pet_apoio = parsed_data
-        except json.JSONDecodeError:
-            print(f"Erro JSON pet user {id_usuario}")
-    historico_humor = HumorDiarioDAO.buscar_historico_humor_usuario(id_usuario)
-    return {"nome": nome_usuario, "respostas_questionario_bem_estar": respostas_questionario,
-            "pet_sugerido": pet_sugerido, "respostas_questionario_pet_apoio": respostas_pet_apoio,
-            "historico_humor": historico_humor}
+    nome_usuario, pet_sugerido = detalhes_usuario_tupla
+    respostas = {QUESTIONARIO_BEM_ESTAR: [], QUESTIONARIO_PET: []}
+    for questionario, pergunta, resposta in QuestionarioDAO.buscar_respostas_usuario(id_usuario):
+        respostas.setdefault(questionario, []).append({"pergunta": pergunta, "resposta": resposta})
+    return {"nome": nome_usuario,
+            "respostas_questionario_bem_estar": respostas[QUESTIONARIO_BEM_ESTAR],
+            "pet_sugerido": pet_sugerido,
+            "respostas_questionario_pet_apoio": respostas[QUESTIONARIO_PET],
+            "historico_humor": HumorDiarioDAO.buscar_historico_humor_usuario(id_usuario),
+            "resumo_humor": obter_resumo_humor(id_usuario)}
+
+
+def obter_contagem_respostas(questionario=QUESTIONARIO_BEM_ESTAR):
+    """{pergunta: {resposta: total de usuários}} de um questionário, sem ler as
+    respostas usuário a usuário."""
+    contagem = {}
+    for pergunta, resposta, total in QuestionarioDAO.contar_respostas(questionario):
+        contagem.setdefault(pergunta, {})[resposta] = total
+    return contagem
+
+
+def obter_triagem_populacional(limite=50, dias=analytics.DIAS_ANALISE):
+    """Triagem de todos os usuários comuns de uma vez (requer NumPy):
+    {"ranking": [indicadores + nome, do maior risco ao menor],
+     "prevalencia": {pergunta: (proporção de sim, respondentes)},
+     "faixas_etarias": [...], "usuarios_analisados": n}."""
+    analise = analytics.analisar_populacao(dias)
+    ranking = [analise.indicadores(i) for i in analise.ranking(limite)]
+    nomes = Usuario.buscar_nomes_por_ids([r["usuario_id"] for r in ranking])
+    for r in ranking:
+        r["nome"] = nomes.get(r["usuario_id"], "?")
+    return {"ranking": ranking, "prevalencia": analise.prevalencia_por_pergunta(),
+            "faixas_etarias": analise.por_faixa_etaria(), "usuarios_analisados": len(analise)}
@@ -0,0 +1,155 @@
+# services_async.py
+"""Versão asyncio de services.py, para atender muitos clientes em um só processo.
+
+Cada função pública de services.py tem aqui uma corrotina com o mesmo nome,
+os mesmos argumentos e o mesmo retorno (obter_dados_completos_usuarios vira
+um gerador assíncrono). O trabalho bloqueante (SQLite) roda em um
+ThreadPoolExecutor, que usa o pool de conexões e o escritor agrupado do
+database_manager como o app síncrono. O executor tem ASYNC_THREADS threads,
+mas nunca mais que as conexões do pool (POOL_TAMANHO, menos a que o escritor
+agrupado ocupa enquanto grava um lote): thread a mais só ficaria esperando
+conexão e acabaria em OperationalError após POOL_TIMEOUT. A redução é avisada
+com um RuntimeWarning.
+
+Backpressure: no máximo ASYNC_MAX_PENDENTES chamadas ficam em andamento
+(executando ou na fila do executor). As demais aguardam a vez sem ocupar
+thread; quem espera mais de ASYNC_ESPERA_MAX segundos recebe
+ServicoSobrecarregado. Assim milhares de requisições simultâneas ficam
+como corrotinas baratas no event loop, não como threads.
+
+Exemplo:
+    dados = await services_async.autenticar_e_obter_dados_completos(email, senha)
+"""
+import asyncio
+import functools
+import itertools
+import threading
+import warnings
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import database_manager
+import services
+from config import ASYNC_THREADS, ASYNC_MAX_PENDENTES, ASYNC_ESPERA_MAX, POOL_TAMANHO
+
+
+class ServicoSobrecarregado(RuntimeError):
+    """A chamada esperou mais de ASYNC_ESPERA_MAX segundos por uma vaga."""
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_semaforos = weakref.WeakKeyDictionary()  # Um por event loop
+
+
+def _threads_executor():
+    """Threads do executor: ASYNC_THREADS limitado às conexões livres do pool."""
+    conexoes = max(1, POOL_TAMANHO - (1 if database_manager.ESCRITOR_AGRUPADO else 0))
+    if ASYNC_THREADS > conexoes:
+        warnings.warn(f"ASYNC_THREADS={ASYNC_THREADS} reduzido para {conexoes}: o pool tem {POOL_TAMANHO} "
+                      f"conexões. Aumente POOL_TAMANHO para usar mais threads.", RuntimeWarning, stacklevel=2)
+    return max(1, min(ASYNC_THREADS, conexoes))
+
+
+def _obter_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_threads_executor(), thread_name_prefix="services-async")
+        return _executor
+
+
+def encerrar():
+    """Encerra as threads do executor (aguardando as chamadas em andamento)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _semaforo():
+    loop = asyncio.get_running_loop()
+    semaforo = _semaforos.get(loop)
+    if semaforo is None:
+        semaforo = _semaforos[loop] = asyncio.Semaphore(ASYNC_MAX_PENDENTES)
+    return semaforo
+
+
+async def _executar(funcao, *args, **kwargs):
+    """Roda funcao(*args, **kwargs) no executor, respeitando o limite de chamadas."""
+    semaforo = _semaforo()
+    try:
+        await asyncio.wait_for(semaforo.acquire(), ASYNC_ESPERA_MAX)
+    except asyncio.TimeoutError:
+        raise ServicoSobrecarregado(
+            f"Mais de {ASYNC_MAX_PENDENTES} chamadas em andamento há {ASYNC_ESPERA_MAX}s.") from None
+    loop = asyncio.get_running_loop()
+
+    def liberar(_):
+        # A vaga só volta quando a thread termina (mesmo se a corrotina foi cancelada)
+        try:
+            loop.call_soon_threadsafe(semaforo.release)
+        except RuntimeError:  # Event loop já fechado
+            pass
+
+    futuro = _obter_executor().submit(functools.partial(funcao, *args, **kwargs))
+    futuro.add_done_callback(liberar)
+    return await asyncio.wrap_future(futuro)
+
+
+def _assincrona(funcao):
+    """Corrotina equivalente a uma função bloqueante de services.py."""
+    @functools.wraps(funcao)
+    async def corrotina(*args, **kwargs):
+        return await _executar(funcao, *args, **kwargs)
+    return corrotina
+
+
+# --- Autenticação e usuários ---
+autenticar_usuario = _assincrona(services.autenticar_usuario)
+autenticar_e_obter_dados_completos = _assincrona(services.autenticar_e_obter_dados_completos)
+registrar_novo_usuario = _assincrona(services.registrar_novo_usuario)
+atualizar_info_usuario = _assincrona(services.atualizar_info_usuario)
+atualizar_campos_usuario = _assincrona(services.atualizar_campos_usuario)
+deletar_usuario_por_id = _assincrona(services.deletar_usuario_por_id)
+listar_pagina_usuarios_com_resumo = _assincrona(services.listar_pagina_usuarios_com_resumo)
+
+# --- Questionários ---
+processar_questionario_bem_estar = _assincrona(services.processar_questionario_bem_estar)
+processar_questionario_pet_e_sugerir = _assincrona(services.processar_questionario_pet_e_sugerir)
+obter_contagem_respostas = _assincrona(services.obter_contagem_respostas)
+
+# --- Humor ---
+registrar_sentimento_diario = _assincrona(services.registrar_sentimento_diario)
+obter_registro_humor_hoje = _assincrona(services.obter_registro_humor_hoje)
+obter_humor_mensal = _assincrona(services.obter_humor_mensal)
+obter_humor_intervalo = _assincrona(services.obter_humor_intervalo)
+obter_resumos_humor = _assincrona(services.obter_resumos_humor)
+obter_resumo_humor = _assincrona(services.obter_resumo_humor)
+
+# --- Colaboradores ---
+obter_colaboradores_para_encaminhamento = _assincrona(services.obter_colaboradores_para_encaminhamento)
+obter_dados_completos_usuario = _assincrona(services.obter_dados_completos_usuario)
+obter_triagem_populacional = _assincrona(services.obter_triagem_populacional)
+
+
+async def obter_dados_completos_usuarios(ids_usuarios, tamanho_lote=500, limite_historico=7):
+    """Gerador assíncrono de (id, dados), como services.obter_dados_completos_usuarios;
+    cada lote de `tamanho_lote` usuários é buscado em uma ida ao executor."""
+    gerador = services.obter_dados_completos_usuarios(ids_usuarios, tamanho_lote, limite_historico)
+    while True:
+        lote = await _executar(lambda: list(itertools.islice(gerador, tamanho_lote)))
+        if not lote:
+            return
+        for item in lote:
+            yield item
+
+
+# Sem I/O: rodam direto no event loop
+async def logica_sugestao_pet(respostas_dict_para_logica):
+    return services.logica_sugestao_pet(respostas_dict_para_logica)
+
+
+async def obter_estatisticas_cache_usuarios():
+    return services.obter_estatisticas_cache_usuarios()
@@ -0,0 +1,23 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# Os módulos do app ficam na raiz do repositório (layout plano)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database_manager  # noqa: E402
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    """Banco novo e migrado em tmp_path, com cache de usuários vazio; retorna o caminho."""
+    caminho = str(tmp_path / "safespace.db")
+    monkeypatch.setattr(database_manager, "DATABASE_NAME", caminho)
+    database_manager.cache_usuarios.limpar()
+    database_manager.criar_tabelas_iniciais()
+    yield caminho
+    database_manager.escritor.parar()
+    database_manager.fechar_pool()
+    database_manager.cache_usuarios.limpar()
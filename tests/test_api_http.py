@@ -0,0 +1,215 @@
+# tests/test_api_http.py
+"""api_http servido de verdade (iniciar_servidor na porta 0), falando HTTP
+cru por socket: sessões e permissões, pipelining, ETag/304, cursor, PUT
+parcial e Content-Length inválido."""
+import asyncio
+import base64
+import json
+
+import pytest
+
+import api_http
+import services_async
+from config import TIPO_USUARIO_COMUM
+from database_manager import Usuario
+
+
+@pytest.fixture
+def rodar(banco):
+    """rodar(cenario): executa `await cenario(porta)` com o servidor no ar."""
+    api_http._sessoes.clear()
+
+    def executar(cenario):
+        async def principal():
+            servidor = await api_http.iniciar_servidor("127.0.0.1", 0)
+            try:
+                return await cenario(servidor.sockets[0].getsockname()[1])
+            finally:
+                servidor.close()
+                await servidor.wait_closed()
+        return asyncio.run(principal())
+
+    yield executar
+    services_async.encerrar()
+    api_http._sessoes.clear()
+
+
+def _pedido(metodo, alvo, corpo=None, token=None, cabecalhos=()):
+    dados = b"" if corpo is None else json.dumps(corpo).encode()
+    linhas = [f"{metodo} {alvo} HTTP/1.1", "Host: teste", f"Content-Length: {len(dados)}", *cabecalhos]
+    if token:
+        linhas.append(f"Authorization: Bearer {token}")
+    return ("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1") + dados
+
+
+async def _resposta(leitor):
+    """(status, cabeçalhos em minúsculas, corpo JSON ou None)."""
+    linha, *linhas = (await leitor.readuntil(b"\r\n\r\n")).decode("latin-1").strip().split("\r\n")
+    cabecalhos = {nome.lower(): valor.strip() for nome, _, valor in (l.partition(":") for l in linhas)}
+    corpo = await leitor.readexactly(int(cabecalhos.get("content-length", 0)))
+    return int(linha.split(" ")[1]), cabecalhos, json.loads(corpo) if corpo else None
+
+
+class _Cliente:
+    def __init__(self, porta):
+        self.porta = porta
+
+    async def __aenter__(self):
+        self.leitor, self.escritor = await asyncio.open_connection("127.0.0.1", self.porta)
+        return self
+
+    async def __aexit__(self, *_):
+        self.escritor.close()
+
+    async def enviar(self, *pedidos):
+        self.escritor.write(b"".join(pedidos))
+        await self.escritor.drain()
+        return [await _resposta(self.leitor) for _ in pedidos]
+
+    async def pedir(self, metodo, alvo, corpo=None, token=None, cabecalhos=()):
+        return (await self.enviar(_pedido(metodo, alvo, corpo, token, cabecalhos)))[0]
+
+    async def login(self, email, senha):
+        status, _, corpo = await self.pedir("POST", "/sessoes", {"email": email, "senha": senha})
+        assert status == 201, corpo
+        return corpo["token"], corpo["usuario"]["id"]
+
+    async def cadastrar(self, nome, email, senha="senha1234", idade=30):
+        status, _, corpo = await self.pedir("POST", "/usuarios",
+                                            {"nome": nome, "email": email, "senha": senha, "idade": idade})
+        assert status == 201, corpo
+        return await self.login(email, senha)
+
+
+def test_sessoes_e_permissoes(rodar):
+    async def cenario(porta):
+        async with _Cliente(porta) as cliente:
+            assert (await cliente.pedir("GET", "/usuarios"))[0] == 401
+            assert (await cliente.pedir("GET", "/usuarios", token="inventado"))[0] == 401
+            assert (await cliente.pedir("POST", "/sessoes", {"email": "admin", "senha": "errada"}))[0] == 401
+            admin, _ = await cliente.login("admin", "1234")
+            comum, _ = await cliente.cadastrar("Ana Silva", "ana@x.com")
+            assert (await cliente.pedir("GET", "/usuarios", token=comum))[0] == 403
+            assert (await cliente.pedir("GET", "/humor/hoje", token=admin))[0] == 403
+            status, _, corpo = await cliente.pedir("GET", "/usuarios", token=admin)
+            assert status == 200 and {u["email"] for u in corpo["itens"]} == {"admin", "ana@x.com"}
+            assert (await cliente.pedir("DELETE", "/sessoes", token=comum))[0] == 200
+            assert (await cliente.pedir("GET", "/humor/hoje", token=comum))[0] == 401
+    rodar(cenario)
+
+
+def test_pipelining_responde_em_ordem(rodar):
+    async def cenario(porta):
+        async with _Cliente(porta) as cliente:
+            comum, _ = await cliente.cadastrar("Ana Silva", "ana@x.com")
+            # Tudo de uma vez na mesma conexão: a escrita vem antes da leitura
+            respostas = await cliente.enviar(
+                _pedido("GET", "/humor/hoje", token=comum),
+                _pedido("POST", "/humor", {"sentimento": "Feliz"}, token=comum),
+                _pedido("GET", "/humor/hoje", token=comum),
+                _pedido("GET", "/nao-existe"),
+                _pedido("GET", "/colaboradores", token=comum, cabecalhos=("Connection: close",)),
+            )
+            assert [status for status, _, _ in respostas] == [200, 201, 200, 404, 200]
+            assert respostas[0][2]["sentimento"] is None
+            assert respostas[2][2]["sentimento"] == "Feliz"
+            assert respostas[0][1]["connection"] == "keep-alive"
+            assert respostas[4][1]["connection"] == "close" and "itens" in respostas[4][2]
+            assert await cliente.leitor.read() == b""  # Fechou depois do Connection: close
+    rodar(cenario)
+
+
+def test_etag_e_if_none_match(rodar):
+    async def cenario(porta):
+        async with _Cliente(porta) as cliente:
+            admin, _ = await cliente.login("admin", "1234")
+            _, usuario_id = await cliente.cadastrar("Ana Silva", "ana@x.com")
+            alvo = f"/usuarios/{usuario_id}"
+            status, cabecalhos, corpo = await cliente.pedir("GET", alvo, token=admin)
+            assert status == 200 and corpo["nome"] == "Ana Silva"
+            etag = cabecalhos["etag"]
+            status, cabecalhos, corpo = await cliente.pedir("GET", alvo, token=admin,
+                                                            cabecalhos=(f"If-None-Match: {etag}",))
+            assert (status, corpo, cabecalhos["etag"]) == (304, None, etag)
+            assert "content-length" not in cabecalhos
+            # Depois de uma alteração o ETag antigo não vale mais
+            assert (await cliente.pedir("PUT", f"/admin/usuarios/{usuario_id}", {"nome": "Ana Souza"},
+                                        token=admin))[0] == 200
+            status, cabecalhos, corpo = await cliente.pedir("GET", alvo, token=admin,
+                                                            cabecalhos=(f"If-None-Match: {etag}",))
+            assert status == 200 and corpo["nome"] == "Ana Souza" and cabecalhos["etag"] != etag
+    rodar(cenario)
+
+
+def test_cursor(rodar):
+    for n in range(5):
+        Usuario.inserir_usuario(f"Pessoa {n} Silva", f"p{n}@x.com", "senha1234", 30, TIPO_USUARIO_COMUM)
+
+    def codificar(valor):
+        return base64.urlsafe_b64encode(json.dumps(valor).encode()).decode()
+
+    async def cenario(porta):
+        async with _Cliente(porta) as cliente:
+            admin, _ = await cliente.login("admin", "1234")
+            assert (await cliente.pedir("GET", f"/usuarios?cursor={codificar([1, 2])}", token=admin))[0] == 200
+            for cursor in ("invalido", codificar(None), codificar([1, "x"]), codificar([1, 2, 3]), codificar({})):
+                status, _, corpo = await cliente.pedir("GET", f"/usuarios?cursor={cursor}", token=admin)
+                assert (status, corpo["erro"]) == (400, "Cursor inválido."), cursor
+            vistos = []
+            cursor = ""
+            while True:
+                status, _, corpo = await cliente.pedir("GET", f"/usuarios?tamanho=2&cursor={cursor}", token=admin)
+                assert status == 200
+                vistos += [u["id"] for u in corpo["itens"]]
+                if corpo["proximo_cursor"] is None:
+                    break
+                cursor = corpo["proximo_cursor"]
+            assert len(vistos) == len(set(vistos)) == 6
+    rodar(cenario)
+
+
+def test_put_parcial(rodar):
+    async def cenario(porta):
+        async with _Cliente(porta) as cliente:
+            admin, admin_id = await cliente.login("admin", "1234")
+            _, usuario_id = await cliente.cadastrar("Ana Silva", "ana@x.com", idade=30)
+            alvo = f"/admin/usuarios/{usuario_id}"
+            assert (await cliente.pedir("PUT", alvo, {"idade": 31}, token=admin))[0] == 200
+            assert (await cliente.pedir("PUT", alvo, {}, token=admin))[0] == 400
+            assert (await cliente.pedir("PUT", alvo, {"email": "sem-arroba"}, token=admin))[0] == 400
+            assert (await cliente.pedir("PUT", "/admin/usuarios/9999", {"idade": 20}, token=admin))[0] == 404
+            # O admin default (email "admin", que não passaria na validação) muda só o nome
+            assert (await cliente.pedir("PUT", f"/admin/usuarios/{admin_id}", {"nome": "Admin Geral"},
+                                        token=admin))[0] == 200
+            return usuario_id, admin_id
+    usuario_id, admin_id = rodar(cenario)
+    assert Usuario.buscar_usuario_por_id(usuario_id)[1:5:3] == ("Ana Silva", 31)
+    assert Usuario.buscar_usuario_por_email("ana@x.com")[0] == usuario_id
+    assert Usuario.buscar_usuario_por_id(admin_id)[1:3] == ("Admin Geral", "admin")
+
+
+@pytest.mark.parametrize("tamanho", ["-1", "abc", "1_0", "+2", "0x2"])
+def test_content_length_invalido(rodar, tamanho):
+    async def cenario(porta):
+        async with _Cliente(porta) as cliente:
+            cliente.escritor.write(f"POST /sessoes HTTP/1.1\r\nContent-Length:{tamanho}\r\n\r\n{{}}".encode())
+            status, cabecalhos, corpo = await _resposta(cliente.leitor)
+            assert (status, corpo["erro"]) == (400, "Content-Length inválido.")
+            assert cabecalhos["connection"] == "close"
+            assert await cliente.leitor.read() == b""
+    rodar(cenario)
+
+
+def test_excluir_usuario_invalida_as_sessoes_dele(rodar):
+    async def cenario(porta):
+        async with _Cliente(porta) as cliente:
+            admin, _ = await cliente.login("admin", "1234")
+            primeira, usuario_id = await cliente.cadastrar("Ana Silva", "ana@x.com")
+            segunda, _ = await cliente.login("ana@x.com", "senha1234")
+            outro, _ = await cliente.cadastrar("Bia Ramos", "bia@x.com")
+            assert (await cliente.pedir("DELETE", f"/admin/usuarios/{usuario_id}", token=admin))[0] == 200
+            for token in (primeira, segunda):
+                assert (await cliente.pedir("GET", "/humor/hoje", token=token))[0] == 401
+            assert (await cliente.pedir("GET", "/humor/hoje", token=outro))[0] == 200
+            assert (await cliente.pedir("GET", "/usuarios", token=admin))[0] == 200
+    rodar(cenario)
@@ -0,0 +1,113 @@
+# tests/test_backup.py
+"""Backup online com escritas em andamento e restauração (verificada antes
+de substituir o banco)."""
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import backup
+import database_manager
+from config import TIPO_USUARIO_COMUM
+from database_manager import Usuario
+
+
+def _inserir_usuarios(inicio, quantidade):
+    for n in range(inicio, inicio + quantidade):
+        Usuario.inserir_usuario(f"Pessoa {n} Silva", f"p{n}@x.com", "senha1234", 30, TIPO_USUARIO_COMUM)
+
+
+def _contar_usuarios(caminho):
+    conn = sqlite3.connect(caminho)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_backup_com_escritas_concorrentes(banco, tmp_path):
+    _inserir_usuarios(0, 300)
+    parar = threading.Event()
+    gravados = []
+
+    def gravar():
+        n = 1000
+        while not parar.is_set():
+            _inserir_usuarios(n, 1)
+            gravados.append(n)
+            n += 1
+
+    escritor = threading.Thread(target=gravar)
+    escritor.start()
+    try:
+        # Passos de uma página com pausa: as escritas caem no meio da cópia
+        metricas = backup.criar_backup(str(tmp_path / "copia.db"), paginas=1, pausa=0.001, max_reinicios=3)
+    finally:
+        parar.set()
+        escritor.join()
+    assert gravados
+    verificacao = backup.verificar_backup(metricas["arquivo"])
+    assert 301 <= verificacao["tabelas"]["usuarios"] <= 301 + len(gravados)  # + admin
+    assert metricas["usuarios"] == verificacao["tabelas"]["usuarios"]
+    assert not os.path.exists(metricas["arquivo"] + ".parcial")
+    assert not os.path.exists(metricas["arquivo"] + "-wal")  # Snapshot em um arquivo só
+
+
+def test_restaurar_backup(banco, tmp_path):
+    _inserir_usuarios(0, 5)
+    copia = backup.criar_backup(str(tmp_path / "copia.db"))["arquivo"]
+    _inserir_usuarios(5, 3)
+    assert Usuario.buscar_usuario_por_email("p6@x.com") is not None  # Fica no cache do app
+
+    metricas = backup.restaurar_backup(copia, diretorio=str(tmp_path / "backups"))
+    assert metricas["tabelas"]["usuarios"] == 6
+    # O app (pool e cache) passa a ver o banco restaurado
+    assert Usuario.buscar_usuario_por_email("p6@x.com") is None
+    assert Usuario.buscar_usuario_por_email("p4@x.com") is not None
+    assert _contar_usuarios(banco) == 6
+    # O banco de antes foi salvo e continua íntegro
+    assert _contar_usuarios(metricas["copia_anterior"]) == 9
+    assert os.path.basename(metricas["copia_anterior"]).startswith(backup.PREFIXO_PRE_RESTAURACAO)
+    assert not os.path.exists(banco + ".restaurando")
+    # E continua gravável
+    _inserir_usuarios(100, 1)
+    assert _contar_usuarios(banco) == 7
+
+
+def test_backup_corrompido_nao_toca_no_banco(banco, tmp_path):
+    _inserir_usuarios(0, 3)
+    corrompido = tmp_path / "corrompido.db"
+    corrompido.write_bytes(b"SQLite format 3\0" + b"\xff" * 4096)
+    with pytest.raises(backup.BackupInvalido):
+        backup.restaurar_backup(str(corrompido), salvar_atual=False)
+    assert _contar_usuarios(banco) == 4
+
+
+def test_falha_na_verificacao_da_copia_mantem_o_banco_atual(banco, tmp_path, monkeypatch):
+    _inserir_usuarios(0, 5)
+    copia = backup.criar_backup(str(tmp_path / "copia.db"))["arquivo"]
+    _inserir_usuarios(5, 3)
+    verificar = backup.verificar_backup
+
+    def verificar_copia_diferente(caminho):
+        resultado = verificar(caminho)
+        if caminho.endswith(".restaurando"):
+            resultado["tabelas"]["usuarios"] -= 1  # Simula uma cópia que não confere
+        return resultado
+
+    monkeypatch.setattr(backup, "verificar_backup", verificar_copia_diferente)
+    with pytest.raises(backup.BackupInvalido):
+        backup.restaurar_backup(copia, salvar_atual=False)
+    assert not os.path.exists(banco + ".restaurando")
+    assert _contar_usuarios(banco) == 9
+    assert Usuario.buscar_usuario_por_email("p7@x.com") is not None
+
+
+def test_backup_de_versao_mais_nova_e_recusado(banco, tmp_path):
+    copia = backup.criar_backup(str(tmp_path / "copia.db"))["arquivo"]
+    conn = sqlite3.connect(copia)
+    conn.execute(f"PRAGMA user_version = {database_manager.MIGRACOES[-1][0] + 1}")
+    conn.close()
+    with pytest.raises(backup.BackupInvalido, match="mais nova"):
+        backup.restaurar_backup(copia, salvar_atual=False)
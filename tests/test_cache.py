@@ -0,0 +1,107 @@
+# tests/test_cache.py
+"""Cache de usuários: invalidação pelas escritas do DAO, TTL e a corrida
+entre um carregamento e uma invalidação (geração do CacheLRU)."""
+import threading
+
+import cache
+import database_manager
+from cache import CacheLRU
+from config import TIPO_USUARIO_COMUM
+from database_manager import Usuario
+
+
+def _novo_usuario(email="ana@x.com"):
+    return Usuario.inserir_usuario("Ana Silva", email, "senha1234", 30, TIPO_USUARIO_COMUM)
+
+
+def test_atualizacao_invalida_busca_por_id(banco):
+    usuario_id = _novo_usuario()
+    assert Usuario.buscar_usuario_por_id(usuario_id)[1] == "Ana Silva"
+    Usuario.atualizar_dados_usuario(usuario_id, "Ana Souza", "ana@x.com", "senha1234", 31)
+    assert Usuario.buscar_usuario_por_id(usuario_id)[1:5] == ("Ana Souza", "ana@x.com", "senha1234", 31)
+
+
+def test_troca_de_email_invalida_email_antigo_e_novo(banco):
+    usuario_id = _novo_usuario()
+    assert Usuario.buscar_usuario_por_email("ana@x.com")[0] == usuario_id
+    assert Usuario.buscar_usuario_por_email("ana.souza@x.com") is None  # "Não existe" em cache
+    Usuario.atualizar_dados_usuario(usuario_id, "Ana Silva", "ana.souza@x.com", "senha1234", 30)
+    assert Usuario.buscar_usuario_por_email("ana@x.com") is None
+    assert Usuario.buscar_usuario_por_email("ana.souza@x.com")[0] == usuario_id
+
+
+def test_insercao_invalida_email_lembrado_como_inexistente(banco):
+    assert Usuario.buscar_usuario_por_email("ana@x.com") is None
+    usuario_id = _novo_usuario()
+    assert Usuario.buscar_usuario_por_email("ana@x.com")[0] == usuario_id
+
+
+def test_exclusao_invalida_id_e_email(banco):
+    usuario_id = _novo_usuario()
+    assert Usuario.buscar_usuario_por_id(usuario_id) is not None
+    assert Usuario.buscar_usuario_por_email("ana@x.com") is not None
+    Usuario.deletar_usuario_por_id(usuario_id)
+    assert Usuario.buscar_usuario_por_id(usuario_id) is None
+    assert Usuario.buscar_usuario_por_email("ana@x.com") is None
+
+
+def test_ttl_expira_entrada(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: agora[0])
+    c = CacheLRU(10, ttl_segundos=30)
+    c.guardar("chave", "valor")
+    agora[0] += 29.9
+    assert c.obter("chave") == (True, "valor")
+    agora[0] += 0.2
+    assert c.obter("chave") == (False, None)
+    assert c.estatisticas()["expirados"] == 1
+    assert c.obter_ou_carregar("chave", lambda: "novo") == "novo"
+
+
+def test_lru_descarta_o_menos_usado():
+    c = CacheLRU(2, ttl_segundos=60)
+    c.guardar("a", 1)
+    c.guardar("b", 2)
+    c.obter("a")
+    c.guardar("c", 3)
+    assert c.obter("b") == (False, None)
+    assert c.obter("a") == (True, 1) and c.obter("c") == (True, 3)
+
+
+def test_carregamento_durante_invalidacao_nao_fica_em_cache():
+    c = CacheLRU(10, ttl_segundos=60)
+    consultou, liberar = threading.Event(), threading.Event()
+
+    def carregar_antigo():
+        consultou.set()  # A "consulta" já leu a linha antiga
+        liberar.wait(5)
+        return "linha antiga"
+
+    resultado = []
+    leitor = threading.Thread(target=lambda: resultado.append(c.obter_ou_carregar("id", carregar_antigo)))
+    leitor.start()
+    assert consultou.wait(5)
+    c.invalidar("id")  # A escrita termina enquanto o carregamento está em andamento
+    liberar.set()
+    leitor.join(5)
+    assert resultado == ["linha antiga"]  # Quem pediu recebe o que leu...
+    assert c.obter("id") == (False, None)  # ...mas a linha antiga não fica em cache
+    assert c.estatisticas()["carregamentos_descartados"] == 1
+    assert c.obter_ou_carregar("id", lambda: "linha nova") == "linha nova"
+    assert c.obter("id") == (True, "linha nova")
+
+
+def test_dao_descarta_linha_lida_antes_da_atualizacao(banco, monkeypatch):
+    """A mesma corrida pelo DAO: a atualização acontece entre o SELECT e o guardar."""
+    usuario_id = _novo_usuario()
+    database_manager.cache_usuarios.limpar()
+    guardar_original = database_manager.cache_usuarios.guardar
+
+    def guardar_depois_de_atualizar(chave, valor, geracao=None):
+        Usuario.atualizar_dados_usuario(usuario_id, "Ana Souza", "ana@x.com", "senha1234", 30)
+        return guardar_original(chave, valor, geracao)
+
+    with monkeypatch.context() as mp:
+        mp.setattr(database_manager.cache_usuarios, "guardar", guardar_depois_de_atualizar)
+        assert Usuario.buscar_usuario_por_id(usuario_id)[1] == "Ana Silva"
+    assert Usuario.buscar_usuario_por_id(usuario_id)[1] == "Ana Souza"
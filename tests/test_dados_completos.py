@@ -0,0 +1,61 @@
+# tests/test_dados_completos.py
+"""obter_dados_completos_usuario (busca direta) e obter_dados_completos_usuarios
+(em lotes) devem devolver exatamente os mesmos dados."""
+from datetime import date, timedelta
+
+import pytest
+
+import services
+from config import TIPO_USUARIO_COMUM, TIPO_COLABORADOR
+from database_manager import HumorDiarioDAO, Usuario
+
+_BEM_ESTAR = [{"pergunta": "Dorme bem?", "resposta": "Sim"}, {"pergunta": "Pratica exercícios?", "resposta": "Não"}]
+_PET = [{"pergunta": "Horas em casa", "resposta": 8}, {"pergunta": "Tem quintal?", "resposta": "Sim"}]
+
+
+@pytest.fixture
+def ids(banco):
+    completo = Usuario.inserir_usuario("Ana Silva", "ana@x.com", "senha1234", 30, TIPO_USUARIO_COMUM,
+                                       _BEM_ESTAR, "Gato", _PET)
+    so_humor = Usuario.inserir_usuario("Bruno Lima", "bruno@x.com", "senha1234", None, TIPO_USUARIO_COMUM)
+    so_questionario = Usuario.inserir_usuario("Carla Dias", "carla@x.com", "senha1234", 25, TIPO_USUARIO_COMUM,
+                                              _BEM_ESTAR)
+    vazio = Usuario.inserir_usuario("Davi Rocha", "davi@x.com", "senha1234", 40, TIPO_USUARIO_COMUM)
+    colaborador = Usuario.inserir_usuario("Eva Costa", "eva@x.com", "senha1234", 35, TIPO_COLABORADOR)
+    hoje = date.today()
+    for usuario_id in (completo, so_humor):
+        for i in range(10):  # Mais que o limite do histórico (7)
+            HumorDiarioDAO.inserir_humor_diario(usuario_id, hoje - timedelta(days=i * 2),
+                                                ["Feliz", "Triste", "Neutro"][i % 3])
+    return {"completo": completo, "so_humor": so_humor, "so_questionario": so_questionario,
+            "vazio": vazio, "colaborador": colaborador}
+
+
+def test_lote_e_usuario_unico_iguais(ids):
+    comuns = [ids[k] for k in ("completo", "so_humor", "so_questionario", "vazio")]
+    em_lote = dict(services.obter_dados_completos_usuarios(comuns + [ids["colaborador"], 9999], tamanho_lote=2))
+    assert list(em_lote) == comuns  # Colaborador e id inexistente ficam de fora
+    for usuario_id in comuns:
+        assert services.obter_dados_completos_usuario(usuario_id) == em_lote[usuario_id]
+
+
+def test_conteudo_dos_dados(ids):
+    completo = services.obter_dados_completos_usuario(ids["completo"])
+    assert completo["nome"] == "Ana Silva" and completo["pet_sugerido"] == "Gato"
+    assert completo["respostas_questionario_bem_estar"] == _BEM_ESTAR
+    assert completo["respostas_questionario_pet_apoio"] == _PET
+    assert len(completo["historico_humor"]) == 7
+    assert completo["historico_humor"][0] == (date.today().isoformat(), "Feliz")
+    assert completo["resumo_humor"]["total_registros"] == 10
+
+    vazio = services.obter_dados_completos_usuario(ids["vazio"])
+    assert vazio == {"nome": "Davi Rocha", "respostas_questionario_bem_estar": [], "pet_sugerido": None,
+                     "respostas_questionario_pet_apoio": [], "historico_humor": [], "resumo_humor": None}
+    so_questionario = services.obter_dados_completos_usuario(ids["so_questionario"])
+    assert so_questionario["respostas_questionario_bem_estar"] == _BEM_ESTAR
+    assert so_questionario["historico_humor"] == [] and so_questionario["resumo_humor"] is None
+
+
+def test_usuario_que_nao_e_comum_ou_inexistente(ids):
+    assert services.obter_dados_completos_usuario(ids["colaborador"]) is None
+    assert services.obter_dados_completos_usuario(9999) is None
@@ -0,0 +1,138 @@
+# tests/test_escritor_agrupado.py
+"""EscritorAgrupado: SAVEPOINT por escrita, resultados só depois do COMMIT do
+lote, parar() processando a fila e escrita sozinha sem esperar espera_max."""
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+import database_manager
+from database_manager import EscritorAgrupado
+
+
+@pytest.fixture
+def tabela(banco):
+    with database_manager.conectar() as conn:
+        conn.execute("CREATE TABLE teste (valor TEXT UNIQUE)")
+    return banco
+
+
+def _valores(caminho):
+    conn = sqlite3.connect(caminho)  # Fora do pool: só vê o que já foi commitado
+    try:
+        return {valor for (valor,) in conn.execute("SELECT valor FROM teste")}
+    finally:
+        conn.close()
+
+
+def _inserir(valor):
+    def operacao(cursor):
+        cursor.execute("INSERT INTO teste (valor) VALUES (?)", (valor,))
+        return valor
+    return operacao
+
+
+def test_falha_desfaz_so_a_propria_escrita(tabela):
+    escritor = EscritorAgrupado()
+    futuros = [Future(), Future(), Future()]
+    pendentes_no_fim_do_lote = []
+    visto_na_entrega = []
+    # Quando o resultado de "a" chega, outra conexão já deve ver o lote commitado
+    futuros[0].add_done_callback(lambda f: visto_na_entrega.append(_valores(tabela)))
+
+    def falha(cursor):
+        cursor.execute("INSERT INTO teste (valor) VALUES ('b')")
+        raise ValueError("b recusado")
+
+    def ultima(cursor):
+        pendentes_no_fim_do_lote.append([f.done() for f in futuros])
+        return _inserir("c")(cursor)
+
+    escritor._executar_lote(list(zip([_inserir("a"), falha, ultima], futuros)))
+
+    assert futuros[0].result() == "a" and futuros[2].result() == "c"
+    with pytest.raises(ValueError, match="b recusado"):
+        futuros[1].result()
+    assert _valores(tabela) == {"a", "c"}
+    assert (escritor.commits, escritor.escritas) == (1, 3)
+    assert pendentes_no_fim_do_lote == [[False, False, False]]  # Nada entregue antes do COMMIT
+    assert visto_na_entrega == [{"a", "c"}]
+
+
+def test_falha_no_commit_chega_a_todas_as_escritas(tabela, monkeypatch):
+    escritor = EscritorAgrupado()
+    lote = [(_inserir("a"), Future()), (_inserir("b"), Future())]
+    monkeypatch.setattr(database_manager, "DATABASE_NAME", tabela + ".nao-existe/banco.db")
+    database_manager.fechar_pool()
+    escritor._executar_lote(lote)
+    for _, futuro in lote:
+        assert isinstance(futuro.exception(), sqlite3.OperationalError)
+    assert escritor.commits == 0
+
+
+def test_parar_processa_o_que_esta_na_fila(tabela):
+    escritor = EscritorAgrupado(max_lote=2)
+    liberar = threading.Event()
+
+    def bloqueia(cursor):
+        liberar.wait()
+        return _inserir("0")(cursor)
+
+    resultados = {}
+    chamadas = [threading.Thread(target=lambda: resultados.update(primeira=escritor.executar(bloqueia)))]
+    chamadas[0].start()
+    while escritor._em_andamento < 1 or not escritor._fila.empty():
+        time.sleep(0.001)  # A primeira já está na thread do escritor
+    for n in range(1, 6):
+        chamadas.append(threading.Thread(
+            target=lambda n=n: resultados.update({n: escritor.executar(_inserir(str(n)))})))
+        chamadas[-1].start()
+    while escritor._fila.qsize() < 5:
+        time.sleep(0.001)
+
+    parada = threading.Thread(target=escritor.parar)
+    parada.start()
+    liberar.set()
+    parada.join(timeout=10)
+    for chamada in chamadas:
+        chamada.join(timeout=10)
+    assert not parada.is_alive()
+    assert resultados == {"primeira": "0", 1: "1", 2: "2", 3: "3", 4: "4", 5: "5"}
+    assert _valores(tabela) == {"0", "1", "2", "3", "4", "5"}
+    assert escritor.escritas == 6 and escritor.commits >= 3  # max_lote=2
+
+
+def test_escrita_sozinha_nao_espera(tabela):
+    escritor = EscritorAgrupado(espera_max=1.0)
+    try:
+        inicio = time.perf_counter()
+        for n in range(3):
+            escritor.executar(_inserir(str(n)))
+        assert time.perf_counter() - inicio < 1.0
+    finally:
+        escritor.parar()
+    assert escritor.commits == 3
+
+
+def test_escritas_concorrentes_continuam_agrupadas(tabela):
+    escritor = EscritorAgrupado(espera_max=0.05)
+    inicio = threading.Barrier(8)
+
+    def gravar(n):
+        inicio.wait()
+        for i in range(20):
+            escritor.executar(_inserir(f"{n}-{i}"))
+
+    chamadas = [threading.Thread(target=gravar, args=(n,)) for n in range(8)]
+    try:
+        for chamada in chamadas:
+            chamada.start()
+        for chamada in chamadas:
+            chamada.join()
+    finally:
+        escritor.parar()
+    assert escritor.escritas == 160
+    assert escritor.commits < 160 / 2
+    assert len(_valores(tabela)) == 160
@@ -0,0 +1,52 @@
+# tests/test_humor_intervalo.py
+"""services.obter_humor_intervalo: um código por dia do intervalo, 0 nos dias sem registro."""
+from datetime import date, timedelta
+
+import pytest
+
+import services
+from config import TIPO_USUARIO_COMUM
+from database_manager import HumorDiarioDAO, Usuario
+
+
+@pytest.fixture
+def usuario_id(banco):
+    usuario_id = Usuario.inserir_usuario("Ana Silva", "ana@x.com", "senha1234", 30, TIPO_USUARIO_COMUM)
+    for data, sentimento in [("2023-12-30", "Feliz"), ("2023-12-31", "Triste"), ("2024-01-01", "Feliz"),
+                             ("2024-01-31", "Ansioso(a)"), ("2024-02-01", "Contente"), ("2024-02-29", "Feliz")]:
+        HumorDiarioDAO.inserir_humor_diario(usuario_id, data, sentimento)
+    return usuario_id
+
+
+def _por_dia(intervalo):
+    return {intervalo.inicio + timedelta(days=i): intervalo.sentimento_em(intervalo.inicio + timedelta(days=i))
+            for i in range(len(intervalo))}
+
+
+def test_intervalo_atravessa_virada_de_ano_e_de_mes(usuario_id):
+    intervalo = services.obter_humor_intervalo(usuario_id, "2023-12-30", date(2024, 3, 1))
+    assert len(intervalo) == 2 + 31 + 29 + 1  # 2024 é bissexto
+    dias = _por_dia(intervalo)
+    assert {d: s for d, s in dias.items() if s is not None} == {
+        date(2023, 12, 30): "Feliz", date(2023, 12, 31): "Triste", date(2024, 1, 1): "Feliz",
+        date(2024, 1, 31): "Ansioso(a)", date(2024, 2, 1): "Contente", date(2024, 2, 29): "Feliz"}
+    assert intervalo.sentimentos[0] is None
+    assert sum(1 for c in intervalo.codigos if c == 0) == len(intervalo) - 6
+    # Mesmo sentimento em dias diferentes usa o mesmo código
+    assert len(intervalo.sentimentos) == 1 + 4
+
+
+def test_dias_sem_registro_e_fora_do_intervalo(usuario_id):
+    intervalo = services.obter_humor_intervalo(usuario_id, "2024-01-02", "2024-01-30")
+    assert len(intervalo) == 29
+    assert set(intervalo.codigos) == {0}
+    assert intervalo.sentimentos == [None]
+    assert intervalo.sentimento_em(date(2024, 1, 15)) is None
+    assert intervalo.sentimento_em(date(2024, 1, 31)) is None  # Registrado, mas fora do intervalo
+    assert intervalo.sentimento_em(date(2024, 1, 1)) is None
+
+
+def test_limites_inclusivos_e_intervalo_vazio(usuario_id):
+    intervalo = services.obter_humor_intervalo(usuario_id, "2024-01-31", "2024-02-01")
+    assert [intervalo.sentimento_em(d) for d in (date(2024, 1, 31), date(2024, 2, 1))] == ["Ansioso(a)", "Contente"]
+    assert len(services.obter_humor_intervalo(usuario_id, "2024-02-01", "2024-01-31")) == 0
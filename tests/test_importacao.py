@@ -0,0 +1,106 @@
+# tests/test_importacao.py
+"""importacao.importar: arquivo de erros em ordem de linha, sem senha, e que
+pode ser corrigido e importado de novo."""
+import csv
+import json
+
+import database_manager
+import importacao
+from config import TIPO_USUARIO_COMUM
+from database_manager import Usuario
+
+_CABECALHO = ["nome", "email", "senha", "idade"]
+
+
+def _escrever_csv(caminho, linhas):
+    with open(caminho, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(_CABECALHO)
+        escritor.writerows(linhas)
+
+
+def _ler_csv(caminho):
+    with open(caminho, encoding="utf-8", newline="") as arquivo:
+        return list(csv.DictReader(arquivo))
+
+
+def _emails_cadastrados():
+    with database_manager.conectar() as conn:
+        return {email for (email,) in conn.execute("SELECT email FROM usuarios WHERE email != 'admin'")}
+
+
+def test_csv_erros_em_ordem_sem_senha_e_reimportacao(banco, tmp_path):
+    Usuario.inserir_usuario("Zeca Alves", "zeca@x.com", "senha1234", 50, TIPO_USUARIO_COMUM)
+    entrada, erros = tmp_path / "parceiro.csv", tmp_path / "parceiro.erros.csv"
+    _escrever_csv(entrada, [
+        ["Ana Silva", "ana@x.com", "segredo123", "30"],    # 2: aceita
+        ["Ana Souza", "ana@x.com", "segredo456", "31"],    # 3: email repetido no próprio arquivo (lote)
+        ["Bia", "bia@x.com", "segredo789", "22"],          # 4: nome inválido (validação)
+        ["Zeca Alves", "zeca@x.com", "segredo000", "50"],  # 5: email já no banco (lote)
+        ["Caio Lima", "caio@x.com", "curta", "40"],        # 6: senha inválida (validação)
+        ["Duda Reis", "duda@x.com", "segredo321", "200"],  # 7: idade fora do intervalo
+        ["Eli Santos", "eli@x.com", "segredo654", ""],     # 8: aceita, sem idade
+    ])
+    resultado = importacao.importar("usuarios", str(entrada), caminho_erros=str(erros), tamanho_lote=100)
+    assert (resultado["lidas"], resultado["importadas"], resultado["recusadas"]) == (7, 2, 5)
+    assert _emails_cadastrados() == {"zeca@x.com", "ana@x.com", "eli@x.com"}
+    assert Usuario.buscar_usuario_por_email("ana@x.com")[1] == "Ana Silva"  # A primeira ocorrência fica
+
+    recusados = _ler_csv(erros)
+    assert [int(r["linha"]) for r in recusados] == [3, 4, 5, 6, 7]
+    assert recusados[0]["erro"] == "email já cadastrado: ana@x.com"
+    assert recusados[1]["erro"] == "nome deve ter nome e sobrenome"
+    assert {r["senha"] for r in recusados} == {importacao.SENHA_OCULTA}
+    assert "segredo" not in erros.read_text(encoding="utf-8")
+
+    # Corrige o arquivo de erros e importa de novo: só os corrigidos entram
+    corrigidos = tmp_path / "corrigidos.csv"
+    _escrever_csv(corrigidos, [
+        ["Bia Ramos", "bia@x.com", "segredo789", "22"],
+        ["Caio Lima", "caio@x.com", "segredo987", "40"],
+        ["Duda Reis", "duda@x.com", "segredo321", "20"],
+        [recusados[0]["nome"], recusados[0]["email"], "segredo456", recusados[0]["idade"]],  # Ainda repetido
+    ])
+    erros_2 = tmp_path / "corrigidos.erros.csv"
+    resultado = importacao.importar("usuarios", str(corrigidos), caminho_erros=str(erros_2))
+    assert (resultado["importadas"], resultado["recusadas"]) == (3, 1)
+    assert [int(r["linha"]) for r in _ler_csv(erros_2)] == [5]
+    assert _emails_cadastrados() == {"zeca@x.com", "ana@x.com", "eli@x.com", "bia@x.com", "caio@x.com",
+                                     "duda@x.com"}
+
+
+def test_ordem_dos_erros_entre_lotes(banco, tmp_path):
+    """Recusas do lote e da validação intercaladas em vários lotes saem em ordem de linha."""
+    entrada, erros = tmp_path / "grande.csv", tmp_path / "grande.erros.csv"
+    linhas = []
+    for i in range(30):
+        if i % 3 == 1:
+            linhas.append([f"Pessoa {i - 1} Silva", f"p{i - 1}@x.com", "segredo123", "30"])  # Repetido
+        elif i % 5 == 0:
+            linhas.append([f"Pessoa{i}", f"p{i}@x.com", "segredo123", "30"])  # Nome inválido
+        else:
+            linhas.append([f"Pessoa {i} Silva", f"p{i}@x.com", "segredo123", "30"])
+    _escrever_csv(entrada, linhas)
+    resultado = importacao.importar("usuarios", str(entrada), caminho_erros=str(erros), tamanho_lote=4)
+    numeros = [int(r["linha"]) for r in _ler_csv(erros)]
+    assert numeros == sorted(numeros)
+    assert len(numeros) == resultado["recusadas"] > 0
+    assert resultado["importadas"] + resultado["recusadas"] == resultado["lidas"]
+
+
+def test_ndjson_erros_sem_senha(banco, tmp_path):
+    entrada, erros = tmp_path / "parceiro.ndjson", tmp_path / "parceiro.erros.ndjson"
+    entrada.write_text("\n".join([
+        json.dumps({"nome": "Ana Silva", "email": "ana@x.com", "senha": "segredo123"}),
+        '{"nome": "Bia Ramos", "email": "bia@x.com", "senha": "segredo456"',  # JSON truncado
+        json.dumps({"nome": "Ana Silva", "email": "ana@x.com", "senha": "segredo789"}),
+        json.dumps(["não", "é", "objeto"]),
+    ]) + "\n", encoding="utf-8")
+    resultado = importacao.importar("usuarios", str(entrada), caminho_erros=str(erros))
+    assert (resultado["importadas"], resultado["recusadas"]) == (1, 3)
+    recusados = [json.loads(linha) for linha in erros.read_text(encoding="utf-8").splitlines()]
+    assert [r["linha"] for r in recusados] == [2, 3, 4]
+    assert recusados[0]["erro"].startswith("JSON inválido")
+    assert '"senha": "***"' in recusados[0]["registro"]
+    assert recusados[1]["registro"]["senha"] == importacao.SENHA_OCULTA
+    assert "segredo" not in erros.read_text(encoding="utf-8")
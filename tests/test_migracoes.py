@@ -0,0 +1,147 @@
+# tests/test_migracoes.py
+"""Migrações de schema a partir de um banco no formato original (user_version 0)."""
+import json
+import sqlite3
+
+import pytest
+
+import database_manager
+from config import QUESTIONARIO_BEM_ESTAR, QUESTIONARIO_PET
+from database_manager import MIGRACOES
+
+# Schema original, antes de qualquer migração
+_SCHEMA_ORIGINAL = """
+    CREATE TABLE usuarios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        email TEXT NOT NULL UNIQUE,
+        senha TEXT NOT NULL,
+        idade INTEGER,
+        type INTEGER,
+        respostas_questionario TEXT,
+        pet_sugerido TEXT,
+        respostas_pet_apoio TEXT
+    );
+    CREATE TABLE humor_diario (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER NOT NULL,
+        data TEXT NOT NULL,
+        sentimento TEXT NOT NULL,
+        FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
+    );
+"""
+
+_HUMOR_ORIGINAL = [
+    (1, "2023-12-31", "Feliz"),
+    (1, "2024-01-01", "Triste"),
+    (1, "2024-01-01", "Contente"),  # Duplicado no dia: a migração 1 mantém o primeiro
+    (1, "2024-02-29", "Ansioso(a)"),
+    (2, "2024-01-01", "Feliz"),
+    (2, "1999-07-04", "Cansado(a)"),
+    (2, "2024-13-01", "Feliz"),  # Data inválida: descartada na conversão para dia
+]
+_RESPOSTAS_BEM_ESTAR = [{"pergunta": "Dorme bem?", "resposta": "Sim"},
+                        {"pergunta": "Pratica exercícios?", "resposta": "Não"}]
+_RESPOSTAS_PET = [{"pergunta": "Horas em casa", "resposta": 8}, {"pergunta": "Tem quintal?", "resposta": "Sim"}]
+_HUMOR_MIGRADO = {
+    (1, "2023-12-31", "Feliz"), (1, "2024-01-01", "Triste"), (1, "2024-02-29", "Ansioso(a)"),
+    (2, "2024-01-01", "Feliz"), (2, "1999-07-04", "Cansado(a)"),
+}
+
+
+@pytest.fixture
+def banco_original(tmp_path, monkeypatch):
+    """Caminho de um banco com o schema original e dados; migrado por criar_tabelas_iniciais()."""
+    caminho = str(tmp_path / "original.db")
+    conn = sqlite3.connect(caminho)
+    conn.executescript(_SCHEMA_ORIGINAL)
+    conn.executemany(
+        "INSERT INTO usuarios (id, nome, email, senha, idade, type, respostas_questionario, pet_sugerido, "
+        "respostas_pet_apoio) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(1, "Ana Silva", "ana@x.com", "senha1234", 30, 1,
+          json.dumps(_RESPOSTAS_BEM_ESTAR), "Gato", json.dumps(_RESPOSTAS_PET)),
+         (2, "Bruno Lima", "bruno@x.com", "senha1234", None, 1, "{json inválido", None, None),
+         (3, "Carla Dias", "carla@x.com", "senha1234", 25, 2, None, None, None)])
+    conn.execute("DELETE FROM usuarios WHERE id = 3")  # sqlite_sequence fica em 3
+    conn.executemany("INSERT INTO humor_diario (usuario_id, data, sentimento) VALUES (?, ?, ?)", _HUMOR_ORIGINAL)
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(database_manager, "DATABASE_NAME", caminho)
+    database_manager.cache_usuarios.limpar()
+    yield caminho
+    database_manager.escritor.parar()
+    database_manager.fechar_pool()
+
+
+def _consultar(caminho, sql, params=()):
+    conn = sqlite3.connect(caminho)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_migracao_humor_codificado_preserva_registros(banco_original):
+    database_manager.criar_tabelas_iniciais()
+    database_manager.fechar_pool()
+
+    assert _consultar(banco_original, "PRAGMA user_version") == [(MIGRACOES[-1][0],)]
+    tipos = dict(_consultar(banco_original, "SELECT name, type FROM sqlite_master "
+                                            "WHERE name IN ('humor_diario', 'humor_registro', 'sentimentos')"))
+    assert tipos == {"humor_diario": "view", "humor_registro": "table", "sentimentos": "table"}
+
+    # Pela tabela nova: dia inteiro e sentimento pelo dicionário
+    registros = _consultar(banco_original, "SELECT h.usuario_id, h.dia, s.texto FROM humor_registro h "
+                                           "JOIN sentimentos s ON s.id = h.sentimento_id")
+    assert len(registros) == len(_HUMOR_MIGRADO)
+    assert {(u, database_manager.dia_para_data(dia).isoformat(), s) for u, dia, s in registros} == _HUMOR_MIGRADO
+
+    # Pela view de compatibilidade, com as colunas antigas
+    assert set(_consultar(banco_original, "SELECT usuario_id, data, sentimento FROM humor_diario")) == _HUMOR_MIGRADO
+
+    # E pelo DAO
+    assert database_manager.HumorDiarioDAO.buscar_humor_diario_usuario_data(1, "2024-02-29") == \
+        (1, "2024-02-29", "Ansioso(a)")
+    assert database_manager.HumorDiarioDAO.buscar_humor_mensal(1, 2024, 1) == {1: "Triste"}
+
+
+def test_migracoes_sao_idempotentes(banco_original):
+    database_manager.criar_tabelas_iniciais()
+    database_manager.criar_tabelas_iniciais()
+    database_manager.fechar_pool()
+    assert _consultar(banco_original, "PRAGMA user_version") == [(MIGRACOES[-1][0],)]
+    assert set(_consultar(banco_original, "SELECT usuario_id, data, sentimento FROM humor_diario")) == _HUMOR_MIGRADO
+
+
+@pytest.mark.parametrize("drop_column", [
+    pytest.param(True, marks=pytest.mark.skipif(not database_manager.SQLITE_TEM_DROP_COLUMN,
+                                                reason="SQLite < 3.35 sem DROP COLUMN")),
+    False,
+], ids=["drop-column", "recria-tabela"])
+def test_migracao_questionarios_normalizados(banco_original, monkeypatch, drop_column):
+    monkeypatch.setattr(database_manager, "SQLITE_TEM_DROP_COLUMN", drop_column)
+    database_manager.criar_tabelas_iniciais()
+    database_manager.fechar_pool()
+
+    assert _consultar(banco_original, "PRAGMA user_version") == [(MIGRACOES[-1][0],)]
+    colunas = [linha[1] for linha in _consultar(banco_original, "PRAGMA table_info(usuarios)")]
+    assert colunas == ["id", "nome", "email", "senha", "idade", "type", "pet_sugerido"]
+    assert _consultar(banco_original, "SELECT id, nome, email, idade, type, pet_sugerido FROM usuarios "
+                                      "WHERE email != 'admin' ORDER BY id") == [
+        (1, "Ana Silva", "ana@x.com", 30, 1, "Gato"), (2, "Bruno Lima", "bruno@x.com", None, 1, None)]
+    # Ids não são reaproveitados: o admin criado depois da migração vem após o 3 excluído
+    assert _consultar(banco_original, "SELECT id FROM usuarios WHERE email = 'admin'") == [(4,)]
+    indices = {nome for (nome,) in _consultar(banco_original, "SELECT name FROM sqlite_master "
+                                                              "WHERE type = 'index' AND tbl_name = 'usuarios'")}
+    assert {"idx_usuarios_nome", "idx_usuarios_idade", "idx_usuarios_type"} <= indices
+    assert _consultar(banco_original, "PRAGMA foreign_key_check") == []
+
+    respostas = _consultar(banco_original, """
+        SELECT r.usuario_id, p.questionario, p.texto, r.resposta
+        FROM questionario_respostas r JOIN questionario_perguntas p ON p.id = r.pergunta_id
+        ORDER BY r.usuario_id, p.questionario, p.id""")
+    assert respostas == [(1, QUESTIONARIO_BEM_ESTAR, r["pergunta"], r["resposta"]) for r in _RESPOSTAS_BEM_ESTAR] + \
+        [(1, QUESTIONARIO_PET, r["pergunta"], r["resposta"]) for r in _RESPOSTAS_PET]
+    # E pela linha de login, que marca quem respondeu cada questionário
+    linha = _consultar(banco_original, database_manager.SQL_USUARIO_COMPLETO + "WHERE u.id IN (1, 2) ORDER BY u.id")
+    assert [(l[0], l[6], l[7], l[8]) for l in linha] == [(1, 1, "Gato", 1), (2, 0, None, 0)]
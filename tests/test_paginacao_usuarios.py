@@ -0,0 +1,84 @@
+# tests/test_paginacao_usuarios.py
+"""Paginação por keyset de Usuario.listar_usuarios_paginado: as páginas juntas
+são a listagem completa com ORDER BY <coluna>, id, inclusive com NULLs."""
+import pytest
+
+import database_manager
+from config import TIPO_USUARIO_COMUM, TIPO_COLABORADOR
+from database_manager import Usuario
+
+# Idades repetidas e NULLs espalhados, para cair nas bordas das páginas
+_IDADES = [30, None, 25, 30, None, 41, 25, None, 30, 19, None, 41, 30]
+
+
+@pytest.fixture(scope="module")
+def usuarios(tmp_path_factory):
+    # Só leituras: um banco para o módulo todo
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(database_manager, "DATABASE_NAME", str(tmp_path_factory.mktemp("paginacao") / "p.db"))
+        database_manager.criar_tabelas_iniciais()
+        _inserir_usuarios()
+        yield
+        database_manager.fechar_pool()
+
+
+def _inserir_usuarios():
+    with database_manager.conectar() as conn:
+        conn.executemany(
+            "INSERT INTO usuarios (nome, email, senha, idade, type) VALUES (?, ?, ?, ?, ?)",
+            [(f"Pessoa {i % 4}", f"p{i:02d}@x.com", "senha1234", idade,
+              TIPO_COLABORADOR if i % 3 == 0 else TIPO_USUARIO_COMUM)
+             for i, idade in enumerate(_IDADES)])
+        conn.commit()
+
+
+def _listagem_completa(coluna, descendente, tipo):
+    direcao = "DESC" if descendente else "ASC"
+    ordem = f"id {direcao}" if coluna == "id" else f"{coluna} {direcao}, id {direcao}"
+    filtro, params = ("WHERE type = ?", (tipo,)) if tipo is not None else ("", ())
+    with database_manager.conectar() as conn:
+        return conn.execute(f"SELECT id, nome, email, senha, idade, type FROM usuarios {filtro} "
+                            f"ORDER BY {ordem}", params).fetchall()
+
+
+def _todas_as_paginas(coluna, descendente, tamanho, tipo):
+    linhas, cursores, cursor = [], [], None
+    while True:
+        pagina, cursor = Usuario.listar_usuarios_paginado(coluna, descendente, tamanho, cursor, tipo)
+        assert len(pagina) <= tamanho
+        linhas.extend(pagina)
+        if cursor is None:
+            return linhas, cursores
+        assert len(pagina) == tamanho
+        cursores.append(cursor)
+
+
+@pytest.mark.parametrize("coluna", ["id", "nome", "idade", "email", "type"])
+@pytest.mark.parametrize("descendente", [False, True], ids=["asc", "desc"])
+@pytest.mark.parametrize("tamanho", [1, 2, 3, 5, 50])
+@pytest.mark.parametrize("tipo", [None, TIPO_USUARIO_COMUM], ids=["todos", "comuns"])
+def test_paginas_juntas_sao_a_listagem_completa(usuarios, coluna, descendente, tamanho, tipo):
+    linhas, _ = _todas_as_paginas(coluna, descendente, tamanho, tipo)
+    assert linhas == _listagem_completa(coluna, descendente, tipo)
+
+
+@pytest.mark.parametrize("descendente", [False, True], ids=["asc", "desc"])
+def test_cursor_com_idade_nula_na_borda(usuarios, descendente):
+    linhas, cursores = _todas_as_paginas("idade", descendente, 1, None)
+    assert any(valor is None for valor, _ in cursores)
+    assert any(valor is not None for valor, _ in cursores)
+    idades = [linha[4] for linha in linhas]
+    # NULLs primeiro em ASC e por último em DESC, como no ORDER BY do SQLite
+    nulos = idades.count(None)
+    trecho_nulos = idades[-nulos:] if descendente else idades[:nulos]
+    assert trecho_nulos == [None] * nulos
+
+
+def test_filtro_por_tipo(usuarios):
+    linhas, _ = _todas_as_paginas("idade", False, 2, TIPO_COLABORADOR)
+    assert linhas and all(linha[5] == TIPO_COLABORADOR for linha in linhas)
+
+
+def test_coluna_de_ordenacao_invalida(usuarios):
+    with pytest.raises(ValueError):
+        Usuario.listar_usuarios_paginado("senha")
@@ -0,0 +1,64 @@
+# tests/test_planos_consulta.py
+"""Regressão de índices: as buscas de humor por usuário não podem virar SCAN."""
+import sqlite3
+
+import pytest
+
+import database_manager
+from database_manager import SQL_HUMOR_DIA, SQL_HUMOR_HISTORICO, SQL_HUMOR_MENSAL
+
+
+def _plano(conn, sql, params):
+    return [linha[3] for linha in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def _assert_busca_indexada(plano):
+    assert plano
+    for passo in plano:
+        assert not passo.startswith("SCAN"), plano
+        assert "USING COVERING INDEX" in passo or "PRIMARY KEY" in passo, plano
+    assert not any("TEMP B-TREE" in passo for passo in plano), plano
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_manager, "DATABASE_NAME", str(tmp_path / "planos.db"))
+    database_manager.criar_tabelas_iniciais()
+    database_manager.fechar_pool()
+    conexao = sqlite3.connect(tmp_path / "planos.db")
+    yield conexao
+    conexao.close()
+
+
+@pytest.mark.parametrize("sql, params", [
+    (SQL_HUMOR_MENSAL, (1, 20000, 20030)),
+    (SQL_HUMOR_DIA, (1, 20000)),
+    (SQL_HUMOR_HISTORICO, (1, 7)),
+], ids=["buscar_humor_mensal", "buscar_humor_diario_usuario_data", "buscar_historico_humor_usuario"])
+def test_buscas_de_humor_usam_a_chave(conn, sql, params):
+    _assert_busca_indexada(_plano(conn, sql, params))
+
+
+def test_migracao_1_mantem_indice_de_cobertura():
+    """Na versão 1 (humor_diario ainda tabela), o UNIQUE não substitui o índice de cobertura."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE humor_diario (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usuario_id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            sentimento TEXT NOT NULL
+        )
+    """)
+    database_manager.MIGRACOES[0][1](conn.cursor())
+    mes = _plano(conn, "SELECT data, sentimento FROM humor_diario WHERE usuario_id = ? AND data BETWEEN ? AND ?",
+                 (1, "2024-01-01", "2024-01-31"))
+    historico = _plano(conn, "SELECT data, sentimento FROM humor_diario WHERE usuario_id = ? "
+                             "ORDER BY data DESC LIMIT ?", (1, 7))
+    for plano in (mes, historico):
+        _assert_busca_indexada(plano)
+        assert "idx_humor_usuario_data" in plano[0], plano
+    # O dia exato vai pelo índice do UNIQUE: uma linha, um acesso à tabela
+    dia = _plano(conn, "SELECT sentimento FROM humor_diario WHERE usuario_id = ? AND data = ?", (1, "2024-01-01"))
+    assert dia == ["SEARCH humor_diario USING INDEX idx_humor_usuario_dia (usuario_id=? AND data=?)"], dia
+    conn.close()
@@ -0,0 +1,73 @@
+# tests/test_resumo_humor.py
+"""humor_resumo mantido incrementalmente (_SQL_RESUMO_INCREMENTAL e o recálculo
+dos registros fora de ordem) deve ser igual ao recalculado do zero."""
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import database_manager
+from config import JANELA_RESUMO_HUMOR_DIAS, TIPO_USUARIO_COMUM
+from database_manager import HumorDiarioDAO, Usuario
+
+_INICIO = date(2024, 1, 1)
+# Positivo, negativo e neutro (fora das listas do config)
+_SENTIMENTOS = ["Feliz", "Triste", "Contente", "Neutro", "Ansioso(a)"]
+
+
+def _resumos():
+    with database_manager.conectar() as conn:
+        return conn.execute("SELECT * FROM humor_resumo ORDER BY usuario_id").fetchall()
+
+
+def _assert_igual_ao_recalculado():
+    incremental = _resumos()
+    HumorDiarioDAO.reconstruir_resumo_humor()
+    assert incremental == _resumos()
+
+
+def _novo_usuario(n):
+    return Usuario.inserir_usuario(f"Pessoa {n} Silva", f"p{n}@x.com", "senha1234", 30, TIPO_USUARIO_COMUM)
+
+
+@pytest.mark.parametrize("deslocamentos", [
+    [0, 1, 2, 3, 4],                          # Em ordem, dias seguidos
+    [0, 1, 2, 5, 6, 9],                       # Em ordem, com lacunas
+    [0, JANELA_RESUMO_HUMOR_DIAS - 1, JANELA_RESUMO_HUMOR_DIAS, JANELA_RESUMO_HUMOR_DIAS + 40],  # Lacunas >= janela
+    [5, 3, 4, 0, 1, 2],                       # Fora de ordem, completando a sequência
+    [10, 0, 9, 11, 8, 50, 12, 49],            # Fora de ordem, com lacunas
+], ids=["em-ordem", "lacunas", "lacunas-janela", "fora-de-ordem", "misturado"])
+def test_resumo_incremental_igual_ao_recalculado(banco, deslocamentos):
+    usuario_id = _novo_usuario(1)
+    outro_id = _novo_usuario(2)
+    HumorDiarioDAO.inserir_humor_diario(outro_id, _INICIO, "Feliz")  # Não pode ser afetado
+    for i, deslocamento in enumerate(deslocamentos):
+        HumorDiarioDAO.inserir_humor_diario(usuario_id, _INICIO + timedelta(days=deslocamento),
+                                            _SENTIMENTOS[i % len(_SENTIMENTOS)])
+        _assert_igual_ao_recalculado()
+    linha = {r[0]: r for r in _resumos()}[usuario_id]
+    assert linha[1] == database_manager.data_para_dia(_INICIO + timedelta(days=max(deslocamentos)))
+    assert linha[4] == len(deslocamentos)
+
+
+def test_resumo_incremental_aleatorio(banco):
+    rng = random.Random(7)
+    ids = [_novo_usuario(n) for n in range(5)]
+    registrados = set()
+    for _ in range(300):
+        usuario_id, deslocamento = rng.choice(ids), rng.randrange(90)
+        if (usuario_id, deslocamento) in registrados:
+            continue
+        registrados.add((usuario_id, deslocamento))
+        criado = HumorDiarioDAO.inserir_humor_diario_se_ausente(
+            usuario_id, _INICIO + timedelta(days=deslocamento), rng.choice(_SENTIMENTOS))
+        assert criado
+    _assert_igual_ao_recalculado()
+
+
+def test_registro_repetido_nao_altera_resumo(banco):
+    usuario_id = _novo_usuario(1)
+    HumorDiarioDAO.inserir_humor_diario(usuario_id, _INICIO, "Feliz")
+    antes = _resumos()
+    assert not HumorDiarioDAO.inserir_humor_diario_se_ausente(usuario_id, _INICIO, "Triste")
+    assert _resumos() == antes
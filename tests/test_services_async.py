@@ -0,0 +1,65 @@
+# tests/test_services_async.py
+"""services_async: limite de threads, ServicoSobrecarregado quando não há vaga
+e o gerador assíncrono igual ao síncrono."""
+import asyncio
+import threading
+import warnings
+from datetime import date, timedelta
+
+import pytest
+
+import services
+import services_async
+from config import POOL_TAMANHO, TIPO_USUARIO_COMUM
+from database_manager import HumorDiarioDAO, Usuario
+
+
+@pytest.fixture
+def executor(banco):
+    yield
+    services_async.encerrar()
+
+
+def test_threads_limitadas_as_conexoes_do_pool(monkeypatch):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # O padrão do config não é reduzido
+        assert services_async._threads_executor() == services_async.ASYNC_THREADS
+    monkeypatch.setattr(services_async, "ASYNC_THREADS", POOL_TAMANHO * 4)
+    with pytest.warns(RuntimeWarning, match="reduzido"):
+        assert services_async._threads_executor() == POOL_TAMANHO - 1
+
+
+def test_sem_vaga_levanta_servico_sobrecarregado(executor, monkeypatch):
+    monkeypatch.setattr(services_async, "ASYNC_MAX_PENDENTES", 1)
+    monkeypatch.setattr(services_async, "ASYNC_ESPERA_MAX", 0.05)
+    liberar = threading.Event()
+
+    async def cenario():
+        ocupada = asyncio.ensure_future(services_async._executar(liberar.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(services_async.ServicoSobrecarregado):
+            await services_async.obter_contagem_respostas()
+        liberar.set()
+        assert await ocupada is True
+        # A vaga volta quando a thread termina
+        return await services_async.obter_contagem_respostas()
+
+    assert asyncio.run(cenario()) == services.obter_contagem_respostas()
+
+
+def test_gerador_assincrono_igual_ao_sincrono(executor):
+    hoje = date.today()
+    ids = []
+    for n in range(5):
+        usuario_id = Usuario.inserir_usuario(f"Pessoa {n} Silva", f"p{n}@x.com", "senha1234", 30,
+                                             TIPO_USUARIO_COMUM)
+        for i in range(n * 3):
+            HumorDiarioDAO.inserir_humor_diario(usuario_id, hoje - timedelta(days=i), "Feliz")
+        ids.append(usuario_id)
+
+    async def coletar():
+        return [item async for item in services_async.obter_dados_completos_usuarios(ids + [9999], tamanho_lote=2)]
+
+    esperado = list(services.obter_dados_completos_usuarios(ids + [9999], tamanho_lote=2))
+    assert [usuario_id for usuario_id, _ in esperado] == ids
+    assert asyncio.run(coletar()) == esperado
@@ -1,11 +1,12 @@
 # ui.py
-import json
 from datetime import datetime
 import services
 from validators import validar_nome_completo, validar_email, validar_senha
 from config import TIPO_USUARIO_COMUM, TIPO_COLABORADOR, TIPO_ADMINISTRADOR
 from database_manager import Usuario  # Usando 'Usuario' como o DAO
 
+TAMANHO_PAGINA_CONSOLE = 20  # Usuários por página nas listagens do console
+
 # --- Funções Auxiliares de UI ---
 
 
@@ -37,22 +38,14 @@ def input_idade(prompt, valor_atual=None):
 def processar_fluxo_usuario_logado(usuario_data_completa):
     usuario_id = usuario_data_completa[0]
     nome_usuario = usuario_data_completa[1]
-    respostas_q_json = usuario_data_completa[6]
+    respondeu_questionario = usuario_data_completa[6]  # 0/1; respostas ficam em questionario_respostas
     pet_sugerido_existente = usuario_data_completa[7]
-    # respostas_pet_apoio_json = usuario_data_completa[8] # String JSON, será parseada em obter_dados_completos_usuario
 
     print(
         f"\nLogin como Usuário bem-sucedido. Bem-vindo(a), {nome_usuario.split(' ')[0]}!")
     ui_registrar_humor_diario(usuario_id, nome_usuario)
 
-    try:
-        respostas_questionario_existente = json.loads(
-            respostas_q_json) if respostas_q_json else None
-    except json.JSONDecodeError:
-        print("Erro ao ler respostas do questionário de bem-estar.")
-        respostas_questionario_existente = None
-
-    if respostas_questionario_existente:
+    if respondeu_questionario:
         print("\nPercebemos que você já preencheu nosso questionário. Vamos direto às indicações!")
         ui_exibir_indicacoes()
         ui_secao_pet_apoio(usuario_id, nome_usuario, pet_sugerido_existente)
@@ -146,7 +139,7 @@ def ui_registrar_humor_diario(usuario_id, nome_usuario):
     registro_existente = services.obter_registro_humor_hoje(usuario_id)
     if registro_existente:
         print(
-            f"Você já registrou seu humor para hoje: '{registro_existente[3]}'.")
+            f"Você já registrou seu humor para hoje: '{registro_existente[2]}'.")
         return
     sentimento = input("Descreva em uma palavra ou curta frase: ").strip()
     resultado = services.registrar_sentimento_diario(usuario_id, sentimento)
@@ -297,28 +290,73 @@ def ui_feedback_indicacoes():
 def menu_colaborador():
     while True:
         print("\n--- MENU COLABORADOR ---")
-        print("1. Listar usuários comuns\n2. Visualizar detalhes do usuário\n3. Logout")
+        print("1. Listar usuários comuns\n2. Visualizar detalhes do usuário\n3. Triagem de risco (todos os usuários)\n4. Logout")
         op = input("Opção: ").strip()
         if op == '1':
             ui_listar_usuarios_comuns()
         elif op == '2':
             ui_visualizar_detalhes_usuario_colab()
         elif op == '3':
+            ui_triagem_populacional()
+        elif op == '4':
             print("Saindo do menu colaborador.")
             break
         else:
             print("Opção inválida.")
 
 
+def paginar_usuarios(imprimir_linha, tipo_usuario=None):
+    """Busca e imprime usuários uma página por vez; retorna False se não houver nenhum."""
+    cursor_pagina = None
+    primeira = True
+    while True:
+        usuarios, cursor_pagina = Usuario.listar_usuarios_paginado(
+            tamanho_pagina=TAMANHO_PAGINA_CONSOLE, cursor_pagina=cursor_pagina, tipo_usuario=tipo_usuario)
+        if primeira and not usuarios:
+            return False
+        primeira = False
+        for linha in usuarios:
+            imprimir_linha(linha)
+        if cursor_pagina is None:
+            return True
+        if input("-- Enter para a próxima página, 'q' para parar: ").strip().lower() == 'q':
+            return True
+
+
 def ui_listar_usuarios_comuns():
     print("\n--- USUÁRIOS COMUNS ---")
-    usuarios = Usuario.listar_usuarios_por_tipo(TIPO_USUARIO_COMUM)
-    if not usuarios:
-        print("Nenhum usuário comum.")
-        return
     print(f"{'ID':<5}{'Nome':<20}{'Idade':<10}\n" + "-" * 37)
-    for uid, nome, idade in usuarios:
+
+    def imprimir(linha):
+        uid, nome, _, _, idade, _ = linha
         print(f"{uid:<5}{nome:<20}{idade if idade is not None else '-':<10}")
+    if not paginar_usuarios(imprimir, TIPO_USUARIO_COMUM):
+        print("Nenhum usuário comum.")
+
+
+def _percentual(valor):
+    return f"{valor:.0%}" if valor is not None else "-"
+
+
+def ui_triagem_populacional():
+    try:
+        triagem = services.obter_triagem_populacional()
+    except RuntimeError as e:
+        print(e)
+        return
+    print(f"\n--- TRIAGEM DE RISCO ({triagem['usuarios_analisados']} usuários comuns) ---")
+    if not triagem["ranking"]:
+        print("Nenhum usuário com dados suficientes.")
+    for r in triagem["ranking"]:
+        tendencia = "piorando" if (r["tendencia"] or 0) < 0 else "estável/melhorando"
+        print(f"ID {r['usuario_id']:>7} | {r['nome'][:25]:<25} | risco {_percentual(r['risco']):>4} | "
+              f"sim {_percentual(r['proporcao_sim']):>4} | humor negativo {_percentual(r['proporcao_negativa']):>4} | {tendencia}")
+    print("\n**Prevalência de 'sim' por pergunta:**")
+    for pergunta, (proporcao, respondentes) in triagem["prevalencia"].items():
+        print(f"- {pergunta}: {_percentual(proporcao)} de {respondentes}")
+    print("\n**Por faixa etária:**")
+    for f in triagem["faixas_etarias"]:
+        print(f"- {f['faixa']:<10} {f['usuarios']:>7} usuários | risco médio {_percentual(f['risco_medio'])}")
 
 
 def ui_visualizar_detalhes_usuario_colab():
@@ -369,6 +407,13 @@ def ui_visualizar_detalhes_usuario_colab():
     else:
         print("  (Nenhum registro)")
 
+    resumo = dados.get('resumo_humor')
+    if resumo:
+        print(f"\n**Resumo do Humor:**\n  Último: {resumo['ultimo_sentimento']} ({resumo['ultimo_dia']}) | "
+              f"Sequência: {resumo['sequencia_atual']} dia(s) | Total: {resumo['total_registros']}")
+        print(f"  Últimos {resumo['janela_dias']} dias: {resumo['positivos']} positivo(s), "
+              f"{resumo['neutros']} neutro(s), {resumo['negativos']} negativo(s)")
+
 
 def menu_administrador():
     while True:
@@ -415,14 +460,14 @@ def ui_cadastro_geral_usuario_admin():
 
 def ui_listar_todos_usuarios_admin():
     print("\n--- TODOS OS USUÁRIOS ---")
-    users = Usuario.listar_todos_usuarios()
-    if not users:
-        print("Nenhum usuário.")
-        return
     print(f"{'ID':<5}{'Nome':<20}{'Email':<30}{'Senha':<15}{'Idade':<7}{'Tipo':<6}\n" + "-"*90)
-    for uid, nome, email, pwd, idade, tipo in users:
+
+    def imprimir(linha):
+        uid, nome, email, pwd, idade, tipo = linha
         print(
             f"{uid:<5}{nome:<20}{email:<30}{pwd:<15}{idade if idade is not None else '-':<7}{tipo:<6}")
+    if not paginar_usuarios(imprimir):
+        print("Nenhum usuário.")
 
 
 def ui_atualizar_usuario_admin():